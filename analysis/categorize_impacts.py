@@ -1,15 +1,255 @@
 import sys
 import os
+import re
+import time
+import threading
+import numpy as np
 import pandas as pd
 
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Importer le fichier module_mapping.py
-try:
-    import module_mapping as module_mapping
-    MODULE_MAPPING = module_mapping.MODULE_MAPPING  # Assurez-vous que module_mapping.py contient bien un dictionnaire nommé MODULE_MAPPING
-except ImportError:
-    print("[ERREUR] Impossible d'importer module_mapping.py. Vérifiez que le fichier est bien à la racine du projet.")
-    sys.exit(1)
+from processors.intermediate import read_table, write_table
+from analysis.mapping_store import (
+    DEFAULT_MAPPING_PATH, classifier_cache_path, load_mapping, mapping_fingerprint, matcher_cache_path, read_json,
+    write_json_atomic
+)
+from analysis.module_classifier import CONFIDENCE_COLUMN, UNCATEGORIZED, load_classifier
+
+# Intervalle minimal (secondes) entre deux vérifications d'une nouvelle version du mapping
+RELOAD_CHECK_INTERVAL = 2.0
+
+def build_trie_pattern(keywords):
+    """
+    Construit une expression régulière en forme de trie à partir d'une liste de mots-clés :
+    les préfixes communs sont factorisés, ce qui évite de tester chaque mot-clé à chaque position.
+    À une position donnée, le mot-clé le plus long l'emporte.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True  # Fin d'un mot-clé
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+class KeywordMatcher:
+    """
+    Mapping des modules compilé une seule fois en un automate (regex en forme de trie)
+    appliqué en un seul passage à toute une colonne de descriptions.
+    Le trie est essayé à chaque position (lookahead) : les mots-clés qui se chevauchent sont tous comptés.
+    """
+
+    def __init__(self, mapping=None, compiled=None):
+        if compiled is not None:
+            # Matcher précompilé : ni trie ni index des mots-clés à reconstruire
+            self.modules = compiled["modules"]
+            self.keyword_modules = compiled["keyword_modules"]
+            self.trie = compiled["pattern"]
+        else:
+            self.modules = list(mapping)
+            self.keyword_modules = {}
+            for index, keywords in enumerate(mapping.values()):
+                for keyword in sorted({keyword.lower() for keyword in keywords if keyword}):
+                    self.keyword_modules.setdefault(keyword, []).append(index)
+            self.trie = build_trie_pattern(sorted(self.keyword_modules)) if self.keyword_modules else None
+        self.pattern = re.compile(f"(?=({self.trie}))") if self.trie else None
+
+        # À une position donnée, le trie ne retient que le mot-clé le plus long : les mots-clés plus courts
+        # qui commencent à la même position en sont les préfixes, et leurs modules sont comptés avec lui
+        self.match_columns = {
+            keyword: [column for end in range(1, len(keyword) + 1)
+                      for column in self.keyword_modules.get(keyword[:end], [])]
+            for keyword in self.keyword_modules
+        }
+
+    def to_compiled(self):
+        """ Forme sérialisable du matcher, mise en cache à côté du mapping. """
+        return {
+            "modules": self.modules,
+            "keyword_modules": self.keyword_modules,
+            "pattern": self.trie,
+        }
+
+    def match(self, descriptions):
+        """
+        Retourne un DataFrame lignes × modules (dans l'ordre du mapping)
+        contenant le nombre d'occurrences des mots-clés de chaque module, chevauchements compris.
+        """
+        texts = [str(description).lower() for description in descriptions]
+        counts = np.zeros((len(texts), len(self.modules)), dtype="int64")
+
+        if texts and self.pattern is not None:
+            # Toutes les descriptions sont concaténées pour un seul passage de l'automate
+            lengths = np.fromiter((len(text) + 1 for text in texts), dtype="int64", count=len(texts))
+            row_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            positions, columns = [], []
+            for match in self.pattern.finditer("\n".join(texts)):
+                for column in self.match_columns[match.group(1)]:
+                    positions.append(match.start())
+                    columns.append(column)
+            if positions:
+                rows = np.searchsorted(row_starts, positions, side="right") - 1
+                np.add.at(counts, (rows, columns), 1)
+
+        return pd.DataFrame(counts, index=descriptions.index, columns=self.modules)
+
+class LoadedMapping:
+    """ Version du mapping en vigueur, son matcher compilé et le classifieur des modules appris dessus. """
+
+    def __init__(self, version, mapping, matcher, classifier):
+        self.version = version
+        self.mapping = mapping
+        self.matcher = matcher
+        self.classifier = classifier
+        self.fingerprint = mapping_fingerprint(mapping)
+
+    @property
+    def label(self):
+        """
+        Identifiant de version : numéro de l'artefact, empreinte de son contenu
+        et empreinte du classifieur (qui change aussi quand il est réappris sur de nouvelles releases).
+        """
+        return f"{self.version}-{self.fingerprint}-{self.classifier.fingerprint}"
+
+def load_compiled_mapping(path=DEFAULT_MAPPING_PATH):
+    """
+    Charge le mapping versionné, son matcher précompilé et son classifieur (voir `analysis.module_classifier`).
+    Si le cache du matcher est absent ou ne correspond pas à cette version du mapping,
+    le matcher est compilé puis mis en cache ; de même pour le classifieur.
+    """
+    version, mapping = load_mapping(path)
+    fingerprint = mapping_fingerprint(mapping)
+    cache_path = matcher_cache_path(path)
+    classifier = load_classifier(mapping, path)
+
+    try:
+        cache = read_json(cache_path)
+        if cache.get("fingerprint") == fingerprint:
+            return LoadedMapping(version, mapping, KeywordMatcher(compiled=cache["matcher"]), classifier)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    matcher = KeywordMatcher(mapping)
+    try:
+        write_json_atomic(cache_path, {"version": version, "fingerprint": fingerprint, "matcher": matcher.to_compiled()})
+    except OSError as e:
+        print(f"[AVERTISSEMENT] Impossible d'écrire le cache du matcher '{cache_path}' : {e}")
+    return LoadedMapping(version, mapping, matcher, classifier)
+
+class MappingRegistry:
+    """
+    Donne accès au mapping en vigueur. Les processus de longue durée (backend Flask)
+    détectent une nouvelle version de l'artefact, ou un classifieur réappris, et les chargent à chaud,
+    sans redémarrage : les fichiers ne sont vérifiés (un simple stat) qu'au plus toutes les `check_interval` secondes.
+    """
+
+    def __init__(self, path=DEFAULT_MAPPING_PATH, check_interval=RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._stamp = None
+        self._checked_at = 0.0
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        try:
+            classifier_stat = os.stat(classifier_cache_path(self.path))
+            classifier_stamp = classifier_stat.st_mtime_ns, classifier_stat.st_size
+        except OSError:
+            classifier_stamp = None
+        return stat.st_mtime_ns, stat.st_size, classifier_stamp
+
+    def current(self):
+        now = time.monotonic()
+        if self._loaded is not None and now - self._checked_at < self.check_interval:
+            return self._loaded
+
+        with self._lock:
+            if self._loaded is None or now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                stamp = self._file_stamp()
+                if stamp != self._stamp:
+                    loaded = load_compiled_mapping(self.path)
+                    if self._loaded is not None and loaded.label != self._loaded.label:
+                        print(f"[INFO] Nouvelle version du mapping chargée : {loaded.label}")
+                    self._loaded, self._stamp = loaded, stamp  # Remplacement atomique
+        return self._loaded
+
+REGISTRY = MappingRegistry()
+
+def mapping_version():
+    """ Version du mapping des modules en vigueur. """
+    return REGISTRY.current().label
+
+def match_modules(descriptions, matcher=None):
+    """ Nombre d'occurrences des mots-clés de chaque module pour chaque description. """
+    return (matcher or REGISTRY.current().matcher).match(descriptions)
+
+def primary_modules(hits):
+    """
+    Module principal de chaque ligne : celui qui a le plus d'occurrences,
+    l'ordre du mapping départageant les égalités.
+    """
+    primary = pd.Series(UNCATEGORIZED, index=hits.index, dtype=object)  # Si aucun mot-clé ne correspond
+    if hits.shape[1]:
+        counts = hits.to_numpy()
+        best = counts.argmax(axis=1)
+        matched = counts[np.arange(len(counts)), best] > 0
+        primary[matched] = np.asarray(hits.columns, dtype=object)[best[matched]]
+    return primary
+
+def classify_modules(descriptions, classifier=None, hits=None):
+    """
+    Module attribué par le classifieur et confiance de chaque description (voir `ModuleClassifier.predict`).
+    Avec `hits` (voir `match_modules`), une description sous le seuil de confiance du classifieur reçoit
+    le module principal de ses mots-clés (voir `primary_modules`) ; elle ne reste 'Non catégorisé'
+    que si aucun mot-clé ne correspond.
+    """
+    modules, confidence = (classifier or REGISTRY.current().classifier).predict(descriptions)
+    if hits is not None:
+        uncategorized = modules == UNCATEGORIZED
+        modules[uncategorized] = primary_modules(hits.loc[uncategorized])
+    return modules, confidence
+
+def describe_matches(hits):
+    """ Liste lisible de tous les modules détectés avec leur nombre d'occurrences. """
+    counts = hits.to_numpy()
+    rows, columns = np.nonzero(counts)
+    values = counts[rows, columns]
+    order = np.lexsort((columns, -values, rows))  # Par ligne, du module le plus cité au moins cité
+
+    descriptions = [[] for _ in range(len(counts))]
+    for row, column, value in zip(rows[order], columns[order], values[order]):
+        descriptions[row].append(f"{hits.columns[column]} ({value})")
+    return pd.Series(["; ".join(parts) for parts in descriptions], index=hits.index, dtype=object)
+
+def categorize_dataframe(df):
+    """
+    Ajoute au DataFrame, en fonction de la description :
+    - 'Module impacté' : le module attribué par le classifieur, ou à défaut le module principal des mots-clés
+    - 'Confiance' : la similarité de la description avec ce module (entre 0 et 1)
+    - 'Modules détectés' : tous les modules dont un mot-clé apparaît, avec leur nombre d'occurrences
+    """
+    # Vérifier que la colonne attendue existe
+    if "Description" not in df.columns:
+        raise ValueError("La colonne 'Description' est absente.")
+
+    df = df.copy()
+    loaded = REGISTRY.current()
+    hits = match_modules(df["Description"], loaded.matcher)
+    df["Module impacté"], df[CONFIDENCE_COLUMN] = classify_modules(df["Description"], loaded.classifier, hits)
+    df["Modules détectés"] = describe_matches(hits)
+    return df
 
 def categorize_impact(file_path):
     """
@@ -17,32 +257,22 @@ def categorize_impact(file_path):
     """
     print(f"[INFO] Catégorisation des impacts dans : {file_path}")
 
-    # Charger le fichier Excel
-    df = pd.read_excel(file_path)
+    # Charger le fichier intermédiaire (Arrow ou Excel)
+    df = read_table(file_path)
 
-    # Vérifier que la colonne attendue existe
-    if "Description" not in df.columns:
+    try:
+        df = categorize_dataframe(df)
+    except ValueError:
         print(f"[ERREUR] La colonne 'Description' est absente dans {file_path}.")
         return
 
-    # Fonction pour attribuer un module en fonction des mots-clés
-    def detect_module(description):
-        description = str(description).lower()
-        for module, keywords in MODULE_MAPPING.items():
-            if any(keyword in description for keyword in keywords):
-                return module
-        return "Non catégorisé"  # Si aucun mot-clé ne correspond
-
-    # Ajouter la colonne "Module impacté"
-    df["Module impacté"] = df["Description"].apply(detect_module)
-
     # Sauvegarder le fichier modifié
-    df.to_excel(file_path, index=False)
+    write_table(df, file_path)
     print(f"[SUCCÈS] Catégorisation terminée et sauvegardée dans {file_path}")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("[ERREUR] Aucun fichier spécifié. Utilisation : python categorize_impacts.py fichier.xlsx")
+        print("[ERREUR] Aucun fichier spécifié. Utilisation : python categorize_impacts.py fichier.arrow")
         sys.exit(1)
 
     # Appliquer la catégorisation sur chaque fichier donné en argument
@@ -1,23 +1,28 @@
+import sys
 import os
-from bs4 import BeautifulSoup
 import re
 
-def extract_modules_dynamic(html_file):
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors.html_parsers import iter_file_nodes
+from analysis.mapping_store import save_mapping
+from analysis.categorize_impacts import load_compiled_mapping
+
+def extract_modules_dynamic(html_file, parser=None):
     """
     Analyse le fichier HTML et extrait dynamiquement les modules impactés
     en filtrant les identifiants de correctifs et les termes génériques.
     Génère un dictionnaire propre avec des expressions complètes et leurs variantes.
     """
-    with open(html_file, "r", encoding="utf-8") as file:
-        soup = BeautifulSoup(file, "html.parser")
 
     modules_detected = {}
 
     # Liste des mots ou expressions génériques à ignorer
     generic_terms = {"améliorations", "anomalies", "corrigées", "correctifs", "prérequis", "techniques"}
 
-    for header in soup.find_all(["h2", "h3"]):
-        section_title = header.get_text(strip=True)
+    for _, text in iter_file_nodes(html_file, ["h2", "h3"], parser):
+        section_title = text.strip()
 
         # Ignorer les titres contenant des identifiants de correctifs (ex: "#SCI-4554")
         if re.match(r"^#\w+-\d+", section_title):
@@ -45,22 +50,21 @@ def extract_modules_dynamic(html_file):
 
 def save_mapping_to_file(mapping, output_folder):
     """
-    Sauvegarde le mapping des modules détectés dans un fichier sous forme de dictionnaire Python.
+    Sauvegarde le mapping des modules détectés sous forme d'artefact JSON versionné
+    (module_mapping.json) et précompile son matcher. Le numéro de version n'augmente
+    que si le contenu du mapping a changé ; les processus en cours le rechargent à chaud.
     """
     os.makedirs(output_folder, exist_ok=True)  # S'assurer que le dossier analysis existe
-    output_file = os.path.join(output_folder, "module_mapping.py")
+    output_file = os.path.join(output_folder, "module_mapping.json")
 
-    with open(output_file, "w", encoding="utf-8") as file:
-        file.write("MODULE_MAPPING = {\n")
-        for module, keywords in mapping.items():
-            file.write(f'    "{module}": {keywords},\n')
-        file.write("}\n")
+    save_mapping(mapping, output_file)
+    loaded = load_compiled_mapping(output_file)
 
-    print(f"[SUCCÈS] Mapping des modules sauvegardé dans {output_file}")
+    print(f"[SUCCÈS] Mapping des modules sauvegardé dans {output_file} (version {loaded.label})")
 
 if __name__ == "__main__":
     html_file = "sciforma_patches/2024-09.html"  # Remplace par ton fichier HTML
-    output_folder = "analysis"  # Dossier où stocker le fichier module_mapping.py
+    output_folder = "analysis"  # Dossier où stocker le fichier module_mapping.json
 
     modules_found = extract_modules_dynamic(html_file)
     save_mapping_to_file(modules_found, output_folder)
@@ -0,0 +1,196 @@
+import sys
+import os
+import time
+import sqlite3
+import pandas as pd
+
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.issue_store import DEFAULT_STORE_PATH
+from summary.add_summary import EMPTY_LABEL
+
+# Dimensions du cube -> colonne des feuilles du Master (None : valeur fournie à l'enregistrement de la release)
+DIMENSIONS = {
+    "system": None,
+    "release": None,
+    "type": None,
+    "section": "Section",
+    "module": "Module impacté",
+    "test_status": "Test Status",
+}
+
+# Les valeurs des dimensions sont stockées une seule fois (table des libellés) : les cellules du cube
+# ne contiennent que des entiers, dans une table sans rowid indexée par ses dimensions
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS cube_labels (
+    id INTEGER PRIMARY KEY,
+    value TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS impact_cube (
+    {", ".join(f"{name} INTEGER NOT NULL" for name in DIMENSIONS)},
+    count INTEGER NOT NULL,
+    PRIMARY KEY ({", ".join(DIMENSIONS)})
+) WITHOUT ROWID;
+"""
+
+
+def dimension_values(df, column):
+    """ Valeurs d'une colonne d'une feuille, les valeurs vides étant remplacées par 'Non renseigné'. """
+    if column not in df.columns:
+        return pd.Series(EMPTY_LABEL, index=df.index, dtype=object)
+    values = df[column].astype(object).where(df[column].notna(), "")
+    return values.astype(str).str.strip().replace("", EMPTY_LABEL)
+
+
+def release_cells(system, release, sheets):
+    """
+    Agrège une release (nom de feuille -> DataFrame) en cellules du cube :
+    DataFrame (dimensions..., count) du nombre d'issues par combinaison de valeurs.
+    """
+    frames = [
+        pd.DataFrame({
+            name: dimension_values(df, column) if column else {"system": system, "release": release, "type": sheet_name}[name]
+            for name, column in DIMENSIONS.items()
+        }, index=df.index)
+        for sheet_name, df in sheets.items()
+    ]
+    if not frames:
+        return pd.DataFrame(columns=list(DIMENSIONS) + ["count"])
+    return pd.concat(frames, ignore_index=True).groupby(list(DIMENSIONS), sort=False).size().reset_index(name="count")
+
+
+class ImpactCube:
+    """
+    Cube pré-agrégé des impacts (système × release × type × section × module × test status),
+    stocké dans la base du stockage des issues. Il est mis à jour release par release à chaque traitement :
+    le tableau de bord interroge ces agrégats (quelques centaines de cellules par release)
+    au lieu de relire les fichiers Master. Une connexion est ouverte par opération.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _label_ids(self, connection, values):
+        """ Identifiants des libellés, créés si besoin. """
+        values = sorted(set(values))
+        connection.executemany("INSERT OR IGNORE INTO cube_labels (value) VALUES (?)", [(value,) for value in values])
+        ids = {}
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            ids.update(connection.execute(
+                f"SELECT value, id FROM cube_labels WHERE value IN ({', '.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        return ids
+
+    def add_release(self, system, release, sheets):
+        """ (Ré)agrège une release ; les cellules déjà enregistrées pour cette release sont remplacées. """
+        cells = release_cells(system, release, sheets)
+        with self._connect() as connection:
+            ids = self._label_ids(connection, [system, release] + cells[list(DIMENSIONS)].stack().tolist())
+            connection.execute("DELETE FROM impact_cube WHERE system = ? AND release = ?", (ids[system], ids[release]))
+            encoded = cells[list(DIMENSIONS)].apply(lambda column: column.map(ids))
+            rows = [
+                tuple(int(value) for value in row) + (int(count),)
+                for row, count in zip(encoded.itertuples(index=False, name=None), cells["count"])
+            ]
+            connection.executemany(
+                f"INSERT INTO impact_cube VALUES ({', '.join('?' * (len(DIMENSIONS) + 1))})", rows
+            )
+        return int(cells["count"].sum())
+
+    def _where(self, filters):
+        """ Clause WHERE des filtres (dimension -> valeur ou liste de valeurs). """
+        conditions, params = [], []
+        for name, values in filters.items():
+            if name not in DIMENSIONS:
+                raise ValueError(f"Dimension inconnue : {name}. Choix possibles : {list(DIMENSIONS)}")
+            values = [values] if isinstance(values, str) else list(values)
+            if values:
+                conditions.append(
+                    f"c.{name} IN (SELECT id FROM cube_labels WHERE value IN ({', '.join('?' * len(values))}))"
+                )
+                params.extend(values)
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+    def query(self, group_by=(), **filters):
+        """
+        Agrège le cube (nombre d'issues) selon les dimensions `group_by`, après filtrage
+        (tranche) sur les valeurs des autres dimensions ; sans `group_by`, retourne le seul total.
+        Les groupes sont triés par nombre décroissant.
+        """
+        start = time.perf_counter()
+        group_by = list(dict.fromkeys(group_by))
+        for name in group_by:
+            if name not in DIMENSIONS:
+                raise ValueError(f"Dimension inconnue : {name}. Choix possibles : {list(DIMENSIONS)}")
+        where, params = self._where(filters)
+
+        # Agrégation sur les identifiants, puis décodage des seuls libellés des groupes
+        columns = ", ".join(f"c.{name}" for name in group_by)
+        grouped = f"SELECT {columns + ', ' if columns else ''}SUM(c.count) AS count FROM impact_cube AS c {where}"
+        if group_by:
+            grouped += f" GROUP BY {columns}"
+        labels = ", ".join(f"l{index}.value" for index in range(len(group_by)))
+        joins = " ".join(f"JOIN cube_labels AS l{index} ON l{index}.id = g.{name}" for index, name in enumerate(group_by))
+        order = f"ORDER BY g.count DESC, {labels}" if group_by else ""
+
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT {labels + ', ' if labels else ''}g.count FROM ({grouped}) AS g {joins} {order}", params
+            ).fetchall()
+
+        results = [dict(zip(group_by + ["count"], row)) for row in rows if row[-1] is not None]
+        return {
+            "group_by": group_by,
+            "filters": {name: values for name, values in filters.items() if values},
+            "total": sum(row["count"] for row in results),
+            "rows": results,
+            "took_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    def dimensions(self, **filters):
+        """ Valeurs de chaque dimension présentes dans le cube (après filtrage), pour les listes de filtres. """
+        where, params = self._where(filters)
+        with self._connect() as connection:
+            return {
+                name: [
+                    value for (value,) in connection.execute(
+                        f"""
+                        SELECT value FROM cube_labels
+                        WHERE id IN (SELECT DISTINCT c.{name} FROM impact_cube AS c {where})
+                        ORDER BY value
+                        """,
+                        params,
+                    )
+                ]
+                for name in DIMENSIONS
+            }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("[ERREUR] Arguments manquants. Utilisation : python impact_dashboard.py <système> <fichier_Master.xlsx> [...]")
+        sys.exit(1)
+
+    # (Ré)agrège des fichiers Master : releases traitées avant la création du cube,
+    # ou 'Test Status' saisis depuis par les testeurs
+    system = sys.argv[1]
+    cube = ImpactCube()
+    for master_file in sys.argv[2:]:
+        release = os.path.basename(master_file).replace("_Master.xlsx", "")
+        sheets = {
+            sheet_name: df.dropna(subset=["ID"])
+            for sheet_name, df in pd.read_excel(master_file, sheet_name=None).items()
+            if {"ID", "Description"}.issubset(df.columns)
+        }
+        count = cube.add_release(system, release, sheets)
+        print(f"[INFO] Release '{release}' : {count} issue(s) agrégée(s).")
+    print(f"[SUCCÈS] Cube des impacts mis à jour dans '{cube.path}'.")
@@ -0,0 +1,58 @@
+import os
+import json
+import hashlib
+
+# Le mapping est un artefact de données versionné, stocké à côté de ce module
+DEFAULT_MAPPING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "module_mapping.json")
+
+
+def matcher_cache_path(mapping_path):
+    """ Chemin du matcher précompilé mis en cache à côté du mapping. """
+    return os.path.splitext(mapping_path)[0] + ".matcher.json"
+
+
+def classifier_cache_path(mapping_path):
+    """ Chemin du classifieur des modules mis en cache à côté du mapping. """
+    return os.path.splitext(mapping_path)[0] + ".classifier.npz"
+
+
+def mapping_fingerprint(mapping):
+    """ Empreinte du contenu du mapping (l'ordre des modules compte : il départage les égalités). """
+    payload = json.dumps(mapping, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def write_json_atomic(path, data):
+    """ Écrit un fichier JSON via un fichier temporaire : un lecteur ne voit jamais un fichier à moitié écrit. """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+        file.write("\n")
+    os.replace(tmp_path, path)
+
+
+def load_mapping(path=DEFAULT_MAPPING_PATH):
+    """ Charge le mapping versionné. Retourne (version, mapping). """
+    data = read_json(path)
+    return data["version"], data["mapping"]
+
+
+def save_mapping(mapping, path=DEFAULT_MAPPING_PATH):
+    """
+    Enregistre une nouvelle version du mapping si son contenu a changé.
+    Retourne le numéro de version en vigueur.
+    """
+    version = 0
+    if os.path.exists(path):
+        version, current = load_mapping(path)
+        if mapping_fingerprint(current) == mapping_fingerprint(mapping):
+            return version
+
+    version += 1
+    write_json_atomic(path, {"version": version, "mapping": mapping})
+    return version
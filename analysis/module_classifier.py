@@ -0,0 +1,303 @@
+import sys
+import os
+import re
+import sqlite3
+import hashlib
+import argparse
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis.mapping_store import DEFAULT_MAPPING_PATH, classifier_cache_path, load_mapping, mapping_fingerprint
+from analysis.near_duplicates import ISSUE_ID_PATTERN
+from processors.issue_store import DEFAULT_STORE_PATH
+
+UNCATEGORIZED = "Non catégorisé"
+
+# Colonne ajoutée aux feuilles du Master : similarité cosinus entre la description et le module attribué
+CONFIDENCE_COLUMN = "Confiance"
+
+# En dessous de cette similarité (aucun terme significatif en commun), la description reste non catégorisée
+MIN_CONFIDENCE = 0.05
+
+# Mots outils ignorés (après normalisation : minuscules, sans accents)
+STOP_WORDS = {
+    "a", "au", "aux", "avec", "ce", "ces", "d", "dans", "de", "des", "du", "en", "est", "et", "l", "la", "le",
+    "les", "lors", "n", "ne", "ou", "par", "pas", "plus", "pour", "qu", "que", "qui", "s", "sa", "se", "ses",
+    "sont", "sur", "un", "une",
+}
+
+ISSUE_ID_HINT_PATTERN = re.compile(r"-\d")  # Recherche rapide des descriptions pouvant contenir un identifiant
+COMBINING_PATTERN = re.compile("[\u0300-\u036f]+")
+# Table de traduction (octets ASCII) : tout sauf les lettres minuscules, les chiffres et le retour à la ligne devient un espace
+WORD_BYTES = bytes(
+    byte if chr(byte).isdigit() or "a" <= chr(byte) <= "z" or byte == ord("\n") else ord(" ") for byte in range(256)
+)
+
+
+def batch_terms(texts):
+    """
+    Termes de toutes les descriptions : mots (hors mots outils) et paires de mots consécutifs,
+    normalisés comme `analysis.near_duplicates.normalize_description` (minuscules, sans accents,
+    sans identifiants d'issues ni ponctuation). Les descriptions sont normalisées en un seul passage
+    sur leur concaténation. Retourne (numéro de description de chaque terme, termes), triés par description.
+    """
+    texts = [str(text).replace("\n", " ") for text in texts]
+    texts = [ISSUE_ID_PATTERN.sub(" ", text) if ISSUE_ID_HINT_PATTERN.search(text) else text for text in texts]
+    text = COMBINING_PATTERN.sub("", unicodedata.normalize("NFKD", "\n".join(texts).lower()))
+    # Les caractères non ASCII restants (apostrophes typographiques, etc.) sont des séparateurs
+    lines = text.encode("ascii", "replace").translate(WORD_BYTES).decode("ascii").split("\n")
+
+    words = [line.split() for line in lines]
+    rows = np.repeat(np.arange(len(lines)), [len(line) for line in words])
+    words = pd.Series([word for line in words for word in line], dtype=object)
+    kept = ~words.isin(STOP_WORDS).to_numpy()
+    rows, words = rows[kept], words[kept].reset_index(drop=True)
+
+    # Paires de mots consécutifs d'une même description
+    pairs = np.flatnonzero(rows[1:] == rows[:-1])
+    bigrams = words.iloc[pairs].reset_index(drop=True) + " " + words.iloc[pairs + 1].reset_index(drop=True)
+    rows = np.concatenate([rows, rows[pairs]])
+    terms = pd.concat([words, bigrams], ignore_index=True)
+    order = np.argsort(rows, kind="stable")
+    return rows[order], terms.iloc[order].reset_index(drop=True)
+
+
+def tfidf_entries(texts, vocabulary, idf, default_idf):
+    """
+    Vecteurs TF-IDF (normés) de toutes les descriptions, calculés par lot au format creux :
+    retourne (lignes, colonnes, valeurs) triés par ligne, restreints aux termes du vocabulaire.
+    Les termes inconnus, pondérés par `default_idf`, comptent dans la norme : une longue description
+    dont un seul mot générique est connu obtient une faible similarité.
+    """
+    term_rows, terms = batch_terms(texts)
+    empty = np.empty(0, dtype="int64")
+    if not len(terms):
+        return empty, empty, np.empty(0)
+
+    codes, uniques = pd.factorize(terms)
+    columns = vocabulary.get_indexer(uniques)
+    term_idf = np.where(columns >= 0, idf[np.maximum(columns, 0)], default_idf)
+
+    # Fréquence de chaque couple (ligne, terme) : une clé entière par couple, comptée en une fois
+    keys, counts = np.unique(term_rows * len(uniques) + codes, return_counts=True)
+    rows, codes = np.divmod(keys, len(uniques))
+    values = (1 + np.log(counts)) * term_idf[codes]
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=len(texts)))
+
+    known = columns[codes] >= 0
+    rows = rows[known]
+    return rows, columns[codes[known]], values[known] / norms[rows]
+
+
+class ModuleClassifier:
+    """
+    Classifieur des descriptions par module : chaque module est représenté par le centroïde
+    des vecteurs TF-IDF de ses exemples (ses mots-clés du mapping et les descriptions déjà
+    étiquetées des releases passées). Une description est attribuée au module dont le centroïde
+    lui est le plus similaire (cosinus) ; les similarités de tout un lot sont obtenues par un seul
+    produit matrice creuse × centroïdes, sans boucle Python par ligne.
+    """
+
+    def __init__(self, modules, vocabulary, idf, centroids, examples=(), corpus=(), fingerprint=None,
+                 min_confidence=MIN_CONFIDENCE):
+        self.modules = list(modules)
+        self.vocabulary = pd.Index(vocabulary)
+        self.idf = np.asarray(idf, dtype="float64")
+        self.centroids = np.asarray(centroids, dtype="float32")  # Termes × modules
+        # Forme creuse des centroïdes (un terme n'est lié qu'à quelques modules) : entrées triées par terme
+        terms, self.entry_modules = np.nonzero(self.centroids)
+        self.entry_weights = self.centroids[terms, self.entry_modules]
+        self.term_starts = np.searchsorted(terms, np.arange(len(self.vocabulary) + 1))
+        self.examples = list(examples)
+        self.corpus = list(corpus)
+        self.fingerprint = fingerprint
+        self.min_confidence = min_confidence
+        self.default_idf = float(self.idf.max()) if len(self.idf) else 1.0
+
+    @classmethod
+    def fit(cls, mapping, examples=(), corpus=()):
+        """
+        Apprend les centroïdes à partir du mapping (un document par module : son nom et ses mots-clés)
+        et d'exemples étiquetés (description, module) ; les modules absents du mapping sont ignorés.
+        Les descriptions non étiquetées de `corpus` ne servent qu'à l'IDF : les expressions communes
+        à de nombreuses descriptions ("espace de travail", "projets", "données") y perdent leur poids.
+        """
+        modules = list(mapping)
+        positions = {module: index for index, module in enumerate(modules)}
+        examples = [(str(text), label) for text, label in examples if label in positions]
+        texts = [" ".join([module] + list(keywords)) for module, keywords in mapping.items()]
+        texts += [text for text, _ in examples]
+        labels = np.array(list(range(len(modules))) + [positions[label] for _, label in examples], dtype="int64")
+
+        # Vocabulaire : termes des documents étiquetés ; IDF : fréquence documentaire sur tous les documents
+        corpus = list(corpus)
+        rows, terms = batch_terms(texts + corpus)
+        codes, uniques = pd.factorize(terms)
+        frequencies = np.bincount(np.unique(rows * len(uniques) + codes) % len(uniques), minlength=len(uniques))
+        labelled = np.zeros(len(uniques), dtype=bool)
+        labelled[codes[rows < len(texts)]] = True
+        frequencies = pd.Series(frequencies[labelled], index=uniques[labelled]).sort_index()
+        vocabulary = frequencies.index
+        idf = np.log((1 + len(texts) + len(corpus)) / (1 + frequencies.to_numpy(dtype="float64"))) + 1
+
+        rows, columns, values = tfidf_entries(texts, vocabulary, idf, float(idf.max()) if len(idf) else 1.0)
+        centroids = np.zeros((len(vocabulary), len(modules)))
+        np.add.at(centroids, (columns, labels[rows]), values)
+        norms = np.linalg.norm(centroids, axis=0)
+        centroids /= np.where(norms > 0, norms, 1)
+
+        digest = hashlib.sha256(mapping_fingerprint(mapping).encode("utf-8"))
+        for text, label in examples:
+            digest.update(f"{text}\0{label}\0".encode("utf-8"))
+        for text in corpus:
+            digest.update(f"{text}\0".encode("utf-8"))
+        return cls(modules, vocabulary, idf, centroids, examples, corpus, digest.hexdigest()[:16])
+
+    def scores(self, descriptions):
+        """ Matrice lignes × modules des similarités cosinus (un seul produit de matrices creuses pour tout le lot). """
+        texts = list(descriptions)
+        rows, columns, values = tfidf_entries(texts, self.vocabulary, self.idf, self.default_idf)
+
+        # Produit creux × creux : chaque terme d'une description est associé aux entrées du centroïde
+        # de ce terme, puis les contributions (ligne, module) sont sommées en un seul `bincount`
+        starts = self.term_starts[columns]
+        counts = self.term_starts[columns + 1] - starts
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        entries = np.repeat(starts, counts) + offsets
+        keys = np.repeat(rows, counts) * len(self.modules) + self.entry_modules[entries]
+        weights = np.repeat(values, counts) * self.entry_weights[entries]
+        scores = np.bincount(keys, weights=weights, minlength=len(texts) * len(self.modules))
+        return scores.reshape(len(texts), len(self.modules))
+
+    def predict(self, descriptions):
+        """
+        Module le plus probable et confiance (similarité cosinus, entre 0 et 1) de chaque description.
+        Retourne deux Series indexées comme `descriptions`.
+        """
+        scores = self.scores(descriptions)
+        modules = pd.Series(UNCATEGORIZED, index=descriptions.index, dtype=object)
+        confidence = pd.Series(0.0, index=descriptions.index)
+        if len(self.modules) and len(scores):
+            best = scores.argmax(axis=1)
+            # Le seuil s'applique à la confiance affichée (arrondie)
+            best_scores = scores[np.arange(len(scores)), best].astype("float64").round(2)
+            confident = best_scores >= self.min_confidence
+            modules[confident] = np.asarray(self.modules, dtype=object)[best[confident]]
+            confidence[:] = best_scores
+        return modules, confidence
+
+    def save(self, path, mapping_fingerprint):
+        """ Met le modèle en cache (npz) via un fichier temporaire remplacé atomiquement. """
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "wb") as file:
+            np.savez(
+                file,
+                mapping_fingerprint=np.array(mapping_fingerprint),
+                fingerprint=np.array(self.fingerprint),
+                modules=np.array(self.modules, dtype=str),
+                vocabulary=np.array(self.vocabulary, dtype=str),
+                idf=self.idf,
+                centroids=self.centroids,
+                example_texts=np.array([text for text, _ in self.examples], dtype=str),
+                example_labels=np.array([label for _, label in self.examples], dtype=str),
+                corpus=np.array(self.corpus, dtype=str),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """ Relit un modèle mis en cache. Retourne (modèle, empreinte du mapping d'apprentissage). """
+        with np.load(path, allow_pickle=False) as data:
+            examples = list(zip(data["example_texts"].tolist(), data["example_labels"].tolist()))
+            model = cls(data["modules"].tolist(), data["vocabulary"].tolist(), data["idf"], data["centroids"],
+                        examples, data["corpus"].tolist(), str(data["fingerprint"]))
+            return model, str(data["mapping_fingerprint"])
+
+
+def load_classifier(mapping, mapping_path=DEFAULT_MAPPING_PATH):
+    """
+    Charge le classifieur mis en cache à côté du mapping. S'il est absent ou a été appris
+    sur une autre version du mapping, il est réappris (avec les descriptions d'apprentissage du cache) puis mis en cache.
+    """
+    cache_path = classifier_cache_path(mapping_path)
+    fingerprint = mapping_fingerprint(mapping)
+    examples, corpus = [], []
+    try:
+        model, trained_on = ModuleClassifier.load(cache_path)
+        if trained_on == fingerprint:
+            return model
+        examples, corpus = model.examples, model.corpus
+    except (OSError, ValueError, KeyError):
+        pass
+
+    model = ModuleClassifier.fit(mapping, examples, corpus)
+    try:
+        model.save(cache_path, fingerprint)
+    except OSError as e:
+        print(f"[AVERTISSEMENT] Impossible d'écrire le cache du classifieur '{cache_path}' : {e}")
+    return model
+
+
+def training_descriptions(store_path=None, master_files=(), system=None):
+    """
+    Descriptions des releases passées. Seuls les modules confirmés par un testeur servent d'étiquette :
+    ceux marqués `module_confirmed` dans le stockage des issues (voir `IssueStore.import_module_labels`),
+    puis ceux des fichiers Master relus par les testeurs, qui l'emportent. Les modules attribués
+    par le pipeline lui-même ne sont pas réappris : ces descriptions ne servent qu'à l'IDF.
+    Retourne (exemples étiquetés (description, module), descriptions sans étiquette).
+    """
+    labels, unlabelled = {}, set()
+    if store_path:
+        query = "SELECT description, module, module_confirmed FROM issues WHERE description IS NOT NULL"
+        parameters = []
+        if system:
+            query += " AND system = ?"
+            parameters.append(system)
+        with sqlite3.connect(store_path, timeout=30) as connection:
+            for description, module, confirmed in connection.execute(query, parameters):
+                if confirmed:
+                    labels[description] = module
+                else:
+                    unlabelled.add(description)
+
+    for master_file in master_files:
+        for df in pd.read_excel(master_file, sheet_name=None).values():
+            if {"Description", "Module impacté"}.issubset(df.columns):
+                df = df.dropna(subset=["Description"])
+                labels.update(zip(df["Description"].astype(str), df["Module impacté"].fillna(UNCATEGORIZED)))
+
+    examples = sorted((description, module) for description, module in labels.items() if module and module != UNCATEGORIZED)
+    unlabelled.update(description for description, module in labels.items() if not module or module == UNCATEGORIZED)
+    corpus = sorted(unlabelled - {description for description, _ in examples})
+    return examples, corpus
+
+
+def train_classifier(examples, corpus=(), mapping_path=DEFAULT_MAPPING_PATH):
+    """ Réapprend le classifieur sur le mapping en vigueur et les descriptions données, puis le met en cache. """
+    _, mapping = load_mapping(mapping_path)
+    model = ModuleClassifier.fit(mapping, examples, corpus)
+    model.save(classifier_cache_path(mapping_path), mapping_fingerprint(mapping))
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Réapprend le classifieur des modules à partir des releases déjà étiquetées."
+    )
+    parser.add_argument("masters", nargs="*", help="Fichiers Master relus par les testeurs, dont la colonne 'Module impacté' sert d'étiquette")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Stockage des issues (SQLite)")
+    parser.add_argument("--system", help="Limite les exemples du stockage à un système")
+    parser.add_argument("--no-store", action="store_true", help="N'utilise pas le stockage des issues")
+    args = parser.parse_args()
+
+    store_path = None if args.no_store or not os.path.exists(args.store) else args.store
+    examples, corpus = training_descriptions(store_path, args.masters, args.system)
+    model = train_classifier(examples, corpus)
+    print(f"[INFO] {len(model.examples)} description(s) étiquetée(s), {len(model.corpus)} sans étiquette, "
+          f"{len(model.vocabulary)} terme(s), "
+          f"{len(model.modules)} module(s).")
+    print(f"[SUCCÈS] Classifieur appris et mis en cache (empreinte {model.fingerprint}).")
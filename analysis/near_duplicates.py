@@ -0,0 +1,299 @@
+import sys
+import os
+import re
+import zlib
+import sqlite3
+import hashlib
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.issue_store import DEFAULT_STORE_PATH, bump_generation
+
+# Colonne ajoutée aux feuilles du Master
+DUPLICATES_COLUMN = "Doublons potentiels"
+
+# MinHash : 128 permutations réparties en 32 bandes de 4 lignes pour le LSH.
+# Deux descriptions de similarité de Jaccard 0,5 partagent au moins une bande dans 87 % des cas, 0,7 dans 99,9 %.
+NUM_PERM = 128
+BANDS = 32
+SHINGLE_SIZE = 5            # Shingles de 5 caractères : robustes aux reformulations légères
+SIMILARITY_THRESHOLD = 0.5  # Similarité estimée minimale d'un doublon potentiel
+MAX_MATCHES = 3
+SEED = 1
+
+# Feuilles de correctifs : un doublon d'un correctif antérieur y est une régression possible
+REGRESSION_SHEETS = {"Correctifs"}
+
+# Noms de release datés (AAAA-MM, éventuellement suivis d'un suffixe) : leur ordre alphabétique est chronologique
+DATED_RELEASE_PATTERN = re.compile(r"^\d{4}-\d{2}")
+DATED_RELEASE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]*"
+
+MERSENNE_PRIME = (1 << 61) - 1
+ISSUE_ID_PATTERN = re.compile(r"#?\b[A-Za-z]+-\d+\b")
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9]+")
+
+# Les signatures identiques (même description normalisée) ne sont stockées et indexées qu'une fois
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS minhash_signatures (
+    id INTEGER PRIMARY KEY,
+    system TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    UNIQUE (system, digest)
+);
+CREATE TABLE IF NOT EXISTS minhash_bands (
+    system TEXT NOT NULL,
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    signature_id INTEGER NOT NULL,
+    PRIMARY KEY (system, band, bucket, signature_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS minhash_issues (
+    signature_id INTEGER NOT NULL,
+    system TEXT NOT NULL,
+    release TEXT NOT NULL,
+    type TEXT,
+    issue_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS minhash_issues_signature ON minhash_issues (signature_id);
+CREATE INDEX IF NOT EXISTS minhash_issues_release ON minhash_issues (system, release);
+"""
+
+
+def is_dated_release(release):
+    return bool(DATED_RELEASE_PATTERN.match(str(release)))
+
+
+def normalize_description(text):
+    """ Minuscules, sans accents, sans identifiants d'issues ni ponctuation. """
+    text = ISSUE_ID_PATTERN.sub(" ", str(text))
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return NON_WORD_PATTERN.sub(" ", text).strip()
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """ Ensemble des sous-chaînes de `size` caractères de la description normalisée. """
+    text = normalize_description(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """ Signatures MinHash (`num_perm` permutations universelles, déterministes pour une graine donnée). """
+
+    def __init__(self, num_perm=NUM_PERM, seed=SEED):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        # a * x + b tient sur 64 bits pour des empreintes x de 32 bits
+        self.a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text):
+        values = shingles(text)
+        if not values:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        hashes = np.fromiter((zlib.crc32(value.encode("utf-8")) for value in values), dtype=np.uint64, count=len(values))
+        permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME
+        return (permuted.min(axis=0) & 0xFFFFFFFF).astype(np.uint32)
+
+
+def band_buckets(signature, bands=BANDS):
+    """ Empreinte (entier signé 64 bits) de chaque bande de la signature. """
+    return [
+        int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), "little", signed=True)
+        for band in np.split(signature, bands)
+    ]
+
+
+def signature_digest(signature):
+    return hashlib.blake2b(signature.tobytes(), digest_size=16).hexdigest()
+
+
+def similarities(signature, others):
+    """ Similarités de Jaccard estimées entre une signature et chaque ligne de la matrice `others`. """
+    return (others == signature).mean(axis=1)
+
+
+def format_matches(matches):
+    """ "#SCI-1234 (2024-07, 86 %, régression) ; ..." """
+    return " ; ".join(
+        f"{issue_id} ({release}, {score * 100:.0f} %{', régression' if regression else ''})"
+        for score, issue_id, release, regression in matches
+    )
+
+
+class NearDuplicateIndex:
+    """
+    Index MinHash/LSH persistant (SQLite, dans la base du stockage des issues) des descriptions
+    de toutes les releases traitées. Chaque nouvelle issue n'est comparée qu'aux issues qui partagent
+    avec elle au moins une bande LSH : le coût est quasi linéaire, sans comparaison deux à deux.
+    L'index est mis à jour release par release ; une connexion est ouverte par opération.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, hasher=None, bands=BANDS, threshold=SIMILARITY_THRESHOLD):
+        self.path = path
+        self.hasher = hasher or MinHasher()
+        self.bands = bands
+        self.threshold = threshold
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _signatures(self, sheets):
+        """ Signatures distinctes des descriptions : (liste des signatures, feuille -> indice de signature par ligne). """
+        distinct, positions, by_digest = [], {}, {}
+        for sheet_name, df in sheets.items():
+            positions[sheet_name] = []
+            for description in df["Description"]:
+                signature = self.hasher.signature(description)
+                digest = signature_digest(signature)
+                if digest not in by_digest:
+                    by_digest[digest] = len(distinct)
+                    distinct.append(signature)
+                positions[sheet_name].append(by_digest[digest])
+        return distinct, positions
+
+    def find_duplicates(self, system, release, sheets, max_matches=MAX_MATCHES):
+        """
+        Cherche, pour chaque issue des feuilles (nom -> DataFrame), ses doublons probables dans les releases
+        antérieures déjà indexées du même système : autre ID, description identique ou reformulée.
+        L'antériorité repose sur les noms de release datés (AAAA-MM) : une release datée n'est comparée
+        qu'aux releases datées de nom inférieur. Une release au nom non daté (envoi d'un fichier
+        quelconque) n'a pas de place dans la chronologie : elle est comparée à toutes les autres releases.
+        Seules les releases déjà indexées sont consultées : un lot traite les releases dans l'ordre
+        de leurs noms (voir `batch.flag_batch_duplicates`).
+        Un correctif qui double un correctif d'une autre release est signalé comme régression possible.
+        Retourne nom de feuille -> Series (indexée comme le DataFrame) des doublons mis en forme.
+        """
+        if is_dated_release(release):
+            earlier, earlier_params = f"release < ? AND release GLOB '{DATED_RELEASE_GLOB}'", (release,)
+        else:
+            print(f"[AVERTISSEMENT] Release '{release}' sans nom daté (AAAA-MM) : "
+                  f"comparaison avec toutes les autres releases de {system}.")
+            earlier, earlier_params = "release != ?", (release,)
+
+        distinct, positions = self._signatures(sheets)
+        wanted = [
+            (local, band, bucket)
+            for local, signature in enumerate(distinct)
+            for band, bucket in enumerate(band_buckets(signature, self.bands))
+        ]
+
+        with self._connect() as connection:
+            connection.execute("CREATE TEMP TABLE wanted (local INTEGER, band INTEGER, bucket INTEGER)")
+            connection.executemany("INSERT INTO wanted VALUES (?, ?, ?)", wanted)
+            connection.execute(
+                """
+                CREATE TEMP TABLE candidates AS
+                SELECT DISTINCT wanted.local, b.signature_id
+                FROM wanted JOIN minhash_bands AS b
+                  ON b.system = ? AND b.band = wanted.band AND b.bucket = wanted.bucket
+                """,
+                (system,),
+            )
+            pairs = connection.execute("SELECT local, signature_id FROM candidates").fetchall()
+            stored = dict(connection.execute(
+                "SELECT id, signature FROM minhash_signatures WHERE id IN (SELECT signature_id FROM candidates)"
+            ).fetchall())
+            issues = {}
+            for signature_id, issue_id, other_release, other_type in connection.execute(
+                f"""
+                SELECT signature_id, issue_id, release, type FROM minhash_issues
+                WHERE system = ? AND {earlier} AND signature_id IN (SELECT signature_id FROM candidates)
+                """,
+                (system, *earlier_params),
+            ):
+                issues.setdefault(signature_id, []).append((issue_id, other_release, other_type))
+
+        # Similarité estimée de chaque signature de la release avec ses candidats, calculée par lot
+        candidates = {}
+        for local, signature_id in pairs:
+            if signature_id in issues:
+                candidates.setdefault(local, []).append(signature_id)
+        scored = {}
+        for local, signature_ids in candidates.items():
+            others = np.vstack([np.frombuffer(stored[signature_id], dtype=np.uint32) for signature_id in signature_ids])
+            scores = similarities(distinct[local], others)
+            scored[local] = [(float(score), signature_id) for score, signature_id in zip(scores, signature_ids) if score >= self.threshold]
+
+        results = {}
+        for sheet_name, df in sheets.items():
+            values = []
+            for issue_id, local in zip(df["ID"], positions[sheet_name]):
+                found = [
+                    (score, other_id, other_release, sheet_name in REGRESSION_SHEETS and other_type in REGRESSION_SHEETS)
+                    for score, signature_id in scored.get(local, [])
+                    for other_id, other_release, other_type in issues[signature_id]
+                    if other_id != str(issue_id)  # Même issue reprise telle quelle d'une release à l'autre
+                ]
+                # Les plus similaires d'abord, puis les releases les plus récentes (tris stables)
+                found.sort(key=lambda match: (match[2], match[1]), reverse=True)
+                found.sort(key=lambda match: match[0], reverse=True)
+                values.append(format_matches(found[:max_matches]))
+            results[sheet_name] = pd.Series(values, index=df.index, dtype=object)
+        return results
+
+    def add_release(self, system, release, sheets):
+        """ (Ré)indexe les descriptions d'une release ; les issues déjà indexées pour cette release sont remplacées. """
+        distinct, positions = self._signatures(sheets)
+        with self._connect() as connection:
+            connection.execute("DELETE FROM minhash_issues WHERE system = ? AND release = ?", (system, release))
+            signature_ids = []
+            for signature in distinct:
+                digest = signature_digest(signature)
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO minhash_signatures (system, digest, signature) VALUES (?, ?, ?)",
+                    (system, digest, signature.tobytes()),
+                )
+                if cursor.rowcount:
+                    signature_id = cursor.lastrowid
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO minhash_bands VALUES (?, ?, ?, ?)",
+                        [(system, band, bucket, signature_id) for band, bucket in enumerate(band_buckets(signature, self.bands))],
+                    )
+                else:
+                    signature_id = connection.execute(
+                        "SELECT id FROM minhash_signatures WHERE system = ? AND digest = ?", (system, digest)
+                    ).fetchone()[0]
+                signature_ids.append(signature_id)
+
+            rows = [
+                (signature_ids[local], system, release, sheet_name, str(issue_id))
+                for sheet_name, df in sheets.items()
+                for issue_id, local in zip(df["ID"], positions[sheet_name])
+            ]
+            connection.executemany("INSERT INTO minhash_issues VALUES (?, ?, ?, ?, ?)", rows)
+            # Les doublons signalés dans les Master produits ensuite peuvent changer
+            bump_generation(connection, system)
+        return len(rows)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("[ERREUR] Arguments manquants. Utilisation : python near_duplicates.py <système> <fichier_Master.xlsx>")
+        sys.exit(1)
+
+    system, master_file = sys.argv[1], sys.argv[2]
+    release = os.path.basename(master_file).replace("_Master.xlsx", "")
+    sheets = {
+        sheet_name: df.dropna(subset=["ID"])
+        for sheet_name, df in pd.read_excel(master_file, sheet_name=None).items()
+        if {"ID", "Description"}.issubset(df.columns)
+    }
+    index = NearDuplicateIndex()
+    for sheet_name, duplicates in index.find_duplicates(system, release, sheets).items():
+        df = sheets[sheet_name]
+        for issue_id, value in zip(df["ID"], duplicates):
+            if value:
+                print(f"[INFO] {sheet_name} {issue_id} : {value}")
+    print(f"[SUCCÈS] Recherche des doublons terminée pour '{master_file}'.")
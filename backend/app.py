@@ -1,56 +1,322 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from werkzeug.utils import secure_filename
 import os
-import subprocess
+import sys
+import json
+import time
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+
+# Permet l'import du pipeline depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import SHEETS, run_pipeline, pipeline_version
+from analysis.categorize_impacts import mapping_version
+from backend.result_cache import ResultCache, digest_key
+from backend.upload_stream import (
+    DEFAULT_MAX_BYTES as UPLOAD_MAX_BYTES, MAX_FIELD_BYTES, StreamingUpload, keep_uploads_enabled, stream_uploads_enabled
+)
+from backend.results_store import ResultsStore
+from backend.jobs import JobQueue, QueueFullError
+from processors.issue_store import IssueStore
+from processors.workspace import RunWorkspace
+from backend.search_index import SearchIndex
+from analysis.impact_dashboard import DIMENSIONS, ImpactCube
+from backend.metrics import MetricsRegistry
+from backend.worker_pool import WorkerPool, DEFAULT_POOL_SIZE
+from extractors.registry import available_systems, chunk_frames, parse_chunks
 
 app = Flask(__name__)
 CORS(app)  # Active CORS pour permettre les requêtes depuis React
 
-UPLOAD_FOLDER = "backend/uploads"
-RESULTS_FOLDER = "backend/results"
+# Chemins absolus : send_file résout un chemin relatif depuis le dossier de l'application (backend/)
+UPLOAD_FOLDER = os.path.abspath("backend/uploads")
+RESULTS_FOLDER = os.path.abspath("backend/results")
+CACHE_FOLDER = os.path.join(RESULTS_FOLDER, "cache")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(RESULTS_FOLDER, exist_ok=True)
 
+result_cache = ResultCache(CACHE_FOLDER)
+results_store = ResultsStore(RESULTS_FOLDER)
+job_queue = JobQueue()
+issue_store = IssueStore()
+search_index = SearchIndex()
+impact_cube = ImpactCube(issue_store.path)
+metrics = MetricsRegistry()
+# Les traitements s'exécutent dans des processus préchauffés (PATCHNOTES_WORKER_PROCESSES=0 : dans le serveur)
+worker_pool = WorkerPool(store_path=issue_store.path, index_path=search_index.path) if DEFAULT_POOL_SIZE > 0 else None
+
 ALLOWED_EXTENSIONS = {"html"}
-SYSTEMS = {"Sciforma", "BC"}
+SYSTEMS = set(available_systems())
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def result_key(digest, system):
+    """
+    Clé du cache des résultats : contenu envoyé (empreinte `hashlib`), système, versions du mapping
+    et du code, et génération du stockage des issues ('Test Status' importés, doublons indexés).
+    """
+    return digest_key(digest, system, mapping_version(), pipeline_version(), issue_store.generation(system))
+
+def process_upload(job, workspace, filepath, system, digest, frames=None):
+    """
+    Exécute le pipeline pour un fichier envoyé (dans un worker de la file), dans le dossier de travail
+    de l'exécution : des envois simultanés, même de fichiers de même nom, ne partagent aucun fichier.
+    Le Master est mis en cache depuis ce dossier puis publié atomiquement dans le dossier des résultats,
+    sous un nom contenant l'identifiant de l'exécution.
+    `frames` contient la release déjà extraite pendant la réception de l'envoi ; `filepath` ne sert alors
+    qu'à nommer les résultats. `digest` est l'empreinte de l'envoi (voir `result_key`).
+    """
+    def on_event(event):
+        event = event.to_dict() if hasattr(event, "to_dict") else event
+        if event["event"] == "start":
+            job.progress(event["label"], event["step"], event["total"])
+        job.stage_event(event)
+        metrics.record_stage(event)
+
+    # Les issues sont déjà dans le stockage et l'index de recherche : les fichiers intermédiaires,
+    # restés dans le dossier de travail, sont supprimés avec lui
+    with workspace:
+        start = time.perf_counter()
+        try:
+            if worker_pool is not None:
+                result = worker_pool.run(filepath, system, RESULTS_FOLDER, on_event=on_event, frames=frames,
+                                         workspace=workspace)
+                master_file, incremental = result["master_file"], result["incremental"]
+            else:
+                result = run_pipeline(filepath, system, RESULTS_FOLDER, store=issue_store, search_index=search_index,
+                                      on_event=on_event, frames=frames, workspace=workspace)
+                master_file, incremental = result.master_file, result.incremental
+            if not os.path.exists(master_file):
+                raise RuntimeError("Fichier Master non généré")
+        except Exception:
+            metrics.record_run(time.perf_counter() - start, success=False)
+            raise
+        metrics.record_run(time.perf_counter() - start, success=True)
+
+        # Clé calculée après le traitement : la release vient d'être ajoutée à l'index des doublons
+        result_cache.put(result_key(digest, system), master_file)
+        # Publié sous un nom propre à l'exécution : deux envois simultanés de même nom ont chacun leur Master
+        master_file = workspace.publish(master_file, workspace.unique_name(master_file))
+    results_store.register(master_file)
+    return {
+        "download_url": f"/download/{os.path.basename(master_file)}",
+        "run_id": workspace.run_id,
+        "incremental": incremental,
+    }
+
+def write_upload(chunks, filepath):
+    """ Écrit un fichier envoyé (blocs de texte) pour qu'il soit relu par le pipeline. """
+    with open(filepath, "w", encoding="utf-8") as output:
+        output.writelines(chunks)
+
+def reject_upload(workspace, message, status):
+    """ Refuse un envoi : son dossier de travail, s'il a été créé, est supprimé. """
+    if workspace is not None:
+        workspace.close()
+    return jsonify({"error": message}), status
+
 @app.route("/upload", methods=["POST"])
 def upload_file():
-    if "file" not in request.files or "system" not in request.form: 
+    """
+    Reçoit un envoi en flux : le fichier est haché, borné en taille et, par défaut, analysé
+    au fil de sa réception (voir `backend.upload_stream`) ; le pipeline part de la release déjà extraite.
+    Le fichier n'est écrit dans le dossier des envois (en arrière-plan) qu'avec PATCHNOTES_KEEP_UPLOADS=1,
+    ou, avec PATCHNOTES_STREAM_UPLOADS=0, dans le dossier de travail de l'exécution pour être relu
+    par le pipeline après la réception.
+    """
+    boundary = request.mimetype_params.get("boundary")
+    if request.mimetype != "multipart/form-data" or not boundary:
         return jsonify({"error": "Fichier HTML et système requis"}), 400
-    
-    file = request.files["file"]
-    system = request.form["system"]
-    
-    if file.filename == "" or not allowed_file(file.filename) or system not in SYSTEMS:
-        return jsonify({"error": "Fichier invalide ou système non reconnu"}), 400
-    
-    filename = secure_filename(file.filename)
-    filepath = os.path.join(UPLOAD_FOLDER, filename)
-    file.save(filepath)
-    
+    if request.content_length and request.content_length > UPLOAD_MAX_BYTES + MAX_FIELD_BYTES:
+        return jsonify({"error": f"Fichier trop volumineux (limite : {UPLOAD_MAX_BYTES // (1024 * 1024)} Mo)"}), 413
+
+    start = time.perf_counter()
+    streaming = stream_uploads_enabled()
+    upload = StreamingUpload(request.stream, boundary.encode("latin-1"), UPLOAD_MAX_BYTES,
+                             keep_raw=streaming and keep_uploads_enabled())
+    records = None
+    frames = None
+    workspace = None
     try:
-        subprocess.run(["python", "main.py", filepath, system], check=True, text=True, encoding="utf-8")
-    except subprocess.CalledProcessError as e:
-        return jsonify({"error": f"Erreur lors du traitement : {e}"}), 500
+        if not upload.read_until_file():
+            return jsonify({"error": "Fichier HTML et système requis"}), 400
+        filename = secure_filename(upload.filename or "")
+        if filename == "" or not allowed_file(filename):
+            return jsonify({"error": "Fichier invalide ou système non reconnu"}), 400
+
+        # Le système est normalement envoyé avant le fichier ; sinon le fichier est gardé en mémoire
+        # jusqu'à la fin de l'envoi avant d'être analysé
+        chunks = upload.iter_text()
+        if "system" not in upload.fields:
+            chunks = list(chunks)
+            upload.finish()
+        system = upload.fields.get("system")
+        if system is None:
+            return jsonify({"error": "Fichier HTML et système requis"}), 400
+        if system not in SYSTEMS:
+            return jsonify({"error": "Fichier invalide ou système non reconnu"}), 400
+
+        workspace = RunWorkspace(RESULTS_FOLDER, {"html_file": filename, "system": system, "source": "upload"})
+        filepath = workspace.path(filename)
+        if streaming:
+            # Seule l'analyse suit la réception : les DataFrames ne sont construits qu'en l'absence de cache
+            records = parse_chunks(chunks, system)
+        else:
+            write_upload(chunks, filepath)
+        upload.finish()
+    except RequestEntityTooLarge as e:
+        return reject_upload(workspace, e.description, 413)
+    except ValueError as e:  # Corps multipart, encodage ou contenu de la page invalides
+        return reject_upload(workspace, f"Fichier invalide : {e}", 400)
+    metrics.observe("patchnotes_upload_duration_seconds", time.perf_counter() - start)
+    metrics.inc("patchnotes_upload_bytes_total", upload.size)
+    if upload.raw is not None:
+        upload.save_raw(os.path.join(UPLOAD_FOLDER, filename))
+
+    # Un fichier identique déjà traité avec le même mapping, le même code et le même état du stockage
+    # est servi depuis le cache
+    cache_key = result_key(upload.digest, system)
+    cached_master = result_cache.get(cache_key)
+    metrics.inc("patchnotes_cache_requests_total", result="hit" if cached_master else "miss")
+    if cached_master:
+        workspace.close()
+        return jsonify({
+            "message": "Traitement réussi (résultat en cache)",
+            "download_url": f"/download/cache/{cache_key}/{os.path.basename(cached_master)}"
+        })
+    if records is not None:
+        try:
+            frames = chunk_frames(records, system, SHEETS.values(), filename)
+        except ValueError as e:  # Sections attendues absentes de la page
+            return reject_upload(workspace, f"Fichier invalide : {e}", 400)
     
-    master_file = filename.rsplit('.', 1)[0] + "_Master.xlsx"
-    master_path = os.path.join(RESULTS_FOLDER, master_file)
-    if not os.path.exists(master_path):
-        return jsonify({"error": "Fichier Master non généré"}), 500
+    # Le traitement est mis en file : la réponse est immédiate, le suivi se fait via /jobs/<id>
+    try:
+        job = job_queue.submit(process_upload, workspace, filepath, system, upload.digest, frames, description=filename)
+    except QueueFullError as e:
+        return reject_upload(workspace, f"Serveur occupé : {e}", 503)
     
-    return jsonify({"message": "Traitement réussi", "download_url": f"/download/{master_file}"})
+    return jsonify({
+        "message": "Traitement en file d'attente",
+        "job_id": job.id,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events"
+    }), 202
+
+@app.route("/search", methods=["GET"])
+def search():
+    """
+    Recherche plein texte dans toutes les releases traitées.
+    Paramètres : q, module, section, release, system, type, page, per_page.
+    """
+    try:
+        page = int(request.args.get("page", 1))
+        per_page = int(request.args.get("per_page", 20))
+    except ValueError:
+        return jsonify({"error": "Paramètres de pagination invalides"}), 400
+
+    filters = {name: request.args.get(name) for name in ("module", "section", "release", "system", "type")}
+    return jsonify(search_index.search(request.args.get("q", ""), page, per_page, **filters))
+
+def cube_filters():
+    """ Filtres du cube passés en paramètres (une dimension peut être répétée : release=2024-08&release=2024-09). """
+    return {name: request.args.getlist(name) for name in DIMENSIONS if request.args.getlist(name)}
+
+@app.route("/dashboard/cube", methods=["GET"])
+def dashboard_cube():
+    """
+    Agrégats du cube des impacts pour le tableau de bord.
+    Paramètres : group_by (dimensions séparées par des virgules) et un filtre par dimension
+    (system, release, type, section, module, test_status).
+    """
+    group_by = [name.strip() for name in request.args.get("group_by", "").split(",") if name.strip()]
+    try:
+        return jsonify(impact_cube.query(group_by, **cube_filters()))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/dashboard/dimensions", methods=["GET"])
+def dashboard_dimensions():
+    """ Valeurs disponibles de chaque dimension du cube (mêmes filtres que /dashboard/cube). """
+    return jsonify(impact_cube.dimensions(**cube_filters()))
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """ Métriques du pipeline (durées par étape, lignes traitées, mémoire) au format Prometheus. """
+    if worker_pool is not None:
+        metrics.record_pool(worker_pool.stats)
+    metrics.record_results(results_store.usage())
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Traitement non trouvé"}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """ Flux Server-Sent Events de la progression d'un traitement, étape par étape. """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Traitement non trouvé"}), 404
+
+    def stream():
+        sent = 0
+        while True:
+            events = job.wait_events(sent)
+            if not events:
+                yield ": keep-alive\n\n"  # Commentaire SSE pour garder la connexion ouverte
+            for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            sent += len(events)
+            if job.finished and sent >= len(job.events):
+                break
+
+    return Response(stream_with_context(stream()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def send_result(path):
+    """
+    Envoie un fichier de résultat avec un ETag fort (empreinte du contenu) : un client qui renvoie
+    cet ETag dans `If-None-Match` reçoit un 304 sans corps, sans que le fichier soit relu.
+    """
+    etag = results_store.etag(path)
+    results_store.touch(path)
+    if request.if_none_match.contains(etag):
+        metrics.inc("patchnotes_download_requests_total", status="304")
+        response = Response(status=304)
+        response.set_etag(etag)
+    else:
+        metrics.inc("patchnotes_download_requests_total", status="200")
+        response = send_file(path, as_attachment=True, etag=etag)
+    # Le client garde le fichier mais revalide à chaque utilisation
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 @app.route("/download/<filename>", methods=["GET"])
 def download_file(filename):
-    path = os.path.join(RESULTS_FOLDER, filename)
+    path = results_store.path(secure_filename(filename))
+    if path:
+        return send_result(path)
+    return jsonify({"error": "Fichier non trouvé"}), 404
+
+@app.route("/download/cache/<cache_key>/<filename>", methods=["GET"])
+def download_cached_file(cache_key, filename):
+    path = os.path.join(CACHE_FOLDER, secure_filename(cache_key), secure_filename(filename))
     if os.path.exists(path):
-        return send_file(path, as_attachment=True)
+        return send_result(path)
     return jsonify({"error": "Fichier non trouvé"}), 404
 
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=5000)
+    debug = True
+    # Nettoyage au démarrage : intermédiaires abandonnés et résultats au-delà des limites de conservation
+    results_store.cleanup_intermediates()
+    results_store.enforce()
+    # Avec le rechargement automatique, seul le processus qui sert les requêtes démarre les workers
+    if worker_pool is not None and (not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true"):
+        worker_pool.start()
+    app.run(debug=debug, host="0.0.0.0", port=5000)
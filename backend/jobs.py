@@ -0,0 +1,132 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Nombre de pipelines exécutés en parallèle et nombre maximal de traitements en attente
+DEFAULT_WORKERS = int(os.environ.get("PATCHNOTES_WORKERS", 2))
+DEFAULT_MAX_PENDING = int(os.environ.get("PATCHNOTES_MAX_PENDING", 20))
+# Durée de conservation (secondes) des traitements terminés
+JOB_RETENTION = 3600
+
+PENDING = "en attente"
+RUNNING = "en cours"
+DONE = "terminé"
+FAILED = "échec"
+
+
+class QueueFullError(Exception):
+    """ Levée quand trop de traitements sont déjà en attente. """
+
+
+class Job:
+    """ Traitement soumis à la file : statut, progression par étape et résultat. """
+
+    def __init__(self, description=None):
+        self.id = uuid.uuid4().hex
+        self.description = description
+        self.status = PENDING
+        self.created_at = time.time()
+        self.finished_at = None
+        self.events = []
+        self.result = None
+        self.error = None
+        self._condition = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def _publish(self, event, status=None, **data):
+        # Le statut change sous le même verrou que la publication : un lecteur qui voit
+        # le traitement terminé a forcément accès à son dernier événement
+        with self._condition:
+            if status:
+                self.status = status
+            self.events.append(dict(data, event=event, time=time.time()))
+            self._condition.notify_all()
+
+    def progress(self, stage, step, total):
+        """ Callback de progression transmis à `run_pipeline`. """
+        self._publish("progress", stage=stage, step=step, total=total, percent=int(step / total * 100))
+
+    def stage_event(self, event):
+        """ Callback `on_event` de `run_pipeline` : publie les mesures de chaque étape (`StageEvent` ou son dictionnaire). """
+        data = event.to_dict() if hasattr(event, "to_dict") else dict(event)
+        data["phase"] = data.pop("event")  # start, end ou error
+        self._publish("stage", **data)
+
+    def wait_events(self, start, timeout=15):
+        """
+        Retourne les événements à partir de l'indice `start`, en attendant au plus
+        `timeout` secondes qu'il en arrive un nouveau.
+        """
+        with self._condition:
+            if len(self.events) <= start and not self.finished:
+                self._condition.wait(timeout)
+            return self.events[start:]
+
+    def to_dict(self):
+        with self._condition:
+            last_progress = next((e for e in reversed(self.events) if e["event"] == "progress"), None)
+            return {
+                "job_id": self.id,
+                "description": self.description,
+                "status": self.status,
+                "progress": last_progress,
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class JobQueue:
+    """
+    File de traitements servie par un pool borné de workers.
+    `submit` retourne immédiatement ; la fonction soumise reçoit le `Job` en premier argument.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pipeline")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def pending_count(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status == PENDING)
+
+    def _prune(self):
+        limit = time.time() - JOB_RETENTION
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < limit]:
+                del self._jobs[job_id]
+
+    def submit(self, func, *args, description=None):
+        self._prune()
+        if self.pending_count() >= self.max_pending:
+            raise QueueFullError(f"{self.max_pending} traitements sont déjà en attente.")
+
+        job = Job(description)
+        with self._lock:
+            self._jobs[job.id] = job
+        job._publish("queued")
+        self._executor.submit(self._run, job, func, args)
+        return job
+
+    def _run(self, job, func, args):
+        job._publish("started", status=RUNNING)
+        try:
+            job.result = func(job, *args)
+            job.finished_at = time.time()
+            job._publish("done", status=DONE, result=job.result)
+        except Exception as e:  # Une erreur de traitement ne doit pas arrêter le worker
+            job.error = str(e)
+            job.finished_at = time.time()
+            job._publish("failed", status=FAILED, error=job.error)
+            print(f"[ERREUR] Traitement {job.id} en échec : {e}")
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
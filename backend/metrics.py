@@ -0,0 +1,117 @@
+import threading
+
+# Bornes (secondes) des histogrammes de durée
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Nom -> (type, description) des métriques exposées
+METRICS = {
+    "patchnotes_stage_duration_seconds": ("histogram", "Durée de chaque étape du pipeline."),
+    "patchnotes_stage_failures_total": ("counter", "Nombre d'étapes du pipeline en échec."),
+    "patchnotes_stage_rows_in_total": ("counter", "Lignes reçues par chaque étape du pipeline."),
+    "patchnotes_stage_rows_out_total": ("counter", "Lignes produites par chaque étape du pipeline."),
+    "patchnotes_pipeline_duration_seconds": ("histogram", "Durée totale d'un traitement."),
+    "patchnotes_pipeline_runs_total": ("counter", "Traitements exécutés, par résultat."),
+    "patchnotes_cache_requests_total": ("counter", "Envois servis ou non depuis le cache des résultats."),
+    "patchnotes_peak_rss_megabytes": ("gauge", "Pic de mémoire résidente du processus (Mo)."),
+    "patchnotes_worker_jobs_total": ("counter", "Traitements exécutés par les processus de travail."),
+    "patchnotes_worker_restarts_total": ("counter", "Processus de travail remplacés, par motif."),
+    "patchnotes_worker_warmup_seconds": ("gauge", "Durée du dernier préchauffage d'un processus de travail."),
+    "patchnotes_results_files": ("gauge", "Fichiers conservés dans le dossier des résultats."),
+    "patchnotes_results_bytes": ("gauge", "Taille du dossier des résultats (octets)."),
+    "patchnotes_download_requests_total": ("counter", "Téléchargements, complets ou non modifiés (304)."),
+    "patchnotes_upload_duration_seconds": ("histogram", "Durée de réception d'un envoi (analyse en flux comprise)."),
+    "patchnotes_upload_bytes_total": ("counter", "Octets reçus dans les fichiers envoyés."),
+}
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Agrège les événements d'étapes du pipeline et les traitements du backend,
+    et les expose au format texte Prometheus.
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._values = {name: {} for name in METRICS}
+
+    def inc(self, name, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[name][key] = self._values[name].get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._values[name][tuple(sorted(labels.items()))] = value
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histogram = self._values[name].setdefault(key, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram["buckets"][index] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def record_stage(self, event):
+        """ Prend en compte un `StageEvent` du pipeline (ou son dictionnaire). """
+        event = event.to_dict() if hasattr(event, "to_dict") else event
+        if event["event"] == "start":
+            return
+        if event["event"] == "error":
+            self.inc("patchnotes_stage_failures_total", stage=event["stage"])
+        else:
+            self.observe("patchnotes_stage_duration_seconds", event["duration"], stage=event["stage"])
+            if event.get("rows_in") is not None:
+                self.inc("patchnotes_stage_rows_in_total", event["rows_in"], stage=event["stage"])
+            if event.get("rows_out") is not None:
+                self.inc("patchnotes_stage_rows_out_total", event["rows_out"], stage=event["stage"])
+        if event.get("peak_rss_mb") is not None:
+            self.set("patchnotes_peak_rss_megabytes", event["peak_rss_mb"])
+
+    def record_run(self, duration, success):
+        self.observe("patchnotes_pipeline_duration_seconds", duration)
+        self.inc("patchnotes_pipeline_runs_total", status="ok" if success else "error")
+
+    def record_pool(self, stats):
+        """ Reprend les compteurs d'un `WorkerPool` (traitements, recyclages, crashs, préchauffage). """
+        self.set("patchnotes_worker_jobs_total", stats["jobs"])
+        self.set("patchnotes_worker_restarts_total", stats["recycled"], reason="recycled")
+        self.set("patchnotes_worker_restarts_total", stats["crashed"], reason="crashed")
+        if stats["warmup_seconds"]:
+            self.set("patchnotes_worker_warmup_seconds", stats["warmup_seconds"][-1])
+
+    def record_results(self, usage):
+        """ Reprend l'occupation du dossier des résultats (voir `ResultsStore.usage`). """
+        self.set("patchnotes_results_files", usage["files"])
+        self.set("patchnotes_results_bytes", usage["bytes"])
+
+    def render(self):
+        """ Texte au format d'exposition Prometheus (version 0.0.4). """
+        lines = []
+        with self._lock:
+            for name, (metric_type, description) in METRICS.items():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in sorted(self._values[name].items()):
+                    if metric_type != "histogram":
+                        lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+                        continue
+                    for bound, count in zip(self.buckets, value["buckets"]):
+                        lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {count}")
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {value['count']}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {format_value(value['sum'])}")
+                    lines.append(f"{name}_count{format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,87 @@
+import os
+import shutil
+import threading
+
+# Taille maximale par défaut du cache (octets), surchargeable par variable d'environnement
+DEFAULT_MAX_BYTES = int(os.environ.get("PATCHNOTES_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+
+def digest_key(digest, *versions):
+    """
+    Clé de cache : empreinte SHA-256 (objet `hashlib`) des octets envoyés, calculée au fil de leur réception,
+    et versions (système, mapping des modules, code du pipeline...) qui déterminent le résultat.
+    La même clé est obtenue pour le même contenu.
+    """
+    digest = digest.copy()
+    for version in versions:
+        digest.update(b"\0" + str(version).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Cache des fichiers Master adressé par contenu.
+    Chaque entrée est un dossier `<clé>/` contenant le Master ; la date de modification
+    du dossier sert d'horodatage d'accès pour l'éviction LRU bornée en taille.
+    """
+
+    def __init__(self, folder, max_bytes=DEFAULT_MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.folder, key)
+
+    def get(self, key):
+        """ Retourne le chemin du Master en cache pour cette clé, ou None. """
+        entry_dir = self._entry_dir(key)
+        try:
+            filenames = os.listdir(entry_dir)
+        except FileNotFoundError:
+            return None
+        if not filenames:
+            return None
+        os.utime(entry_dir)  # Marque l'entrée comme récemment utilisée
+        return os.path.join(entry_dir, filenames[0])
+
+    def put(self, key, master_path):
+        """ Ajoute une copie du Master au cache puis applique l'éviction. Retourne le chemin en cache. """
+        entry_dir = self._entry_dir(key)
+        tmp_dir = f"{entry_dir}.tmp-{threading.get_ident()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+        shutil.copy2(master_path, os.path.join(tmp_dir, os.path.basename(master_path)))
+
+        with self._lock:
+            if os.path.exists(entry_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            else:
+                os.replace(tmp_dir, entry_dir)
+            os.utime(entry_dir)
+            self._evict(keep=key)
+
+        return self.get(key)
+
+    def _entries(self):
+        """ Liste (horodatage, taille, clé) des entrées, de la moins récemment utilisée à la plus récente. """
+        entries = []
+        for key in os.listdir(self.folder):
+            entry_dir = self._entry_dir(key)
+            if ".tmp-" in key or not os.path.isdir(entry_dir):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(entry_dir) if entry.is_file())
+            entries.append((os.stat(entry_dir).st_mtime, size, key))
+        return sorted(entries)
+
+    def _evict(self, keep=None):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= size
+            print(f"[INFO] Entrée de cache '{key}' supprimée (éviction LRU).")
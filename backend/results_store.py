@@ -0,0 +1,154 @@
+import os
+import time
+import hashlib
+import threading
+
+from pipeline import SHEETS
+from processors.intermediate import INTERMEDIATE_EXTENSION
+from processors.workspace import cleanup_runs
+
+# Taille maximale (octets) et durée de conservation (jours sans téléchargement) des résultats,
+# surchargeables par variable d'environnement
+DEFAULT_MAX_BYTES = int(os.environ.get("PATCHNOTES_RESULTS_MAX_BYTES", 500 * 1024 * 1024))
+DEFAULT_MAX_AGE_DAYS = float(os.environ.get("PATCHNOTES_RESULTS_MAX_AGE_DAYS", 30))
+
+# Un fichier modifié depuis moins longtemps (secondes) est peut-être en cours d'écriture : il n'est jamais supprimé
+WRITE_GRACE_SECONDS = 600
+
+# Un dossier de travail d'exécution plus ancien (secondes) est considéré comme abandonné
+ABANDONED_RUN_SECONDS = 6 * 3600
+
+# Fichiers intermédiaires par feuille (Arrow, et Excel pour les traitements antérieurs)
+INTERMEDIATE_SUFFIXES = tuple(
+    f"_{sheet_name.lower()}{extension}" for sheet_name in SHEETS for extension in (INTERMEDIATE_EXTENSION, ".feather", ".xlsx")
+)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_etag(path):
+    """ ETag fort : empreinte SHA-256 du contenu du fichier. """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_intermediate(filename):
+    return filename.endswith(INTERMEDIATE_SUFFIXES)
+
+
+def is_temporary(filename):
+    """ Fichier temporaire d'une écriture atomique (voir `processors.intermediate`). """
+    return ".tmp" in filename
+
+
+class ResultsStore:
+    """
+    Dossier des résultats géré : les fichiers Master sont conservés tant qu'ils sont téléchargés
+    (au plus `max_age_days` jours sans téléchargement) et dans la limite de `max_bytes`,
+    les moins récemment téléchargés étant supprimés en premier. La date d'accès des fichiers
+    sert d'horodatage d'utilisation ; les sous-dossiers (cache des résultats) ne sont pas concernés.
+    Les ETags (empreinte du contenu) sont calculés une fois par version de fichier.
+    """
+
+    def __init__(self, folder, max_bytes=DEFAULT_MAX_BYTES, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.folder = os.path.abspath(folder)
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 24 * 3600
+        self._lock = threading.Lock()
+        self._etags = {}  # Chemin -> (taille, date de modification, ETag)
+        os.makedirs(self.folder, exist_ok=True)
+
+    def path(self, filename):
+        """ Chemin d'un fichier du dossier, ou None s'il n'existe pas. """
+        path = os.path.join(self.folder, os.path.basename(filename))
+        return path if os.path.isfile(path) else None
+
+    def etag(self, path):
+        """ ETag du fichier, recalculé seulement si sa taille ou sa date de modification ont changé. """
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._etags.get(path)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+        etag = file_etag(path)
+        with self._lock:
+            self._etags[path] = (stat.st_size, stat.st_mtime_ns, etag)
+        return etag
+
+    def touch(self, path):
+        """ Marque un fichier comme récemment utilisé (date d'accès), sans changer sa date de modification. """
+        try:
+            os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+        except OSError:
+            pass
+
+    def register(self, master_file):
+        """ Enregistre un Master produit : son ETag est calculé, puis les limites du dossier sont appliquées. """
+        self.etag(master_file)
+        self.touch(master_file)
+        return self.enforce(keep=master_file)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            self._etags.pop(path, None)
+        return True
+
+    def cleanup_intermediates(self, now=None):
+        """
+        Passe de nettoyage : supprime les fichiers intermédiaires (et temporaires abandonnés)
+        qui ne sont plus en cours d'écriture, ainsi que les dossiers de travail d'exécutions interrompues
+        (voir `processors.workspace`). Retourne le nombre de fichiers et dossiers supprimés.
+        """
+        now = now or time.time()
+        removed = 0
+        for entry in os.scandir(self.folder):
+            if not entry.is_file() or not (is_intermediate(entry.name) or is_temporary(entry.name)):
+                continue
+            if now - entry.stat().st_mtime >= WRITE_GRACE_SECONDS and self._remove(entry.path):
+                removed += 1
+        removed += cleanup_runs(self.folder, ABANDONED_RUN_SECONDS, now)
+        if removed:
+            print(f"[INFO] {removed} fichier(s) intermédiaire(s) ou dossier(s) de travail supprimé(s) de '{self.folder}'.")
+        return removed
+
+    def _entries(self):
+        """ Liste (dernière utilisation, date de modification, taille, chemin) des fichiers, du moins au plus récemment utilisé. """
+        entries = []
+        for entry in os.scandir(self.folder):
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((max(stat.st_atime, stat.st_mtime), stat.st_mtime, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def enforce(self, keep=None, now=None):
+        """
+        Applique la durée de conservation puis la taille maximale (éviction des fichiers
+        les moins récemment utilisés). Retourne la liste des fichiers supprimés.
+        """
+        now = now or time.time()
+        keep = os.path.abspath(keep) if keep else None
+        entries = self._entries()
+        total = sum(size for _, _, size, _ in entries)
+        removed = []
+        for used, modified, size, path in entries:
+            if os.path.abspath(path) == keep or now - modified < WRITE_GRACE_SECONDS:
+                continue
+            expired = now - used > self.max_age
+            if (expired or total > self.max_bytes) and self._remove(path):
+                total -= size
+                removed.append(path)
+                reason = "conservation expirée" if expired else "taille maximale atteinte"
+                print(f"[INFO] Résultat '{os.path.basename(path)}' supprimé ({reason}).")
+        return removed
+
+    def usage(self):
+        """ Nombre et taille totale des fichiers du dossier. """
+        entries = self._entries()
+        return {"files": len(entries), "bytes": sum(size for _, _, size, _ in entries)}
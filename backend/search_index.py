@@ -0,0 +1,138 @@
+import sys
+import os
+import glob
+import time
+import sqlite3
+
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.intermediate import INTERMEDIATE_EXTENSION, read_frame
+
+DEFAULT_INDEX_PATH = "backend/search_index.sqlite"
+MAX_PER_PAGE = 100
+
+# Seuls l'ID, la sous-section et la description sont indexés en texte intégral ;
+# les autres colonnes servent de filtres et sont stockées sans être tokenisées.
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS records USING fts5(
+    issue_id,
+    sous_section,
+    description,
+    system UNINDEXED,
+    release UNINDEXED,
+    type UNINDEXED,
+    section UNINDEXED,
+    module UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+FILTERS = ["system", "release", "type", "section", "module"]
+
+
+def build_match_query(query):
+    """ Transforme la saisie utilisateur en requête FTS5 sûre : chaque mot est cherché tel quel. """
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+
+class SearchIndex:
+    """
+    Index de recherche plein texte (SQLite FTS5, classement BM25) de toutes les issues
+    des releases traitées. Une connexion est ouverte par opération.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def index_release(self, system, release, sheets):
+        """
+        (Ré)indexe toutes les lignes d'une release : `sheets` associe un type
+        (nom de feuille) à son DataFrame. Les lignes déjà indexées pour cette release sont remplacées.
+        """
+        rows = []
+        for sheet_type, df in sheets.items():
+            modules = df["Module impacté"] if "Module impacté" in df.columns else [None] * len(df)
+            for issue_id, sous_section, description, section, module in zip(
+                df["ID"], df["Sous-section"], df["Description"], df["Section"], modules
+            ):
+                rows.append((issue_id, sous_section, description, system, release, sheet_type, section, module))
+
+        with self._connect() as connection:
+            connection.execute("DELETE FROM records WHERE system = ? AND release = ?", (system, release))
+            connection.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def search(self, query="", page=1, per_page=20, **filters):
+        """
+        Recherche les issues correspondant à `query` (classées par pertinence BM25),
+        filtrées par système, release, type, section et module, avec pagination.
+        """
+        page = max(int(page), 1)
+        per_page = min(max(int(per_page), 1), MAX_PER_PAGE)
+        start = time.perf_counter()
+
+        conditions, params = [], []
+        match_query = build_match_query(query or "")
+        if match_query:
+            conditions.append("records MATCH ?")
+            params.append(match_query)
+        for name in FILTERS:
+            if filters.get(name):
+                conditions.append(f"{name} = ?")
+                params.append(filters[name])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "ORDER BY bm25(records)" if match_query else "ORDER BY release DESC, rowid"
+        snippet = "snippet(records, -1, '<mark>', '</mark>', '…', 16)" if match_query else "description"
+
+        with self._connect() as connection:
+            total = connection.execute(f"SELECT count(*) FROM records {where}", params).fetchone()[0]
+            rows = connection.execute(
+                f"""
+                SELECT issue_id, sous_section, description, system, release, type, section, module, {snippet}
+                FROM records {where} {order} LIMIT ? OFFSET ?
+                """,
+                params + [per_page, (page - 1) * per_page],
+            ).fetchall()
+
+        columns = ["id", "sous_section", "description", "system", "release", "type", "section", "module", "extrait"]
+        return {
+            "query": query,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "results": [dict(zip(columns, row)) for row in rows],
+            "took_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    def index_results_folder(self, system, results_folder):
+        """ Indexe les releases déjà traitées à partir de leurs fichiers intermédiaires Arrow. """
+        indexed = 0
+        suffix = f"_correctifs{INTERMEDIATE_EXTENSION}"
+        for correctifs_file in sorted(glob.glob(os.path.join(results_folder, f"*{suffix}"))):
+            release = os.path.basename(correctifs_file)[: -len(suffix)]
+            sheets = {"Correctifs": read_frame(correctifs_file)}
+            enhancements_file = os.path.join(results_folder, f"{release}_enhancements{INTERMEDIATE_EXTENSION}")
+            if os.path.exists(enhancements_file):
+                sheets["Enhancements"] = read_frame(enhancements_file)
+            indexed += self.index_release(system, release, sheets)
+            print(f"[INFO] Release '{release}' indexée.")
+        return indexed
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("[ERREUR] Aucun système spécifié. Utilisation : python search_index.py <système> [dossier_résultats]")
+        sys.exit(1)
+
+    results_folder = sys.argv[2] if len(sys.argv) > 2 else "backend/results"
+    count = SearchIndex().index_results_folder(sys.argv[1], results_folder)
+    print(f"[SUCCÈS] {count} issues indexées depuis '{results_folder}'.")
@@ -0,0 +1,143 @@
+import os
+import codecs
+import hashlib
+import threading
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+# Taille maximale (octets) d'un fichier envoyé, surchargeable par variable d'environnement
+DEFAULT_MAX_BYTES = int(os.environ.get("PATCHNOTES_UPLOAD_MAX_BYTES", 200 * 1024 * 1024))
+
+# Taille maximale (octets) d'un champ de formulaire (système...)
+MAX_FIELD_BYTES = 64 * 1024
+
+# Taille des blocs lus dans le corps de la requête
+READ_SIZE = 64 * 1024
+
+
+def keep_uploads_enabled():
+    """ Conservation des fichiers envoyés dans le dossier des envois (PATCHNOTES_KEEP_UPLOADS=1). """
+    return os.environ.get("PATCHNOTES_KEEP_UPLOADS", "0") not in ("", "0", "false", "False")
+
+
+def stream_uploads_enabled():
+    """ Analyse des envois pendant leur réception (PATCHNOTES_STREAM_UPLOADS=0 : fichier écrit puis relu). """
+    return os.environ.get("PATCHNOTES_STREAM_UPLOADS", "1") not in ("", "0", "false", "False")
+
+
+class StreamingUpload:
+    """
+    Corps multipart/form-data d'un envoi, décodé au fil de sa lecture.
+    Les champs sont lus jusqu'au fichier, dont le contenu est ensuite produit par blocs
+    (`iter_file`, `iter_text`) : il est haché (voir `backend.result_cache.digest_key`) et sa taille
+    est bornée pendant la réception, sans jamais être écrit sur disque ni entièrement chargé en mémoire.
+    Avec `keep_raw`, les octets reçus sont aussi conservés pour une écriture ultérieure (`save_raw`).
+    Seul le premier fichier de l'envoi est lu ; les champs placés après lui sont disponibles après `finish`.
+    """
+
+    def __init__(self, stream, boundary, max_bytes=DEFAULT_MAX_BYTES, keep_raw=False):
+        self.stream = stream
+        self.decoder = MultipartDecoder(boundary, max_form_memory_size=MAX_FIELD_BYTES + READ_SIZE)
+        self.max_bytes = max_bytes
+        self.fields = {}
+        self.filename = None
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self.raw = [] if keep_raw else None
+        self._events = self._read_events()
+        self._file_read = False
+
+    def _read_events(self):
+        """ Événements du décodeur multipart, en lisant le corps de la requête par blocs. """
+        while True:
+            event = self.decoder.next_event()
+            if isinstance(event, NeedData):
+                self.decoder.receive_data(self.stream.read(READ_SIZE) or None)
+                continue
+            yield event
+            if isinstance(event, Epilogue):
+                return
+
+    def _read_field(self, name):
+        data, size = [], 0
+        for event in self._events:
+            data.append(event.data)
+            size += len(event.data)
+            if size > MAX_FIELD_BYTES:
+                raise RequestEntityTooLarge(f"Champ '{name}' trop volumineux")
+            if not event.more_data:
+                break
+        self.fields[name] = b"".join(data).decode("utf-8", "replace")
+
+    def read_until_file(self):
+        """ Lit les champs jusqu'au début du fichier. Retourne False si l'envoi ne contient pas de fichier. """
+        for event in self._events:
+            if isinstance(event, Field):
+                self._read_field(event.name)
+            elif isinstance(event, File):
+                self.filename = event.filename
+                return True
+        return False
+
+    def iter_file(self):
+        """
+        Produit les octets du fichier au fil de leur réception, en calculant leur empreinte.
+        Lève une `RequestEntityTooLarge` dès que le fichier dépasse `max_bytes`.
+        """
+        if self._file_read:
+            raise RuntimeError("Le fichier de l'envoi a déjà été lu")
+        self._file_read = True
+        for event in self._events:
+            if not isinstance(event, Data):
+                raise ValueError("Corps multipart invalide")
+            self.size += len(event.data)
+            if self.size > self.max_bytes:
+                raise RequestEntityTooLarge(f"Fichier trop volumineux (limite : {self.max_bytes // (1024 * 1024)} Mo)")
+            self.digest.update(event.data)
+            if self.raw is not None:
+                self.raw.append(event.data)
+            if event.data:
+                yield event.data
+            if not event.more_data:
+                return
+
+    def iter_text(self):
+        """ Comme `iter_file`, décodé en UTF-8 de façon incrémentale (lève une `UnicodeDecodeError` si invalide). """
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        for data in self.iter_file():
+            text = decoder.decode(data)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+
+    def finish(self):
+        """ Lit la fin du corps : les champs placés après le fichier (les fichiers suivants sont ignorés). """
+        if not self._file_read:
+            for _ in self.iter_file():
+                pass
+        for event in self._events:
+            if isinstance(event, Field):
+                self._read_field(event.name)
+
+    def save_raw(self, path):
+        """
+        Écrit en arrière-plan (écriture atomique) les octets reçus conservés avec `keep_raw`.
+        Retourne le thread d'écriture.
+        """
+        chunks = self.raw or []
+
+        def write():
+            tmp_path = f"{path}.tmp-{threading.get_ident()}"
+            try:
+                with open(tmp_path, "wb") as output:
+                    output.writelines(chunks)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"[AVERTISSEMENT] Impossible de conserver l'envoi '{path}' : {e}")
+
+        thread = threading.Thread(target=write, name="upload-writer")
+        thread.start()
+        return thread
@@ -0,0 +1,262 @@
+import io
+import os
+import sys
+import time
+import queue
+import atexit
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import Future
+
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.jobs import DEFAULT_WORKERS
+
+# Nombre de processus de travail, 0 pour exécuter le pipeline dans le processus du serveur
+DEFAULT_POOL_SIZE = int(os.environ.get("PATCHNOTES_WORKER_PROCESSES", DEFAULT_WORKERS))
+# Un processus est remplacé après ce nombre de traitements ou au-delà de ce pic de mémoire (Mo)
+DEFAULT_MAX_JOBS = int(os.environ.get("PATCHNOTES_WORKER_MAX_JOBS", 50))
+DEFAULT_MAX_RSS_MB = float(os.environ.get("PATCHNOTES_WORKER_MAX_RSS_MB", 1024))
+
+# Modules importés une seule fois par le processus serveur de fork : chaque worker démarre avec.
+# "__main__" (par exemple backend/app.py) y est importé une fois au lieu d'être réexécuté par chaque worker.
+PRELOAD_MODULES = ["__main__", "pipeline", "backend.worker_pool"]
+
+WARMUP_HTML = (
+    "<h1>Anomalies corrigées du produit</h1><h2>Préchauffage</h2><h3>#WARM-1</h3><p>Préchauffage</p>"
+    "<h1>Améliorations du produit</h1><h2>Préchauffage</h2><h3>#WARM-2</h3><p>Préchauffage</p>"
+)
+
+
+class WorkerError(Exception):
+    """ Erreur survenue dans un processus de travail pendant un traitement. """
+
+
+def warm_up():
+    """
+    Prépare un processus de travail avant son premier traitement : extracteurs importés,
+    mapping et matcher chargés, analyse HTML, catégorisation et écriture Excel exécutées une fois.
+    """
+    import pandas as pd
+    from extractors.registry import available_systems, get_extractor
+    from extractors.html_parsers import iter_nodes
+    from analysis.categorize_impacts import REGISTRY, categorize_dataframe
+    from processors.format_data import write_master
+
+    for system in available_systems():
+        get_extractor(system)
+    list(iter_nodes(WARMUP_HTML, ["h1", "h2", "h3", "p"]))
+    REGISTRY.current()
+    df = categorize_dataframe(pd.DataFrame({
+        "Section": ["Préchauffage"], "Sous-section": ["Préchauffage"], "ID": ["#WARM-1"], "Description": ["Préchauffage"],
+    }))
+    write_master({"Préchauffage": df}, io.BytesIO())
+
+
+def worker_main(worker_id, tasks, results, max_jobs, max_rss_mb, store_path, index_path):
+    """ Boucle d'un processus de travail : exécute les traitements de la file jusqu'à son recyclage. """
+    from contextlib import redirect_stdout
+    from pipeline import run_pipeline, peak_rss_mb
+    from processors.issue_store import IssueStore
+    from backend.search_index import SearchIndex
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        warm_up()
+    store = IssueStore(store_path) if store_path else None
+    search_index = SearchIndex(index_path) if index_path else None
+    results.put(("ready", worker_id, time.perf_counter() - start))
+
+    jobs_done = 0
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id, html_file, system, results_folder, frames, workspace = task
+        results.put(("started", worker_id, job_id))
+
+        def on_event(event):
+            results.put(("event", job_id, event.to_dict()))
+
+        try:
+            result = run_pipeline(html_file, system, results_folder, store=store, search_index=search_index,
+                                  on_event=on_event, frames=frames, workspace=workspace)
+            results.put(("done", worker_id, job_id, {
+                "master_file": result.master_file,
+                "run_id": result.run_id,
+                "intermediate_files": result.intermediate_files,
+                "incremental": result.incremental,
+                "stages": result.stages,
+            }))
+        except Exception as e:  # L'erreur est renvoyée au serveur, le worker continue
+            results.put(("error", worker_id, job_id, str(e)))
+
+        jobs_done += 1
+        rss = peak_rss_mb()
+        if jobs_done >= max_jobs:
+            results.put(("retired", worker_id, f"{jobs_done} traitements"))
+            break
+        if rss is not None and rss > max_rss_mb:
+            results.put(("retired", worker_id, f"pic mémoire de {rss:.0f} Mo"))
+            break
+
+
+class WorkerPool:
+    """
+    Pool de processus de travail persistants et préchauffés : les imports (pandas, openpyxl, lxml...),
+    le chargement du mapping et la première analyse sont payés au démarrage du worker et non à chaque envoi.
+    Les traitements sont distribués par une file locale. Un worker est recyclé après `max_jobs` traitements
+    ou au-delà de `max_rss_mb` de pic mémoire ; un worker mort est remplacé et son traitement échoue.
+    Les nouveaux workers sont créés par un serveur de fork qui a déjà importé le pipeline.
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, max_jobs=DEFAULT_MAX_JOBS, max_rss_mb=DEFAULT_MAX_RSS_MB,
+                 store_path=None, index_path=None):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+        self.store_path = store_path
+        self.index_path = index_path
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._context = multiprocessing.get_context(start_method)
+        self._tasks = None
+        self._results = None
+        self._workers = {}
+        self._current = {}
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._started = False
+        self._closing = False
+        self.stats = {"jobs": 0, "recycled": 0, "crashed": 0, "warmup_seconds": []}
+
+    def start(self):
+        """ Démarre les workers (appelé automatiquement au premier traitement). """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            if self._context.get_start_method() == "forkserver":
+                self._context.set_forkserver_preload(PRELOAD_MODULES)
+            self._tasks = self._context.Queue()
+            self._results = self._context.Queue()
+            for _ in range(self.size):
+                self._spawn()
+        threading.Thread(target=self._dispatch, name="worker-pool", daemon=True).start()
+        atexit.register(self.close)
+        print(f"[INFO] {self.size} processus de travail démarrés ({self._context.get_start_method()}).")
+
+    def _spawn(self):
+        worker_id = next(self._ids)
+        process = self._context.Process(
+            target=worker_main,
+            args=(worker_id, self._tasks, self._results, self.max_jobs, self.max_rss_mb, self.store_path, self.index_path),
+            name=f"patchnotes-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        self._workers[worker_id] = process
+
+    def submit(self, html_file, system, results_folder, on_event=None, frames=None, workspace=None):
+        """
+        Met un traitement en file ; retourne un `Future` dont le résultat est un dictionnaire.
+        `frames` (DataFrames déjà extraits) et `workspace` (dossier de travail de l'exécution),
+        s'ils sont fournis, sont transmis au worker (voir `run_pipeline`).
+        """
+        self.start()
+        future = Future()
+        future.submitted_at = time.perf_counter()
+        job_id = next(self._job_ids)
+        with self._lock:
+            self._pending[job_id] = (future, on_event)
+        self._tasks.put((job_id, os.path.abspath(html_file), system, os.path.abspath(results_folder), frames, workspace))
+        return future
+
+    def run(self, html_file, system, results_folder, on_event=None, frames=None, workspace=None):
+        """ Exécute un traitement dans un worker et attend son résultat. """
+        return self.submit(html_file, system, results_folder, on_event, frames, workspace).result()
+
+    def _finish(self, job_id, result=None, error=None):
+        with self._lock:
+            future, _ = self._pending.pop(job_id, (None, None))
+            self.stats["jobs"] += 1
+        if future is None:
+            return
+        if error is None:
+            result["latency"] = time.perf_counter() - future.submitted_at
+            future.set_result(result)
+        else:
+            future.set_exception(WorkerError(error))
+
+    def _dispatch(self):
+        while not self._closing:
+            try:
+                message = self._results.get(timeout=1)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            except (EOFError, OSError):
+                break
+
+            kind = message[0]
+            if kind == "ready":
+                self.stats["warmup_seconds"].append(round(message[2], 3))
+            elif kind == "started":
+                with self._lock:
+                    self._current[message[1]] = message[2]
+            elif kind == "event":
+                with self._lock:
+                    _, on_event = self._pending.get(message[1], (None, None))
+                if on_event:
+                    on_event(message[2])
+            elif kind in ("done", "error"):
+                with self._lock:
+                    self._current.pop(message[1], None)
+                if kind == "done":
+                    self._finish(message[2], result=message[3])
+                else:
+                    self._finish(message[2], error=message[3])
+            elif kind == "retired":
+                with self._lock:
+                    # Absent s'il a déjà été détecté comme arrêté (et remplacé) par `_check_workers`
+                    process = self._workers.pop(message[1], None)
+                    self.stats["recycled"] += 1
+                    if process is not None and not self._closing:
+                        self._spawn()
+                if process is not None:
+                    process.join(timeout=5)
+                print(f"[INFO] Processus de travail {message[1]} recyclé ({message[2]}).")
+
+    def _check_workers(self):
+        """ Remplace les workers morts sans s'être retirés (crash, manque de mémoire) ; leur traitement échoue. """
+        with self._lock:
+            dead = [worker_id for worker_id, process in self._workers.items() if not process.is_alive()]
+            lost_jobs = []
+            for worker_id in dead:
+                del self._workers[worker_id]
+                self.stats["crashed"] += 1
+                if worker_id in self._current:
+                    lost_jobs.append(self._current.pop(worker_id))
+                if not self._closing:
+                    self._spawn()
+        for job_id in lost_jobs:
+            self._finish(job_id, error="Le processus de travail s'est arrêté pendant le traitement.")
+        for worker_id in dead:
+            print(f"[AVERTISSEMENT] Processus de travail {worker_id} arrêté de façon inattendue, remplacé.")
+
+    def close(self, timeout=10):
+        """ Arrête les workers après leur traitement en cours. """
+        with self._lock:
+            if not self._started or self._closing:
+                return
+            self._closing = True
+            workers = list(self._workers.values())
+        for _ in workers:
+            self._tasks.put(None)
+        for process in workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,171 @@
+import sys
+import os
+import glob
+import argparse
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from main import DIRECTORIES
+from pipeline import RESULTS_FOLDER, SHEETS, flag_duplicates, run_pipeline
+from mergers.Merge_to_master import merge_dataframes
+from analysis.near_duplicates import NearDuplicateIndex
+from processors.intermediate import read_frame, write_frame
+from processors.issue_store import DEFAULT_STORE_PATH, IssueStore
+from backend.search_index import DEFAULT_INDEX_PATH, SearchIndex
+
+# Valeur de `system` traitant dans un même lot les releases de tous les systèmes
+ALL_SYSTEMS = "all"
+
+
+def discover_releases(directory):
+    """ Liste les fichiers HTML de release d'un dossier, triés par nom (donc par date pour AAAA-MM.html). """
+    return sorted(glob.glob(os.path.join(directory, "*.html")))
+
+
+def process_release(html_file, system, results_folder, store_path, index_path):
+    """
+    Traite une release dans un processus du pool.
+    Seuls les chemins des fichiers produits sont renvoyés au processus parent :
+    les DataFrames sont relus depuis les fichiers intermédiaires Arrow.
+    La détection des doublons entre releases est faite après le pool (voir `flag_batch_duplicates`).
+    """
+    store = IssueStore(store_path) if store_path else None
+    search_index = SearchIndex(index_path) if index_path else None
+    result = run_pipeline(html_file, system, results_folder, store=store, search_index=search_index,
+                          detect_duplicates=False)
+    return {
+        "system": system,
+        "master_file": result.master_file,
+        "intermediate_files": result.intermediate_files,
+        "incremental": result.incremental,
+    }
+
+
+def release_name(html_file):
+    return os.path.splitext(os.path.basename(html_file))[0]
+
+
+def flag_batch_duplicates(releases, store_path):
+    """
+    Détection des doublons entre releases d'un lot, après le pool : les releases de chaque système
+    sont parcourues dans l'ordre de leurs noms (AAAA-MM, voir `analysis.near_duplicates`), chacune
+    comparée aux releases antérieures puis indexée. Le résultat ne dépend donc pas de l'ordre
+    dans lequel les traitements parallèles se terminent. Les fichiers intermédiaires et le Master
+    de chaque release sont réécrits avec la colonne 'Doublons potentiels'.
+    """
+    duplicates = NearDuplicateIndex(store_path)
+    for html_file, outputs in sorted(releases.items(), key=lambda item: (item[1]["system"], release_name(item[0]))):
+        system, release = outputs["system"], release_name(html_file)
+        sheets = {sheet_name: read_frame(path) for sheet_name, path in outputs["intermediate_files"].items()}
+        sheets, flagged = flag_duplicates(duplicates, system, release, sheets)
+        duplicates.add_release(system, release, sheets)
+        for sheet_name, df in sheets.items():
+            write_frame(df, outputs["intermediate_files"][sheet_name])
+        merge_dataframes(sheets, outputs["master_file"], reset_test_status=False)
+        print(f"[INFO] Release '{release}' : {flagged} issue(s) avec des doublons potentiels dans des releases antérieures.")
+
+
+def write_consolidated_master(releases, system, results_folder, reset_test_status=True):
+    """
+    Regroupe toutes les releases traitées dans un seul classeur, avec une colonne 'Release'.
+    """
+    sheets = {}
+    for sheet_name in SHEETS:
+        frames = []
+        for html_file, outputs in sorted(releases.items()):
+            df = read_frame(outputs["intermediate_files"][sheet_name])
+            df.insert(0, "Release", os.path.splitext(os.path.basename(html_file))[0])
+            frames.append(df)
+        if frames:
+            sheets[sheet_name] = pd.concat(frames, ignore_index=True)
+
+    consolidated_file = os.path.join(results_folder, f"{system}_consolidated_Master.xlsx")
+    merge_dataframes(sheets, consolidated_file, reset_test_status)
+    return consolidated_file
+
+
+def run_batch(system, directory=None, workers=None, results_folder=RESULTS_FOLDER,
+              store_path=DEFAULT_STORE_PATH, index_path=DEFAULT_INDEX_PATH, threads=False):
+    """
+    Traite toutes les releases du dossier d'un système sur un pool de processus
+    (un par cœur par défaut). Une release en erreur n'interrompt pas le lot.
+    Avec `system` = "all", les releases de tous les systèmes sont traitées dans le même lot,
+    chacune avec l'extracteur de son système. Avec `threads`, le lot s'exécute dans le processus
+    courant sur un pool de threads : chaque extracteur n'y est importé qu'une fois, à sa première utilisation.
+    Les issues déjà présentes dans le stockage (`store_path`, None pour le désactiver) sont reprises
+    et chaque release est indexée pour la recherche (`index_path`, None pour le désactiver).
+    Retourne (releases traitées, releases en erreur, classeurs consolidés par système).
+    """
+    systems = list(DIRECTORIES) if system == ALL_SYSTEMS else [system]
+    releases = []
+    for name in systems:
+        folder = directory if directory and system != ALL_SYSTEMS else DIRECTORIES[name]
+        found = discover_releases(folder)
+        if not found:
+            print(f"[AVERTISSEMENT] Aucune release trouvée dans '{folder}'.")
+        releases += [(html_file, name) for html_file in found]
+    if not releases:
+        return {}, {}, {}
+
+    workers = min(workers or os.cpu_count() or 1, len(releases))
+    pool = "threads" if threads else "processus"
+    print(f"[INFO] {len(releases)} release(s) à traiter avec {workers} {pool}.")
+
+    # Crée les schémas avant que les processus n'y accèdent en parallèle
+    if store_path:
+        IssueStore(store_path)
+    if index_path:
+        SearchIndex(index_path)
+
+    succeeded, failed = {}, {}
+    # Dans un lot mixte, chaque système a son sous-dossier : deux releases de même nom ne s'écrasent pas
+    def system_folder(name):
+        return os.path.join(results_folder, name) if system == ALL_SYSTEMS else results_folder
+
+    executor_class = ThreadPoolExecutor if threads else ProcessPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        futures = {
+            executor.submit(process_release, html_file, name, system_folder(name), store_path, index_path): html_file
+            for html_file, name in releases
+        }
+        for future in as_completed(futures):
+            html_file = futures[future]
+            try:
+                succeeded[html_file] = future.result()
+                print(f"[SUCCÈS] Release '{html_file}' traitée : {succeeded[html_file]['master_file']}")
+            except Exception as e:  # Une release invalide ne doit pas interrompre le lot
+                failed[html_file] = str(e)
+                print(f"[ERREUR] Release '{html_file}' en échec : {e}")
+
+    if store_path and succeeded:
+        flag_batch_duplicates(succeeded, store_path)
+
+    consolidated_files = {}
+    for name in systems:
+        system_releases = {html_file: outputs for html_file, outputs in succeeded.items() if outputs["system"] == name}
+        if system_releases:
+            consolidated_files[name] = write_consolidated_master(system_releases, name, system_folder(name), reset_test_status=not store_path)
+            print(f"[SUCCÈS] Classeur consolidé généré : {consolidated_files[name]}")
+
+    if store_path and succeeded:
+        reused = sum(outputs["incremental"].get("reused", 0) for outputs in succeeded.values())
+        processed = sum(outputs["incremental"].get("processed", 0) for outputs in succeeded.values())
+        print(f"[INFO] Incrémental : {reused} ligne(s) reprise(s) du stockage, {processed} nouvelle(s) ou modifiée(s).")
+
+    print(f"\n[INFO] Lot terminé : {len(succeeded)} release(s) traitée(s), {len(failed)} en échec.")
+    return succeeded, failed, consolidated_files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Traitement en lot de toutes les releases d'un système")
+    parser.add_argument("system", choices=list(DIRECTORIES) + [ALL_SYSTEMS], help="Système à traiter ('all' : tous les systèmes dans le même lot)")
+    parser.add_argument("--dir", default=None, help="Dossier des releases (par défaut celui du système)")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (par défaut : un par cœur)")
+    parser.add_argument("--no-store", action="store_true", help="Ne pas utiliser le stockage des issues (tout retraiter)")
+    parser.add_argument("--threads", action="store_true", help="Traiter le lot dans ce processus (pool de threads)")
+    args = parser.parse_args()
+
+    store_path = None if args.no_store else DEFAULT_STORE_PATH
+    succeeded, failed, _ = run_batch(args.system, args.dir, args.workers, store_path=store_path, threads=args.threads)
+    if failed and not succeeded:
+        sys.exit(1)
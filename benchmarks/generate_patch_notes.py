@@ -0,0 +1,119 @@
+import sys
+import os
+import re
+import random
+import argparse
+
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors.extract_sciforma import SECTIONS_MAPPING
+
+DEFAULT_TEMPLATE = "sciforma_patches/2024-09.html"
+DEFAULT_OUTPUT_FOLDER = "benchmarks/data"
+
+HEADING_PATTERN = re.compile(r"<(h[123])\b[^>]*>(.*?)</\1>", re.DOTALL | re.IGNORECASE)
+ISSUE_ID_PATTERN = re.compile(r"#([A-Z]+)-(\d+)")
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+TARGET_TITLES = [title.lower() for titles in SECTIONS_MAPPING.values() for title in titles]
+
+
+def heading_text(html):
+    return TAG_PATTERN.sub("", html).strip()
+
+
+def split_template(html):
+    """
+    Découpe une release réelle en une suite de blocs, dans l'ordre du document :
+    - du HTML repris tel quel (en-tête, sommaire, titres, sections non extraites, pied de page)
+    - des listes d'issues (titre h3 + paragraphes) d'une sous-section extraite, à démultiplier
+    """
+    headings = list(HEADING_PATTERN.finditer(html))
+    chunks = [html[:headings[0].start()] if headings else html]
+    in_target = False
+
+    for position, heading in enumerate(headings):
+        level = heading.group(1).lower()
+        end = headings[position + 1].start() if position + 1 < len(headings) else len(html)
+        block = html[heading.start():end]
+        is_target = any(target in heading_text(heading.group(2)).lower() for target in TARGET_TITLES)
+
+        if level in ("h1", "h2") and is_target:
+            in_target = True
+        elif level == "h1":
+            in_target = False
+
+        if level == "h3" and in_target:
+            if not isinstance(chunks[-1], list):
+                chunks.append([])
+            chunks[-1].append(block)
+        else:
+            chunks.append(block)
+
+    # Si le document se termine par une issue, le pied de page qui la suit est repris tel quel
+    if isinstance(chunks[-1], list):
+        last_issue = chunks[-1][-1]
+        body_end = last_issue.lower().rfind("</p>")
+        if body_end != -1:
+            body_end += len("</p>")
+            chunks[-1][-1] = last_issue[:body_end]
+            chunks.append(last_issue[body_end:])
+
+    if not any(isinstance(chunk, list) for chunk in chunks):
+        raise ValueError("Aucune section de correctifs ou d'améliorations trouvée dans le modèle.")
+    return chunks
+
+
+def generate_patch_notes(scale=10, template_file=DEFAULT_TEMPLATE, seed=0):
+    """
+    Génère le HTML d'une release Sciforma `scale` fois plus volumineuse que le modèle :
+    mêmes sections h1, mêmes sous-sections h2, et `scale` fois plus d'issues (h3 + paragraphes)
+    dans chacune, avec des identifiants uniques et des descriptions tirées des issues du modèle.
+    Retourne (html, nombre d'issues générées).
+    """
+    with open(template_file, "r", encoding="utf-8") as file:
+        chunks = split_template(file.read())
+
+    rng = random.Random(seed)
+    all_issues = [issue for chunk in chunks if isinstance(chunk, list) for issue in chunk]
+    next_id = 100000
+    issue_count = 0
+
+    parts = []
+    for chunk in chunks:
+        if not isinstance(chunk, list):
+            parts.append(chunk)
+            continue
+        # La première copie reprend les issues de la sous-section, les suivantes puisent dans tout le modèle
+        generated = chunk + [rng.choice(all_issues) for _ in range(len(chunk) * (scale - 1))]
+        for issue in generated:
+            next_id += 1
+            parts.append(ISSUE_ID_PATTERN.sub(lambda match: f"#{match.group(1)}-{next_id}", issue, count=1))
+        issue_count += len(generated)
+
+    return "".join(parts), issue_count
+
+
+def write_patch_notes(scale=10, output_folder=DEFAULT_OUTPUT_FOLDER, template_file=DEFAULT_TEMPLATE, seed=0):
+    """ Écrit une release synthétique. Retourne (chemin, nombre d'issues). """
+    os.makedirs(output_folder, exist_ok=True)
+    output_file = os.path.join(output_folder, f"synthetic_x{scale}_seed{seed}.html")
+    html, issue_count = generate_patch_notes(scale, template_file, seed)
+    with open(output_file, "w", encoding="utf-8") as file:
+        file.write(html)
+    return output_file, issue_count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère des releases Sciforma synthétiques à grande échelle")
+    parser.add_argument("scales", nargs="*", type=int, default=[10, 100], help="Facteurs d'échelle (ex : 10 100 1000)")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="Release réelle servant de modèle")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_FOLDER, help="Dossier de sortie")
+    parser.add_argument("--seed", type=int, default=0, help="Graine du générateur aléatoire")
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        output_file, issue_count = write_patch_notes(scale, args.output, args.template, args.seed)
+        size = os.path.getsize(output_file) / 1024 / 1024
+        print(f"[SUCCÈS] Release x{scale} générée : {output_file} ({issue_count} issues, {size:.1f} Mo)")
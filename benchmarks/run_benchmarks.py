@@ -0,0 +1,201 @@
+import sys
+import os
+import io
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+from datetime import datetime
+from contextlib import redirect_stdout
+
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generate_patch_notes import DEFAULT_OUTPUT_FOLDER, write_patch_notes
+from extractors.registry import extract_dataframes
+from processors.clean_data import clean_dataframe
+from analysis.categorize_impacts import categorize_dataframe
+from summary.add_summary import summary_tables
+from mergers.Merge_to_master import merge_dataframes
+from pipeline import SHEETS
+
+DEFAULT_RESULTS_FOLDER = "benchmarks/results"
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_THRESHOLD = 0.25  # Régression signalée au-delà de +25 %
+
+# En dessous de ces écarts absolus, une variation relève du bruit de mesure
+MIN_SECONDS_DELTA = 0.02
+MIN_MEMORY_DELTA_MB = 1.0
+
+STAGES = ["extract", "clean", "categorize", "summary", "merge_format"]
+
+
+def run_stages(html_file, master_file):
+    """
+    Exécute les étapes du pipeline l'une après l'autre sur une release.
+    Génère des (nom de l'étape, fonction) ; chaque fonction fait avancer l'état partagé.
+    """
+    state = {}
+
+    def extract():
+        state["frames"] = extract_dataframes(html_file, "Sciforma")
+
+    def clean():
+        state["sheets"] = {
+            sheet_name: clean_dataframe(state["frames"][extract_type])[0]
+            for sheet_name, extract_type in SHEETS.items()
+        }
+
+    def categorize():
+        state["sheets"] = {sheet_name: categorize_dataframe(df) for sheet_name, df in state["sheets"].items()}
+
+    def summary():
+        summary_tables(state["sheets"])
+
+    def merge_format():
+        # Fusion, mise en forme et résumé sont écrits en un seul passage (voir processors.format_data.write_master)
+        merge_dataframes(state["sheets"], master_file)
+
+    for name, func in zip(STAGES, [extract, clean, categorize, summary, merge_format]):
+        yield name, func
+    state.clear()
+
+
+def benchmark_release(html_file, repeat=3):
+    """
+    Mesure chaque étape sur une release : durée médiane sur `repeat` exécutions,
+    puis pic de mémoire Python alloué par l'étape (tracemalloc, lors d'une exécution séparée
+    pour ne pas fausser les durées).
+    """
+    timings = {name: [] for name in STAGES}
+    peaks = {}
+
+    with tempfile.TemporaryDirectory() as workdir, redirect_stdout(io.StringIO()):
+        master_file = os.path.join(workdir, "benchmark_Master.xlsx")
+        for _ in range(repeat):
+            for name, func in run_stages(html_file, master_file):
+                start = time.perf_counter()
+                func()
+                timings[name].append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            for name, func in run_stages(html_file, master_file):
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                func()
+                peaks[name] = (tracemalloc.get_traced_memory()[1] - before) / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+
+    return {
+        name: {
+            "seconds": round(statistics.median(timings[name]), 4),
+            "min_seconds": round(min(timings[name]), 4),
+            "peak_mb": round(peaks[name], 2),
+        }
+        for name in STAGES
+    }
+
+
+def run_benchmarks(scales=DEFAULT_SCALES, repeat=3, data_folder=DEFAULT_OUTPUT_FOLDER, seed=0):
+    """ Génère une release synthétique par facteur d'échelle et mesure chaque étape du pipeline. """
+    results = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "seed": seed,
+        "scales": {},
+    }
+    for scale in scales:
+        html_file, issue_count = write_patch_notes(scale, data_folder, seed=seed)
+        print(f"[INFO] Mesure de la release x{scale} ({issue_count} issues)...")
+        stages = benchmark_release(html_file, repeat)
+        results["scales"][f"x{scale}"] = {
+            "issues": issue_count,
+            "html_mb": round(os.path.getsize(html_file) / 1024 / 1024, 2),
+            "total_seconds": round(sum(stage["seconds"] for stage in stages.values()), 4),
+            "stages": stages,
+        }
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare des résultats à une référence. Retourne la liste des régressions :
+    (échelle, étape, mesure, valeur de référence, valeur mesurée) au-delà de `threshold`.
+    """
+    regressions = []
+    for scale, measured in results["scales"].items():
+        reference = baseline.get("scales", {}).get(scale)
+        if not reference:
+            continue
+        for name, stage in measured["stages"].items():
+            base = reference["stages"].get(name)
+            if not base:
+                continue
+            for metric, min_delta in (("seconds", MIN_SECONDS_DELTA), ("peak_mb", MIN_MEMORY_DELTA_MB)):
+                delta = stage[metric] - base[metric]
+                if delta > min_delta and stage[metric] > base[metric] * (1 + threshold):
+                    regressions.append((scale, name, metric, base[metric], stage[metric]))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    for scale, measured in results["scales"].items():
+        reference = (baseline or {}).get("scales", {}).get(scale, {}).get("stages", {})
+        print(f"\n[INFO] Release {scale} : {measured['issues']} issues, {measured['html_mb']} Mo, {measured['total_seconds']:.3f} s au total")
+        for name, stage in measured["stages"].items():
+            line = f"    {name:<14} {stage['seconds']:>9.4f} s  {stage['peak_mb']:>9.2f} Mo"
+            if name in reference:
+                line += f"   (référence : {reference[name]['seconds']:.4f} s, {reference[name]['peak_mb']:.2f} Mo)"
+            print(line)
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+        file.write("\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure de la durée et de la mémoire de chaque étape du pipeline")
+    parser.add_argument("scales", nargs="*", type=int, default=DEFAULT_SCALES, help="Facteurs d'échelle (ex : 1 10 100 1000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre d'exécutions chronométrées par échelle")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Fichier JSON de référence")
+    parser.add_argument("--save-baseline", action="store_true", help="Enregistrer ces résultats comme nouvelle référence")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Seuil de régression (0.25 = +25 %%)")
+    parser.add_argument("--output", default=None, help="Fichier JSON des résultats (par défaut dans benchmarks/results)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scales, args.repeat)
+
+    output_file = args.output or os.path.join(DEFAULT_RESULTS_FOLDER, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    write_json(output_file, results)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    print_results(results, baseline)
+    print(f"\n[SUCCÈS] Résultats enregistrés dans {output_file}")
+
+    if args.save_baseline:
+        write_json(args.baseline, results)
+        print(f"[SUCCÈS] Nouvelle référence enregistrée dans {args.baseline}")
+    elif baseline:
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for scale, name, metric, before, after in regressions:
+            unit = "s" if metric == "seconds" else "Mo"
+            increase = f" (+{(after / before - 1) * 100:.0f} %)" if before else ""
+            print(f"[ERREUR] Régression {scale} / {name} : {before} {unit} -> {after} {unit}{increase}")
+        if regressions:
+            sys.exit(1)
+        print(f"[SUCCÈS] Aucune régression au-delà de {args.threshold * 100:.0f} % par rapport à {args.baseline}.")
@@ -0,0 +1,134 @@
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+import http.client
+
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generate_patch_notes import write_patch_notes
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Serveur de l'application lancé dans un dossier temporaire (envois, résultats et bases séparés).
+# Il affiche le port choisi puis sert les requêtes jusqu'à son arrêt.
+SERVER_SCRIPT = """
+import sys
+from werkzeug.serving import make_server
+sys.path.insert(0, sys.argv[1])
+from backend.app import app
+server = make_server("127.0.0.1", 0, app, threaded=True)
+print(server.server_port, flush=True)
+server.serve_forever()
+"""
+
+BOUNDARY = "patchnotes-benchmark"
+SEND_SIZE = 64 * 1024
+
+
+def multipart_body(html, filename, system):
+    """ Corps multipart/form-data d'un envoi (champ système puis fichier, comme le frontend). """
+    return b"".join([
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"system\"\r\n\r\n{system}\r\n".encode("utf-8"),
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        "Content-Type: text/html\r\n\r\n".encode("utf-8"),
+        html,
+        f"\r\n--{BOUNDARY}--\r\n".encode("utf-8"),
+    ])
+
+
+def upload(port, body, rate):
+    """
+    Envoie un corps au débit `rate` (octets par seconde, illimité si 0) puis suit le traitement jusqu'à son terme.
+    Retourne (durée de l'envoi jusqu'à la réponse, durée jusqu'au résultat).
+    """
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+    start = time.perf_counter()
+    connection.putrequest("POST", "/upload")
+    connection.putheader("Content-Type", f"multipart/form-data; boundary={BOUNDARY}")
+    connection.putheader("Content-Length", str(len(body)))
+    connection.endheaders()
+    for offset in range(0, len(body), SEND_SIZE):
+        connection.send(body[offset:offset + SEND_SIZE])
+        if rate:
+            # Débit simulé d'un réseau : chaque bloc part à son heure
+            delay = start + (offset + SEND_SIZE) / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    response = json.loads(connection.getresponse().read())
+    accepted = time.perf_counter() - start
+    if "job_id" not in response:
+        raise RuntimeError(f"Envoi refusé : {response}")
+
+    while True:
+        connection.request("GET", f"/jobs/{response['job_id']}")
+        job = json.loads(connection.getresponse().read())
+        if job["status"] in ("terminé", "échec"):
+            break
+        time.sleep(0.01)
+    connection.close()
+    if job["status"] != "terminé":
+        raise RuntimeError(f"Traitement en échec : {job.get('error')}")
+    return accepted, time.perf_counter() - start
+
+
+def measure(html, system, streaming, rate, repeat):
+    """ Latences médianes d'envois successifs (contenus distincts, pour ne pas être servis depuis le cache). """
+    env = dict(os.environ, PATCHNOTES_WORKER_PROCESSES="0", PATCHNOTES_STREAM_UPLOADS="1" if streaming else "0")
+    with tempfile.TemporaryDirectory() as folder:
+        server = subprocess.Popen(
+            [sys.executable, "-c", SERVER_SCRIPT, PROJECT_ROOT], cwd=folder, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+        try:
+            port = int(server.stdout.readline())
+            accepted_times, result_times = [], []
+            for run in range(repeat):
+                body = multipart_body(html + f"<!-- envoi {run} -->".encode("utf-8"), "release.html", system)
+                accepted, result = upload(port, body, rate)
+                accepted_times.append(accepted)
+                result_times.append(result)
+        finally:
+            server.terminate()
+            server.wait()
+    return {
+        "accepted_seconds": round(statistics.median(accepted_times), 4),
+        "result_seconds": round(statistics.median(result_times), 4),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latence envoi -> résultat : fichier écrit puis relu, contre analyse pendant la réception")
+    parser.add_argument("html_file", nargs="?", default=None, help="Release à envoyer (par défaut : release générée)")
+    parser.add_argument("--system", default="Sciforma", help="Système de la release")
+    parser.add_argument("--scale", type=int, default=20, help="Facteur d'échelle de la release générée")
+    parser.add_argument("--rate", type=float, default=20, help="Débit simulé du réseau (Mo/s, 0 : illimité)")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre d'envois mesurés par mode")
+    args = parser.parse_args()
+
+    html_file = args.html_file
+    if html_file is None:
+        html_file, issue_count = write_patch_notes(args.scale)
+        print(f"[INFO] Release générée : {html_file} ({issue_count} issues)")
+    with open(html_file, "rb") as file:
+        html = file.read()
+    rate = args.rate * 1024 * 1024
+    print(f"[INFO] Envoi de {len(html) / 1024 / 1024:.1f} Mo à {args.rate:g} Mo/s" if rate else
+          f"[INFO] Envoi de {len(html) / 1024 / 1024:.1f} Mo sans limite de débit")
+
+    before = measure(html, args.system, False, rate, args.repeat)
+    after = measure(html, args.system, True, rate, args.repeat)
+
+    print("\n[INFO] Avant (fichier écrit dans le dossier des envois, puis relu par le pipeline) :")
+    print(f"    envoi accepté       {before['accepted_seconds']:>8.4f} s")
+    print(f"    résultat disponible {before['result_seconds']:>8.4f} s")
+    print("[INFO] Après (analyse pendant la réception) :")
+    print(f"    envoi accepté       {after['accepted_seconds']:>8.4f} s")
+    print(f"    résultat disponible {after['result_seconds']:>8.4f} s")
+    print(f"[SUCCÈS] Gain envoi -> résultat : {before['result_seconds'] - after['result_seconds']:.4f} s "
+          f"({before['result_seconds'] / after['result_seconds']:.2f}x)")
@@ -0,0 +1,99 @@
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generate_patch_notes import write_patch_notes
+from backend.worker_pool import WorkerPool
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Traitement à froid : un nouvel interpréteur importe le pipeline et traite une release.
+# Il affiche la durée de l'import et celle du traitement (hors démarrage de l'interpréteur).
+COLD_SCRIPT = """
+import io, json, sys, time
+from contextlib import redirect_stdout
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[4])
+from pipeline import run_pipeline
+imported = time.perf_counter()
+with redirect_stdout(io.StringIO()):
+    run_pipeline(sys.argv[1], sys.argv[2], sys.argv[3])
+print(json.dumps({"import": imported - start, "run": time.perf_counter() - imported}))
+"""
+
+
+def measure_cold(html_file, system, results_folder, repeat):
+    """ Durées d'un traitement dans un processus neuf à chaque envoi (démarrage, imports, premier passage). """
+    process_times, import_times, run_times = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-c", COLD_SCRIPT, html_file, system, results_folder, PROJECT_ROOT],
+            capture_output=True, text=True, check=True, cwd=PROJECT_ROOT,
+        )
+        process_times.append(time.perf_counter() - start)
+        timings = json.loads(completed.stdout.strip().splitlines()[-1])
+        import_times.append(timings["import"])
+        run_times.append(timings["run"])
+    return {
+        "process_seconds": round(statistics.median(process_times), 4),
+        "import_seconds": round(statistics.median(import_times), 4),
+        "first_run_seconds": round(statistics.median(run_times), 4),
+    }
+
+
+def measure_warm(html_file, system, results_folder, repeat):
+    """ Latences d'envoi vers un pool de workers déjà préchauffés (file, traitement et retour du résultat). """
+    pool = WorkerPool(size=1)
+    start = time.perf_counter()
+    pool.start()
+    while not pool.stats["warmup_seconds"]:
+        time.sleep(0.01)
+    ready = time.perf_counter() - start
+    try:
+        latencies = [pool.run(html_file, system, results_folder)["latency"] for _ in range(repeat)]
+    finally:
+        pool.close()
+    return {
+        "pool_ready_seconds": round(ready, 4),
+        "warmup_seconds": pool.stats["warmup_seconds"][0],
+        "first_job_seconds": round(latencies[0], 4),
+        "job_seconds": round(statistics.median(latencies), 4),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latence d'un envoi : processus neuf (à froid) contre pool de workers préchauffés")
+    parser.add_argument("html_file", nargs="?", default=None, help="Release à traiter (par défaut : release générée)")
+    parser.add_argument("--system", default="Sciforma", help="Système de la release")
+    parser.add_argument("--scale", type=int, default=1, help="Facteur d'échelle de la release générée")
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre de traitements mesurés")
+    args = parser.parse_args()
+
+    html_file = args.html_file
+    if html_file is None:
+        html_file, issue_count = write_patch_notes(args.scale)
+        print(f"[INFO] Release générée : {html_file} ({issue_count} issues)")
+    html_file = os.path.abspath(html_file)
+
+    with tempfile.TemporaryDirectory() as results_folder:
+        cold = measure_cold(html_file, args.system, results_folder, args.repeat)
+        warm = measure_warm(html_file, args.system, results_folder, args.repeat)
+
+    print("\n[INFO] À froid (processus neuf par envoi) :")
+    print(f"    processus complet   {cold['process_seconds']:>8.4f} s")
+    print(f"    dont imports        {cold['import_seconds']:>8.4f} s")
+    print(f"    dont traitement     {cold['first_run_seconds']:>8.4f} s")
+    print("[INFO] À chaud (pool préchauffé) :")
+    print(f"    démarrage du pool   {warm['pool_ready_seconds']:>8.4f} s  (une fois, préchauffage {warm['warmup_seconds']:.4f} s)")
+    print(f"    premier traitement  {warm['first_job_seconds']:>8.4f} s")
+    print(f"    traitement médian   {warm['job_seconds']:>8.4f} s")
+    print(f"[SUCCÈS] Gain par envoi : {cold['process_seconds'] / warm['job_seconds']:.1f}x")
@@ -0,0 +1,185 @@
+import sys
+import os
+import re
+import argparse
+
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors.html_parsers import iter_file_nodes
+from extractors.records import collect_dataframes, validate_extract_types
+
+# Sections des notes de mise à jour Business Central (pages "Update xx.x") à extraire
+SECTIONS_MAPPING = {
+    "correctifs": [
+        "Application hotfixes",
+        "Platform hotfixes",
+    ],
+    "améliorations": [
+        "Regulatory features",
+    ]
+}
+
+# En-têtes de colonnes reconnus dans les tableaux des notes BC (insensibles à la casse)
+HEADER_ALIASES = {
+    "id": ["id", "bug id", "work item"],
+    "description": ["title", "titre", "description"],
+    "area": ["functional area", "domaine fonctionnel", "area"],
+    "country": ["country", "country/region", "pays"],
+}
+
+HEADING_LEVELS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4}
+# Balises lues par l'extracteur
+NODE_TAGS = list(HEADING_LEVELS) + ["table", "tr", "th", "td"]
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize(text):
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+class TableWalker:
+    """
+    Affecte chaque ligne de tableau, dans l'ordre du document, à la section qui l'englobe.
+    Dans les notes BC, chaque issue est une ligne d'un tableau (ID, titre, domaine fonctionnel)
+    placé sous un titre de section ; les titres de niveau inférieur (pays, module) servent de sous-section.
+    """
+
+    def __init__(self, sections_mapping=SECTIONS_MAPPING):
+        self.targets = [
+            (target, target.lower(), extract_type)
+            for extract_type, targets in sections_mapping.items()
+            for target in targets
+        ]
+        self.current_section = None
+        self.current_type = None
+        self.section_level = None
+        self.subheading = None
+        self.columns = None
+        self.row = None
+
+    def _match_section(self, title):
+        title = title.lower()
+        for target, target_lower, extract_type in self.targets:
+            if target_lower in title:
+                return target, extract_type
+        return None
+
+    def heading(self, level, text):
+        """ Traite un titre ; retourne l'éventuel enregistrement de la ligne de tableau en cours. """
+        record = self.end_row()
+        self.columns = None
+        level = HEADING_LEVELS[level]
+        match = self._match_section(text)
+        if match:
+            self.current_section, self.current_type = match
+            self.section_level = level
+            self.subheading = None
+        elif self.current_section and level <= self.section_level:
+            # Un titre de même niveau ou de niveau supérieur termine la section en cours
+            self.current_section = self.current_type = self.section_level = None
+        elif self.current_section:
+            self.subheading = normalize(text)
+        return record
+
+    def table(self):
+        """ Début d'un tableau : ses en-têtes seront relus sur la première ligne. """
+        record = self.end_row()
+        self.columns = None
+        return record
+
+    def start_row(self):
+        record = self.end_row()
+        self.row = []
+        return record
+
+    def cell(self, tag, text):
+        if self.row is not None:
+            self.row.append((tag, normalize(text)))
+
+    def _read_header(self, cells):
+        labels = [text.lower() for _, text in cells]
+        columns = {}
+        for key, aliases in HEADER_ALIASES.items():
+            for index, label in enumerate(labels):
+                if label in aliases:
+                    columns.setdefault(key, index)
+        # Une ligne d'en-têtes contient au moins l'ID et le titre
+        return columns if "id" in columns and "description" in columns else None
+
+    def end_row(self):
+        """ Termine la ligne en cours et retourne son enregistrement (type, [Section, Sous-section, ID, Description]) ou None. """
+        cells, self.row = self.row, None
+        if not cells or not self.current_section:
+            return None
+        if self.columns is None:
+            self.columns = self._read_header(cells)
+            return None
+
+        def value(key):
+            index = self.columns.get(key)
+            return cells[index][1] if index is not None and index < len(cells) else ""
+
+        issue_id, description = value("id"), value("description")
+        if not issue_id or not description:
+            return None
+        subsection = " - ".join(part for part in (value("country"), value("area")) if part)
+        return self.current_type, [self.current_section, subsection or self.subheading or self.current_section, issue_id, description]
+
+
+def records_from_nodes(nodes):
+    """ Produit les enregistrements (type d'extraction, [Section, Sous-section, ID, Description]) d'un flux de couples (balise, texte). """
+    walker = TableWalker()
+    for name, text in nodes:
+        if name in HEADING_LEVELS:
+            record = walker.heading(name, text)
+        elif name == "table":
+            record = walker.table()
+        elif name == "tr":
+            record = walker.start_row()
+        else:
+            walker.cell(name, text)
+            record = None
+        if record:
+            yield record
+
+    record = walker.end_row()
+    if record:
+        yield record
+
+
+def iter_records(html_file, parser=None):
+    """
+    Interface commune des extracteurs (voir `extractors.registry`) : produit au fil de l'analyse
+    les enregistrements (type d'extraction, [Section, Sous-section, ID, Description]) de la release.
+    """
+    return records_from_nodes(iter_file_nodes(html_file, NODE_TAGS, parser))
+
+
+def extract_dataframes(html_file, extract_types=None, parser=None):
+    """
+    Extrait en une seule analyse du HTML les correctifs (hotfixes) et les améliorations
+    (fonctionnalités réglementaires) d'une mise à jour Business Central.
+    Retourne un dictionnaire type d'extraction -> DataFrame.
+    Lève une ValueError si un type est invalide ou si aucune donnée n'est trouvée.
+    """
+    print(f"[INFO] Analyse du fichier : {html_file}")
+
+    extract_types = validate_extract_types(extract_types, SECTIONS_MAPPING)
+    return collect_dataframes(iter_records(html_file, parser), SECTIONS_MAPPING, extract_types, html_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extraction des notes de mise à jour Business Central")
+    parser.add_argument("html_file", help="Fichier HTML contenant les notes de mise à jour")
+    parser.add_argument("--parser", choices=["lxml", "html.parser", "stream"], default=None, help="Backend HTML (par défaut : le plus rapide disponible)")
+    args = parser.parse_args()
+
+    try:
+        frames = extract_dataframes(args.html_file, parser=args.parser)
+    except ValueError as e:
+        print(f"[ERREUR] {e}")
+        sys.exit(1)
+
+    for extract_type, df in frames.items():
+        print(f"[SUCCÈS] {len(df)} {extract_type} extraits.")
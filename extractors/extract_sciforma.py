@@ -1,11 +1,17 @@
 import sys
+import os
 import argparse
-from bs4 import BeautifulSoup
-import pandas as pd
 from openpyxl import load_workbook
 from openpyxl.worksheet.table import Table, TableStyleInfo
 from openpyxl.utils import get_column_letter
 
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors.html_parsers import iter_file_nodes
+from processors.intermediate import is_intermediate
+from extractors.records import collect_dataframes, validate_extract_types, write_record_batches
+
 # Définition des sections à extraire
 SECTIONS_MAPPING = {
     "correctifs": [
@@ -22,68 +28,142 @@ SECTIONS_MAPPING = {
     ]
 }
 
-def extract_data(html_file, output_file, extract_type):
+# Balises lues par l'extracteur
+NODE_TAGS = ["h1", "h2", "h3", "p"]
+
+
+class SectionWalker:
     """
-    Extrait les correctifs ou les améliorations en fonction du type spécifié.
+    Affecte chaque titre / paragraphe, dans l'ordre du document, à la section qui l'englobe.
+    Un seul passage linéaire produit les enregistrements de tous les types d'extraction.
     """
-    print(f"[INFO] Analyse du fichier : {html_file}")
-    print(f"[INFO] Fichier Excel de sortie : {output_file}")
 
-    # Charger le fichier HTML
-    with open(html_file, "r", encoding="utf-8") as file:
-        soup = BeautifulSoup(file, "html.parser")
+    def __init__(self, sections_mapping=SECTIONS_MAPPING, keep_records=True):
+        self.targets = [
+            (target, target.lower(), extract_type)
+            for extract_type, targets in sections_mapping.items()
+            for target in targets
+        ]
+        self.keep_records = keep_records
+        self.records = {extract_type: [] for extract_type in sections_mapping}
+        self.sections_found = set()
+        self.current_section = None
+        self.current_type = None
+        self.current_subsection = None
+        self.issue_id = None
+
+    def _match_section(self, title):
+        title = title.lower()
+        for target, target_lower, extract_type in self.targets:
+            if target_lower in title:  # Comparaison insensible à la casse
+                return target, extract_type
+        return None
+
+    def heading(self, level, text):
+        """ Traite un titre h1, h2 ou h3. """
+        if level in ("h1", "h2"):
+            match = self._match_section(text)
+            if match:
+                # Début d'une section recherchée
+                self.current_section, self.current_type = match
+                self.sections_found.add(self.current_section)
+                self.current_subsection = None
+                self.issue_id = None
+                return
+            if level == "h1":
+                # Un autre h1 termine la section en cours
+                self.current_section = None
+                self.current_type = None
+                return
+            self.current_subsection = text.strip()
+            self.issue_id = None
+        elif level == "h3":
+            self.issue_id = text.strip()
+
+    def paragraph(self, text):
+        """
+        Traite un paragraphe : il devient la description de l'issue courante.
+        Retourne l'enregistrement (type d'extraction, [Section, Sous-section, ID, Description]) produit, ou None.
+        """
+        description = text.strip()
+        if self.current_section and self.current_subsection and self.issue_id and description:
+            record = [self.current_section, self.current_subsection, self.issue_id, description]
+            if self.keep_records:
+                self.records[self.current_type].append(record)
+            return self.current_type, record
+        return None
+
+
+def walk_nodes(nodes):
+    """ Parcourt une seule fois les couples (balise, texte) h1/h2/h3/p et retourne le `SectionWalker` rempli. """
+    walker = SectionWalker()
+    for name, text in nodes:
+        if name == "p":
+            walker.paragraph(text)
+        else:
+            walker.heading(name, text)
+    return walker
+
+
+def records_from_nodes(nodes):
+    """ Produit les enregistrements (type d'extraction, [Section, Sous-section, ID, Description]) d'un flux de couples (balise, texte). """
+    walker = SectionWalker(keep_records=False)
+    for name, text in nodes:
+        if name == "p":
+            record = walker.paragraph(text)
+            if record:
+                yield record
+        else:
+            walker.heading(name, text)
+
+
+def iter_records(html_file, parser=None):
+    """
+    Interface commune des extracteurs (voir `extractors.registry`) : produit au fil de l'analyse
+    les enregistrements (type d'extraction, [Section, Sous-section, ID, Description]) de la release.
+    """
+    return records_from_nodes(iter_file_nodes(html_file, NODE_TAGS, parser))
 
-    # Définir les sections à rechercher selon le type
-    if extract_type not in SECTIONS_MAPPING:
-        print(f"[ERREUR] Type d'extraction invalide : {extract_type}. Utilisez 'correctifs' ou 'améliorations'.")
-        sys.exit(1)
 
-    sections_to_find = SECTIONS_MAPPING[extract_type]
-
-    # Trouver dynamiquement les sections par leur titre
-    sections_found = {}
-    for h in soup.find_all(["h1", "h2"]):  # Recherche dans h1 et h2
-        section_title = h.get_text(strip=True)
-        for target_section in sections_to_find:
-            if target_section.lower() in section_title.lower():  # Comparaison insensible à la casse
-                sections_found[target_section] = h
-                break  # Passer à la section suivante dès qu'on a un match
-
-    # Vérifier si toutes les sections attendues ont été trouvées
-    missing_sections = [s for s in sections_to_find if s not in sections_found]
-    if missing_sections:
-        print(f"[AVERTISSEMENT] Certaines sections sont introuvables : {missing_sections}")
-
-    # Extraction des données
-    data = []
-    for section, header_tag in sections_found.items():
-        subsections = header_tag.find_all_next(["h2", "h3", "p"], limit=None)
-
-        current_subsection = None
-        issue_id = None
-        for tag in subsections:
-            if tag.name == "h2":
-                current_subsection = tag.text.strip()
-            elif tag.name == "h3":
-                issue_id = tag.text.strip()
-            elif tag.name == "p":
-                description = tag.text.strip()
-                if current_subsection and issue_id and description:
-                    data.append([section, current_subsection, issue_id, description])
-
-    # Vérifier si des données ont été extraites
-    if not data:
-        print(f"[AVERTISSEMENT] Aucune donnée trouvée dans '{html_file}'. Vérifiez que les sections existent dans la page.")
-        sys.exit(1)
+def extract_dataframes(html_file, extract_types=None, parser=None):
+    """
+    Extrait en une seule analyse du HTML les correctifs et les améliorations.
+    Retourne un dictionnaire type d'extraction -> DataFrame.
+    `parser` choisit le backend HTML (voir `extractors.html_parsers`).
+    Lève une ValueError si un type est invalide ou si aucune donnée n'est trouvée.
+    """
+    print(f"[INFO] Analyse du fichier : {html_file}")
 
-    # Création d'un DataFrame
-    df = pd.DataFrame(data, columns=["Section", "Sous-section", "ID", "Description"])
+    extract_types = validate_extract_types(extract_types, SECTIONS_MAPPING)
+    return collect_dataframes(iter_records(html_file, parser), SECTIONS_MAPPING, extract_types, html_file)
 
-    # Suppression des doublons sur "ID" uniquement si la "Description" est vide
-    df = df[~((df.duplicated(subset=["ID"], keep=False)) & (df["Description"] == ""))]
+def extract_dataframe(html_file, extract_type, parser=None):
+    """
+    Extrait les correctifs ou les améliorations et retourne un DataFrame.
+    Lève une ValueError si le type est invalide ou si aucune donnée n'est trouvée.
+    """
+    return extract_dataframes(html_file, [extract_type], parser)[extract_type]
 
-    # Ajouter une colonne "Test Status" vide
-    df["Test Status"] = ""
+def extract_data(html_file, output_file, extract_type, parser=None):
+    """
+    Extrait les correctifs ou les améliorations en fonction du type spécifié.
+    Vers un fichier intermédiaire Arrow, l'extraction se fait en flux et par lots (mémoire bornée,
+    backend "stream" par défaut) ; vers Excel, elle passe par un DataFrame.
+    """
+    print(f"[INFO] Fichier de sortie : {output_file}")
+
+    try:
+        if is_intermediate(output_file):
+            # Les fichiers intermédiaires Arrow ne sont pas mis en forme : ils sont relus par l'étape suivante
+            validate_extract_types([extract_type], SECTIONS_MAPPING)
+            counts = write_record_batches(iter_records(html_file, parser or "stream"), SECTIONS_MAPPING,
+                                          {extract_type: output_file}, html_file)
+            print(f"[SUCCÈS] Fichier intermédiaire '{output_file}' généré avec succès ({counts[extract_type]} lignes).")
+            return
+        df = extract_dataframe(html_file, extract_type, parser)
+    except ValueError as e:
+        print(f"[ERREUR] {e}")
+        sys.exit(1)
 
     # Sauvegarde des données en Excel
     df.to_excel(output_file, index=False)
@@ -132,9 +212,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Extraction des patch notes de Sciforma")
     parser.add_argument("html_file", help="Fichier HTML contenant les patch notes")
     parser.add_argument("--type", choices=["correctifs", "améliorations"], required=True, help="Type d'extraction")
-    parser.add_argument("output_file", help="Nom du fichier Excel de sortie")
+    parser.add_argument("output_file", help="Fichier de sortie (.arrow pour un fichier intermédiaire, .xlsx pour un fichier Excel)")
+    parser.add_argument("--parser", choices=["lxml", "html.parser", "stream"], default=None, help="Backend HTML (par défaut : le plus rapide disponible)")
 
     args = parser.parse_args()
 
     # Exécuter l'extraction avec les arguments
-    extract_data(args.html_file, args.output_file, args.type)
+    extract_data(args.html_file, args.output_file, args.type, args.parser)
@@ -0,0 +1,140 @@
+import sys
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors.html_prefilter import prefilter_enabled, read_prefiltered
+from extractors.html_stream import iter_file_nodes as _iter_file_nodes_stream, iter_html_nodes as _iter_nodes_stream
+
+try:
+    import lxml.html
+except ImportError:  # lxml est optionnel : repli sur le parseur Python pur
+    lxml = None
+
+# Variable d'environnement permettant de forcer un backend ("lxml", "html.parser" ou "stream")
+PARSER_ENV_VAR = "PATCHNOTES_HTML_PARSER"
+# Au-delà de cette taille (Mo), un fichier est analysé en flux si aucun backend n'est imposé
+STREAM_THRESHOLD_ENV_VAR = "PATCHNOTES_STREAM_THRESHOLD_MB"
+DEFAULT_STREAM_THRESHOLD_MB = 50
+
+
+def _iter_nodes_lxml(html, tags):
+    root = lxml.html.document_fromstring(html)
+    for element in root.iter(*tags):
+        yield element.tag, element.text_content()
+
+
+def _iter_nodes_html_parser(html, tags):
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup.find_all(list(tags)):
+        yield tag.name, tag.get_text()
+
+
+# Backends disponibles, du plus rapide au plus lent
+PARSER_BACKENDS = {
+    "lxml": _iter_nodes_lxml,
+    "html.parser": _iter_nodes_html_parser,
+    "stream": _iter_nodes_stream,
+}
+
+
+def available_backends():
+    """ Retourne la liste des backends utilisables dans cet environnement. """
+    return [name for name in PARSER_BACKENDS if name != "lxml" or lxml is not None]
+
+
+def resolve_backend(backend=None):
+    """
+    Choisit le backend : argument explicite, sinon variable d'environnement,
+    sinon le plus rapide disponible. Retombe sur 'html.parser' si lxml est absent.
+    """
+    backend = backend or os.environ.get(PARSER_ENV_VAR)
+    if backend is None:
+        return available_backends()[0]
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Backend HTML inconnu : {backend}. Choix possibles : {list(PARSER_BACKENDS)}")
+    if backend not in available_backends():
+        print(f"[AVERTISSEMENT] Backend '{backend}' indisponible, utilisation de 'html.parser'.")
+        return "html.parser"
+    return backend
+
+
+def read_html(html_file, prefilter=None):
+    """
+    Lit un fichier HTML. Par défaut (voir `PATCHNOTES_HTML_PREFILTER`), seule la zone de contenu
+    est conservée, sans scripts, styles ni habillage du site (voir `extractors.html_prefilter`).
+    """
+    if prefilter is None:
+        prefilter = prefilter_enabled()
+    if prefilter:
+        return read_prefiltered(html_file)
+    with open(html_file, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def iter_nodes(html, tags, backend=None):
+    """
+    Parcourt dans l'ordre du document les balises demandées et produit des couples (nom, texte).
+    Tous les backends produisent exactement la même séquence, à ceci près que le backend "stream"
+    ne donne pas le texte des conteneurs (table, tr ; voir `extractors.html_stream`).
+    """
+    return PARSER_BACKENDS[resolve_backend(backend)](html, tags)
+
+
+def stream_threshold():
+    """ Taille de fichier (octets) à partir de laquelle l'analyse se fait en flux par défaut. """
+    return float(os.environ.get(STREAM_THRESHOLD_ENV_VAR, DEFAULT_STREAM_THRESHOLD_MB)) * 1024 * 1024
+
+
+def iter_file_nodes(html_file, tags, backend=None):
+    """
+    Comme `iter_nodes`, pour un fichier. Les gros fichiers (voir `stream_threshold`) ou le backend
+    "stream" sont lus par blocs et analysés en flux, en mémoire bornée ; sinon le fichier est lu
+    (pré-filtré) puis analysé par le backend choisi.
+    """
+    if backend is None and not os.environ.get(PARSER_ENV_VAR) and os.path.getsize(html_file) >= stream_threshold():
+        backend = "stream"
+    if resolve_backend(backend) == "stream":
+        return _iter_file_nodes_stream(html_file, tags)
+    return iter_nodes(read_html(html_file), tags, backend)
+
+
+def compare_backends(html_file, repeat=5):
+    """
+    Vérifie que tous les backends disponibles produisent les mêmes enregistrements
+    pour `html_file` et mesure leur temps d'extraction moyen.
+    """
+    # Import local : extract_sciforma dépend lui-même de ce module
+    from extractors.extract_sciforma import walk_nodes
+
+    html = read_html(html_file)
+    results = {}
+    for backend in available_backends():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            walker = walk_nodes(iter_nodes(html, ["h1", "h2", "h3", "p"], backend))
+        elapsed = (time.perf_counter() - start) / repeat
+        results[backend] = (walker.records, elapsed)
+        print(f"[INFO] {backend:<12} : {elapsed * 1000:.1f} ms / analyse")
+
+    reference_backend = "html.parser"
+    reference = results[reference_backend][0]
+    identical = all(records == reference for records, _ in results.values())
+    for backend, (records, elapsed) in results.items():
+        if backend != reference_backend:
+            speedup = results[reference_backend][1] / elapsed if elapsed else float("inf")
+            print(f"[INFO] {backend} est {speedup:.1f}x plus rapide que {reference_backend}")
+    return identical
+
+
+if __name__ == "__main__":
+    html_file = sys.argv[1] if len(sys.argv) > 1 else "sciforma_patches/2024-09.html"
+    if compare_backends(html_file):
+        print(f"[SUCCÈS] Tous les backends produisent des enregistrements identiques pour '{html_file}'.")
+    else:
+        print(f"[ERREUR] Les backends produisent des enregistrements différents pour '{html_file}'.")
+        sys.exit(1)
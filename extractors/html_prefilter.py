@@ -0,0 +1,247 @@
+import sys
+import os
+import re
+import time
+import tracemalloc
+
+# Variable d'environnement permettant de désactiver le pré-filtrage ("0")
+PREFILTER_ENV_VAR = "PATCHNOTES_HTML_PREFILTER"
+
+# Taille des blocs lus dans le fichier HTML
+CHUNK_SIZE = 64 * 1024
+
+# Balises supprimées avec tout leur contenu : scripts, styles et habillage du site (menus, bandeaux, pied de page)
+DROP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "nav", "header", "footer", "aside"}
+# Habillage du site, supprimé seulement hors de la zone de contenu : dans un <article>,
+# un <header> peut porter le titre d'une section
+CHROME_TAGS = {"nav", "header", "footer", "aside"}
+# Balises dont le contenu est du texte brut : seule leur balise fermante les termine
+RAW_TEXT_TAGS = {"script", "style", "noscript", "template", "iframe"}
+# Balises délimitant la zone de contenu des notes de version (la première rencontrée est retenue)
+REGION_TAGS = {"main", "article"}
+
+# HTML gardé en attente d'une zone de contenu (caractères) : au-delà, la recherche de la zone est abandonnée
+# et le document est traité comme une page sans zone de contenu, en flux, sans rien accumuler
+REGION_SEARCH_LIMIT = 1024 * 1024
+
+# Seules les balises utiles au filtre sont repérées : le reste du document est recopié ou ignoré en bloc
+INTEREST_PATTERN = re.compile(
+    r"<!--|<(/?)(" + "|".join(sorted(DROP_TAGS | REGION_TAGS)) + r")(?=[\s/>])((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>",
+    re.I,
+)
+RAW_TEXT_END_PATTERNS = {tag: re.compile(rf"</{tag}\s*>", re.I) for tag in RAW_TEXT_TAGS}
+
+
+def prefilter_enabled():
+    return os.environ.get(PREFILTER_ENV_VAR, "1") != "0"
+
+
+class HTMLPreFilter:
+    """
+    Filtre HTML en flux, appliqué avant la construction de l'arbre : les blocs sont fournis à `feed`
+    dans l'ordre et le HTML conservé est retourné au fur et à mesure.
+    Seule la zone de contenu (<main> ou <article>) est gardée ; les balises de `DROP_TAGS`
+    y sont supprimées avec leur contenu, sauf celles de `CHROME_TAGS`, ainsi que les commentaires.
+    Sans zone de contenu, tout le document est gardé, débarrassé des mêmes balises. Le HTML lu avant
+    la zone de contenu est gardé en attente dans la limite de `region_search_limit` caractères ; au-delà,
+    la zone n'est plus recherchée et tout le document est gardé, ce qui borne la mémoire des pages sans zone.
+    """
+
+    def __init__(self, drop_tags=DROP_TAGS, region_tags=REGION_TAGS, region_search_limit=REGION_SEARCH_LIMIT,
+                 chrome_tags=CHROME_TAGS):
+        self.drop_tags = drop_tags
+        self.chrome_tags = chrome_tags
+        self.region_tags = region_tags
+        self.pending = ""
+        self.region = None         # Balise de la zone de contenu en cours
+        self.region_depth = 0
+        self.region_found = False
+        self.dropping = None       # Balise supprimée en cours
+        self.drop_depth = 0
+        self.before_region = []    # HTML gardé tant qu'aucune zone de contenu n'a été trouvée
+        self.before_region_size = 0
+        self.region_search_limit = region_search_limit
+        self.region_search = True  # False : zone de contenu abandonnée, tout le document est gardé
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def feed(self, chunk, final=False):
+        """ Ajoute un bloc de HTML ; retourne le HTML conservé qui peut déjà être émis. """
+        self.bytes_in += len(chunk)
+        html = self.pending + chunk
+        end = len(html)
+        if not final:
+            # Une balise coupée en fin de bloc est complétée par le bloc suivant
+            last = html.rfind("<")
+            if last >= 0 and html.find(">", last) < 0:
+                end = last
+        kept = []
+        position = 0
+
+        while position < end:
+            if self.dropping in RAW_TEXT_TAGS:
+                # Le contenu d'un script ou d'un style peut contenir "<" : on cherche directement la fermante
+                match = RAW_TEXT_END_PATTERNS[self.dropping].search(html, position, end)
+                if match is None:
+                    position = end
+                    break
+                self.dropping = None
+                position = match.end()
+                continue
+
+            match = INTEREST_PATTERN.search(html, position, end)
+            if match is None:
+                self._keep(kept, html[position:end])
+                position = end
+                break
+            self._keep(kept, html[position:match.start()])
+
+            if match.group(0) == "<!--":
+                comment_end = html.find("-->", match.end())
+                if comment_end < 0 and not final:
+                    position = match.start()
+                    break
+                position = len(html) if comment_end < 0 else comment_end + 3
+                continue
+
+            position = match.end()
+            self._tag(kept, match)
+
+        self.pending = html[position:]
+        return self._emit(kept)
+
+    def close(self):
+        """ Termine le flux ; retourne le reste du HTML conservé. """
+        output = self.feed("", final=True)
+        self.pending = ""
+        if not self.region_found:
+            # Aucune zone de contenu : tout le document filtré est conservé
+            self.region_found = True
+            output = self._emit(self.before_region)
+            self.before_region = []
+        return output
+
+    def _keep(self, kept, text):
+        if text and self.dropping is None and (self.region is not None or not self.region_found):
+            kept.append(text)
+
+    def _emit(self, kept):
+        if not self.region_found and self.region_search:
+            self.before_region.extend(kept)
+            self.before_region_size += sum(len(text) for text in kept)
+            if self.before_region_size <= self.region_search_limit:
+                return ""
+            # Trop de HTML sans zone de contenu : le document est gardé en entier, en flux
+            self.region_search = False
+            kept, self.before_region, self.before_region_size = self.before_region, [], 0
+        output = "".join(kept)
+        self.bytes_out += len(output)
+        return output
+
+    def _tag(self, kept, match):
+        closing, name, attributes = match.group(1), match.group(2).lower(), match.group(3)
+        if self.dropping is not None:
+            if name == self.dropping and not attributes.rstrip().endswith("/"):
+                self.drop_depth += -1 if closing else 1
+                if self.drop_depth == 0:
+                    self.dropping = None
+            return
+
+        if not closing and name in self.drop_tags and not (self.region is not None and name in self.chrome_tags):
+            if not attributes.rstrip().endswith("/"):
+                self.dropping, self.drop_depth = name, 1
+            return
+
+        if self.region is None:
+            if not closing and name in self.region_tags and self.region_search:
+                if not self.region_found:
+                    # Début de la zone de contenu : l'habillage lu jusqu'ici est abandonné
+                    self.region_found = True
+                    self.before_region = []
+                    kept.clear()
+                self.region, self.region_depth = name, 1
+                kept.append(match.group(0))
+            elif not self.region_found:
+                kept.append(match.group(0))
+            return
+
+        kept.append(match.group(0))
+        if name == self.region:
+            self.region_depth += -1 if closing else 1
+            if self.region_depth == 0:
+                self.region = None
+
+
+def prefilter_html(html):
+    """ Applique le pré-filtre à un document complet. """
+    prefilter = HTMLPreFilter()
+    return prefilter.feed(html) + prefilter.close()
+
+
+def iter_prefiltered(html_file, chunk_size=CHUNK_SIZE):
+    """ Lit un fichier HTML bloc par bloc et produit le HTML conservé par le pré-filtre. """
+    prefilter = HTMLPreFilter()
+    with open(html_file, "r", encoding="utf-8") as file:
+        for chunk in iter(lambda: file.read(chunk_size), ""):
+            output = prefilter.feed(chunk)
+            if output:
+                yield output
+    output = prefilter.close()
+    if output:
+        yield output
+
+
+def read_prefiltered(html_file, chunk_size=CHUNK_SIZE):
+    """ Retourne la zone de contenu d'un fichier HTML, sans jamais charger le document entier. """
+    return "".join(iter_prefiltered(html_file, chunk_size))
+
+
+def measure_prefilter(html_file, repeat=5):
+    """
+    Compare, pour chaque backend HTML disponible, l'analyse d'une release avec et sans pré-filtre :
+    taille du HTML analysé, durée moyenne (lecture + analyse), pic de mémoire Python
+    (tracemalloc : l'arbre C de lxml n'y figure pas) et identité des enregistrements extraits.
+    """
+    # Imports locaux : html_parsers dépend lui-même de ce module
+    from extractors.html_parsers import available_backends, iter_nodes
+    from extractors.extract_sciforma import walk_nodes
+
+    def read_full():
+        with open(html_file, "r", encoding="utf-8") as file:
+            return file.read()
+
+    identical = True
+    for backend in available_backends():
+        results = {}
+        for label, read in (("sans pré-filtre", read_full), ("avec pré-filtre", lambda: read_prefiltered(html_file))):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                walker = walk_nodes(iter_nodes(read(), ["h1", "h2", "h3", "p"], backend))
+            elapsed = (time.perf_counter() - start) / repeat
+
+            tracemalloc.start()
+            html = read()
+            walk_nodes(iter_nodes(html, ["h1", "h2", "h3", "p"], backend))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[label] = {"records": walker.records, "seconds": elapsed, "peak_mb": peak / 1024 / 1024, "html_kb": len(html) / 1024}
+
+        for label, result in results.items():
+            print(f"[INFO] {backend:<12} {label:<16} : {result['html_kb']:>8.1f} Ko analysés, "
+                  f"{result['seconds'] * 1000:>7.1f} ms, pic {result['peak_mb']:.2f} Mo")
+        full, filtered = results["sans pré-filtre"], results["avec pré-filtre"]
+        print(f"[INFO] {backend:<12} gain : {1 - filtered['html_kb'] / full['html_kb']:.0%} du HTML, "
+              f"{full['seconds'] / filtered['seconds']:.1f}x plus rapide, {full['peak_mb'] - filtered['peak_mb']:.2f} Mo de mémoire en moins")
+        identical = identical and full["records"] == filtered["records"]
+    return identical
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    html_file = sys.argv[1] if len(sys.argv) > 1 else "sciforma_patches/2024-09.html"
+    if measure_prefilter(html_file):
+        print(f"[SUCCÈS] Enregistrements identiques avec et sans pré-filtre pour '{html_file}'.")
+    else:
+        print(f"[ERREUR] Le pré-filtre modifie les enregistrements extraits de '{html_file}'.")
+        sys.exit(1)
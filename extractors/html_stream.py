@@ -0,0 +1,155 @@
+from collections import deque
+from html.parser import HTMLParser
+
+from extractors.html_prefilter import CHUNK_SIZE, HTMLPreFilter, prefilter_enabled
+
+# Balises dont seul le début compte pour les extracteurs : elles sont produites à leur ouverture, sans texte,
+# pour ne pas accumuler en mémoire le texte d'un tableau entier
+CONTAINER_TAGS = {"table", "tr"}
+
+# Éléments vides : jamais fermés
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+
+# Balises dont l'ouverture ferme un paragraphe encore ouvert (comme le fait libxml2)
+PARAGRAPH_CLOSERS = {
+    "address", "article", "aside", "blockquote", "details", "div", "dl", "fieldset", "figcaption", "figure",
+    "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "main", "menu", "nav", "ol", "p",
+    "pre", "section", "table", "ul",
+}
+# Balise ouverte -> (balises qu'elle ferme implicitement, balises qui limitent la recherche)
+IMPLIED_ENDS = {
+    "li": ({"li"}, {"ul", "ol"}),
+    "dt": ({"dt", "dd"}, {"dl"}),
+    "dd": ({"dt", "dd"}, {"dl"}),
+    "td": ({"td", "th"}, {"tr", "table"}),
+    "th": ({"td", "th"}, {"tr", "table"}),
+    "tr": ({"tr", "td", "th"}, {"table", "tbody", "thead", "tfoot"}),
+    "tbody": ({"tbody", "thead", "tfoot", "tr", "td", "th"}, {"table"}),
+    "thead": ({"tbody", "thead", "tfoot", "tr", "td", "th"}, {"table"}),
+    "tfoot": ({"tbody", "thead", "tfoot", "tr", "td", "th"}, {"table"}),
+}
+PARAGRAPH_SCOPE = {"td", "th", "li", "table", "button"}
+
+
+class NodeStreamParser(HTMLParser):
+    """
+    Analyse HTML événementielle et incrémentale : le document est fourni par blocs à `feed`
+    et les couples (nom, texte) des balises demandées sont disponibles dans `ready` dès leur fermeture,
+    dans l'ordre du document. Aucun arbre n'est construit : la mémoire ne dépend que de l'élément
+    demandé en cours, pas de la taille du document.
+    Les fermetures implicites (paragraphes, lignes et cellules de tableau, éléments de liste)
+    suivent celles de libxml2, pour produire la même séquence que les autres backends.
+    L'analyseur incrémental de lxml n'est pas utilisé : libxml2 garde en mémoire tout le HTML déjà lu.
+    """
+
+    def __init__(self, tags):
+        super().__init__(convert_charrefs=True)
+        self.tags = set(tags)
+        self.stack = []          # Balises ouvertes : [nom, texte collecté (liste) ou None]
+        self.pending = deque()   # Éléments demandés, dans l'ordre d'ouverture : [nom, texte, terminé]
+        self.collecting = []     # Éléments demandés ouverts dont le texte est collecté
+        self.ready = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in PARAGRAPH_CLOSERS:
+            self._close_implied({"p"}, PARAGRAPH_SCOPE)
+        if tag in IMPLIED_ENDS:
+            self._close_implied(*IMPLIED_ENDS[tag])
+
+        node = None
+        if tag in self.tags:
+            if tag in CONTAINER_TAGS:
+                self.pending.append([tag, "", True])
+                self._flush()
+            else:
+                node = [tag, [], False]
+                self.pending.append(node)
+                self.collecting.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append((tag, node))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # Une balise fermante sans ouvrante correspondante est ignorée
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                self._pop_to(index)
+                return
+
+    def handle_data(self, data):
+        for node in self.collecting:
+            node[1].append(data)
+
+    def _close_implied(self, names, scope):
+        for index in range(len(self.stack) - 1, -1, -1):
+            name = self.stack[index][0]
+            if name in names:
+                self._pop_to(index)
+                return
+            if name in scope:
+                return
+
+    def _pop_to(self, index):
+        while len(self.stack) > index:
+            _, node = self.stack.pop()
+            if node is not None:
+                node[1] = "".join(node[1])
+                node[2] = True
+                self.collecting.remove(node)
+        self._flush()
+
+    def _flush(self):
+        while self.pending and self.pending[0][2]:
+            name, text, _ = self.pending.popleft()
+            self.ready.append((name, text))
+
+    def finish(self):
+        """ Termine l'analyse : les éléments encore ouverts sont fermés. """
+        self.close()
+        self._pop_to(0)
+
+
+def iter_html_nodes(html, tags):
+    """ Backend "stream" de `extractors.html_parsers.iter_nodes` pour un document déjà en mémoire. """
+    parser = NodeStreamParser(tags)
+    for start in range(0, len(html), CHUNK_SIZE):
+        parser.feed(html[start:start + CHUNK_SIZE])
+        yield from parser.ready
+        parser.ready.clear()
+    parser.finish()
+    yield from parser.ready
+
+
+def iter_chunk_nodes(chunks, tags, prefilter=None):
+    """
+    Analyse en flux un document HTML fourni par blocs de texte (lecture d'un fichier, corps d'une requête
+    en cours de réception...), pré-filtré par défaut (voir `extractors.html_prefilter`), et produit
+    au fil des blocs les couples (nom, texte) des balises demandées.
+    """
+    if prefilter is None:
+        prefilter = prefilter_enabled()
+    html_filter = HTMLPreFilter() if prefilter else None
+    parser = NodeStreamParser(tags)
+
+    for chunk in chunks:
+        parser.feed(html_filter.feed(chunk) if html_filter else chunk)
+        yield from parser.ready
+        parser.ready.clear()
+    if html_filter:
+        parser.feed(html_filter.close())
+    parser.finish()
+    yield from parser.ready
+
+
+def iter_file_nodes(html_file, tags, chunk_size=CHUNK_SIZE, prefilter=None):
+    """
+    Lit un fichier HTML bloc par bloc et produit au fil de la lecture les couples (nom, texte)
+    des balises demandées (voir `iter_chunk_nodes`).
+    La mémoire utilisée reste bornée quelle que soit la taille du fichier.
+    """
+    with open(html_file, "r", encoding="utf-8") as file:
+        yield from iter_chunk_nodes(iter(lambda: file.read(chunk_size), ""), tags, prefilter)
@@ -0,0 +1,105 @@
+import pandas as pd
+
+from processors.intermediate import BatchWriter
+
+# Colonnes communes des enregistrements produits par tous les extracteurs
+COLUMNS = ["Section", "Sous-section", "ID", "Description"]
+
+# Nombre d'enregistrements accumulés avant écriture d'un lot
+BATCH_SIZE = 10000
+
+
+def records_to_dataframe(records):
+    """ Construit le DataFrame d'un type d'extraction à partir de ses enregistrements. """
+    df = pd.DataFrame(records, columns=COLUMNS)
+
+    # Suppression des doublons sur "ID" uniquement si la "Description" est vide
+    df = df[~((df.duplicated(subset=["ID"], keep=False)) & (df["Description"] == ""))]
+
+    # Ajouter une colonne "Test Status" vide
+    df["Test Status"] = ""
+    return df
+
+
+def validate_extract_types(extract_types, sections_mapping):
+    """ Retourne la liste des types demandés (tous par défaut) ; lève une ValueError si l'un est inconnu. """
+    extract_types = list(extract_types or sections_mapping)
+    for extract_type in extract_types:
+        if extract_type not in sections_mapping:
+            raise ValueError(f"Type d'extraction invalide : {extract_type}. Utilisez 'correctifs' ou 'améliorations'.")
+    return extract_types
+
+
+def collect_dataframes(records, sections_mapping, extract_types, source):
+    """
+    Regroupe par type d'extraction un flux d'enregistrements (type, [Section, Sous-section, ID, Description])
+    produit par l'`iter_records` d'un extracteur, et retourne un dictionnaire type -> DataFrame.
+    Lève une ValueError si aucune donnée n'est trouvée pour un type demandé.
+    """
+    collected = {extract_type: [] for extract_type in extract_types}
+    for extract_type, record in records:
+        if extract_type in collected:
+            collected[extract_type].append(record)
+
+    frames = {}
+    for extract_type in extract_types:
+        # Vérifier si toutes les sections attendues ont été trouvées
+        sections_found = {record[0] for record in collected[extract_type]}
+        missing_sections = [section for section in sections_mapping[extract_type] if section not in sections_found]
+        if missing_sections:
+            print(f"[AVERTISSEMENT] Certaines sections sont introuvables : {missing_sections}")
+
+        # Vérifier si des données ont été extraites
+        if not collected[extract_type]:
+            raise ValueError(f"Aucune donnée '{extract_type}' trouvée dans '{source}'. Vérifiez que les sections existent dans la page.")
+
+        frames[extract_type] = records_to_dataframe(collected[extract_type])
+
+    return frames
+
+
+def write_record_batches(records, sections_mapping, output_files, source, batch_size=BATCH_SIZE):
+    """
+    Écrit par lots un flux d'enregistrements (type, [Section, Sous-section, ID, Description]) dans un
+    fichier intermédiaire Arrow par type d'extraction (`output_files` : type -> chemin), avec la colonne
+    "Test Status" vide. La mémoire reste bornée à un lot par type, quelle que soit la taille du document.
+    Comme dans `records_to_dataframe`, un enregistrement sans description est écarté si son ID
+    a déjà été vu (seuls les ID sont gardés en mémoire, pas les lignes).
+    Retourne un dictionnaire type -> nombre de lignes écrites. Lève une ValueError (sans laisser
+    de fichier) si aucune donnée n'est trouvée pour un type demandé.
+    """
+    writers = {extract_type: BatchWriter(file_path, COLUMNS + ["Test Status"]) for extract_type, file_path in output_files.items()}
+    batches = {extract_type: [] for extract_type in output_files}
+    sections_found = {extract_type: set() for extract_type in output_files}
+    seen_ids = set()
+
+    try:
+        for extract_type, record in records:
+            if extract_type not in batches:
+                continue
+            section, _, issue_id, description = record
+            if not description and issue_id in seen_ids:
+                continue
+            seen_ids.add(issue_id)
+            sections_found[extract_type].add(section)
+            batch = batches[extract_type]
+            batch.append(record + [""])
+            if len(batch) >= batch_size:
+                writers[extract_type].write(batch)
+                batch.clear()
+
+        for extract_type, writer in writers.items():
+            writer.write(batches[extract_type])
+            missing_sections = [section for section in sections_mapping[extract_type] if section not in sections_found[extract_type]]
+            if missing_sections:
+                print(f"[AVERTISSEMENT] Certaines sections sont introuvables : {missing_sections}")
+            if not writer.rows:
+                raise ValueError(f"Aucune donnée '{extract_type}' trouvée dans '{source}'. Vérifiez que les sections existent dans la page.")
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        raise
+
+    for writer in writers.values():
+        writer.close()
+    return {extract_type: writer.rows for extract_type, writer in writers.items()}
@@ -0,0 +1,80 @@
+import importlib
+import threading
+
+# Système -> module de son extracteur. Les modules ne sont importés qu'à la première utilisation.
+# Chaque extracteur expose :
+# - SECTIONS_MAPPING : type d'extraction -> titres des sections à extraire
+# - NODE_TAGS : balises HTML lues par l'extracteur
+# - records_from_nodes(nodes) : flux d'enregistrements (type, [Section, Sous-section, ID, Description])
+#   à partir d'un flux de couples (balise, texte)
+# - iter_records(html_file, parser=None) : même flux, pour un fichier
+# - extract_dataframes(html_file, extract_types=None, parser=None) : type -> DataFrame
+EXTRACTORS = {
+    "Sciforma": "extractors.extract_sciforma",
+    "BC": "extractors.extract_bc",
+}
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def available_systems():
+    """ Systèmes pour lesquels un extracteur est déclaré. """
+    return list(EXTRACTORS)
+
+
+def resolve_system(system):
+    """ Retrouve le nom déclaré d'un système (insensible à la casse) ; lève une ValueError s'il est inconnu. """
+    for name in EXTRACTORS:
+        if name.lower() == str(system).lower():
+            return name
+    raise ValueError(f"Système inconnu : {system}. Choix possibles : {available_systems()}")
+
+
+def get_extractor(system):
+    """
+    Retourne le module extracteur d'un système, importé à la demande.
+    L'import est protégé par un verrou : des traitements concurrents de systèmes différents
+    dans un même processus n'importent chaque extracteur qu'une fois.
+    """
+    system = resolve_system(system)
+    extractor = _loaded.get(system)
+    if extractor is None:
+        with _lock:
+            extractor = _loaded.get(system)
+            if extractor is None:
+                extractor = importlib.import_module(EXTRACTORS[system])
+                _loaded[system] = extractor
+    return extractor
+
+
+def iter_records(html_file, system, parser=None):
+    """ Flux des enregistrements d'une release, avec l'extracteur de son système. """
+    return get_extractor(system).iter_records(html_file, parser)
+
+
+def extract_dataframes(html_file, system, extract_types=None, parser=None):
+    """ Extrait une release avec l'extracteur de son système ; retourne type d'extraction -> DataFrame. """
+    return get_extractor(system).extract_dataframes(html_file, extract_types, parser)
+
+
+def parse_chunks(chunks, system):
+    """
+    Analyse en flux une release reçue par blocs de texte (par exemple pendant la réception d'un envoi),
+    sans fichier. Retourne la liste des enregistrements (type, [Section, Sous-section, ID, Description]),
+    à regrouper ensuite avec `chunk_frames` : un appelant peut ainsi consulter le cache des résultats
+    une fois l'empreinte de l'envoi connue, avant de construire les DataFrames.
+    """
+    from extractors.html_stream import iter_chunk_nodes
+
+    extractor = get_extractor(system)
+    return list(extractor.records_from_nodes(iter_chunk_nodes(chunks, extractor.NODE_TAGS)))
+
+
+def chunk_frames(records, system, extract_types=None, source="<flux>"):
+    """ Regroupe les enregistrements produits par `parse_chunks` : dictionnaire type d'extraction -> DataFrame. """
+    from extractors.records import collect_dataframes, validate_extract_types
+
+    extractor = get_extractor(system)
+    extract_types = validate_extract_types(extract_types, extractor.SECTIONS_MAPPING)
+    return collect_dataframes(records, extractor.SECTIONS_MAPPING, extract_types, source)
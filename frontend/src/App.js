@@ -2,6 +2,7 @@ import React from "react";
 import { BrowserRouter as Router, Routes, Route, Link } from "react-router-dom";
 import Home from "./pages/Home";
 import PatchNotes from "./pages/PatchNotes";
+import Dashboard from "./pages/Dashboard";
 
 function App() {
   return (
@@ -10,11 +11,13 @@ function App() {
         <nav className="p-4 bg-gray-800 text-white flex gap-4">
           <Link to="/">Accueil</Link>
           <Link to="/patch-notes">Patch Notes</Link>
+          <Link to="/dashboard">Tableau de bord</Link>
         </nav>
 
         <Routes>
           <Route path="/" element={<Home />} />
           <Route path="/patch-notes" element={<PatchNotes />} />
+          <Route path="/dashboard" element={<Dashboard />} />
         </Routes>
       </div>
     </Router>
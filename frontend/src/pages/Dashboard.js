@@ -0,0 +1,107 @@
+import React, { useEffect, useState } from "react";
+
+const API_URL = process.env.REACT_APP_API_URL || "http://localhost:5000";
+
+// Dimensions du cube des impacts (voir analysis/impact_dashboard.py)
+const DIMENSIONS = {
+  module: "Module impacté",
+  release: "Release",
+  type: "Type",
+  section: "Section",
+  test_status: "Test Status",
+  system: "Système",
+};
+
+function Dashboard() {
+  const [groupBy, setGroupBy] = useState(["module"]);
+  const [filters, setFilters] = useState({});
+  const [values, setValues] = useState({});
+  const [result, setResult] = useState(null);
+  const [error, setError] = useState(null);
+
+  useEffect(() => {
+    fetch(`${API_URL}/dashboard/dimensions`)
+      .then((response) => response.json())
+      .then(setValues)
+      .catch(() => setError("Impossible de charger les dimensions du tableau de bord."));
+  }, []);
+
+  useEffect(() => {
+    const params = new URLSearchParams({ group_by: groupBy.join(",") });
+    Object.entries(filters).forEach(([name, value]) => value && params.append(name, value));
+    fetch(`${API_URL}/dashboard/cube?${params}`)
+      .then((response) => response.json())
+      .then((data) => {
+        setError(data.error || null);
+        setResult(data.error ? null : data);
+      })
+      .catch(() => setError("Impossible de charger les agrégats."));
+  }, [groupBy, filters]);
+
+  const toggleDimension = (name) =>
+    setGroupBy((current) => (current.includes(name) ? current.filter((item) => item !== name) : [...current, name]));
+
+  return (
+    <div className="p-6">
+      <h1 className="text-2xl font-bold mb-4">Tableau de bord des impacts</h1>
+
+      <div className="flex flex-wrap gap-4 mb-4">
+        {Object.entries(DIMENSIONS).map(([name, label]) => (
+          <label key={name} className="flex items-center gap-1">
+            <input type="checkbox" checked={groupBy.includes(name)} onChange={() => toggleDimension(name)} />
+            {label}
+          </label>
+        ))}
+      </div>
+
+      <div className="flex flex-wrap gap-4 mb-6">
+        {Object.entries(DIMENSIONS).map(([name, label]) => (
+          <select
+            key={name}
+            className="border border-gray-300 rounded p-1"
+            value={filters[name] || ""}
+            onChange={(event) => setFilters({ ...filters, [name]: event.target.value })}
+          >
+            <option value="">{label} : toutes</option>
+            {(values[name] || []).map((value) => (
+              <option key={value} value={value}>{value}</option>
+            ))}
+          </select>
+        ))}
+      </div>
+
+      {error && <p className="text-red-600">{error}</p>}
+
+      {result && (
+        <table className="min-w-full bg-white border border-gray-300">
+          <thead className="bg-gray-800 text-white">
+            <tr>
+              {result.group_by.map((name) => (
+                <th key={name} className="p-2 text-left">{DIMENSIONS[name]}</th>
+              ))}
+              <th className="p-2 text-right">Nombre</th>
+            </tr>
+          </thead>
+          <tbody>
+            {result.rows.map((row, index) => (
+              <tr key={index} className="border-t border-gray-200">
+                {result.group_by.map((name) => (
+                  <td key={name} className="p-2">{row[name]}</td>
+                ))}
+                <td className="p-2 text-right">{row.count}</td>
+              </tr>
+            ))}
+          </tbody>
+          <tfoot>
+            <tr className="border-t border-gray-400 font-bold">
+              {result.group_by.length > 0 && <td className="p-2" colSpan={result.group_by.length}>Total</td>}
+              <td className="p-2 text-right">{result.total}</td>
+            </tr>
+          </tfoot>
+        </table>
+      )}
+    </div>
+  );
+}
+
+export default Dashboard;
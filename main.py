@@ -1,7 +1,11 @@
 import sys
 import os
+import json
 import yaml
-import subprocess
+
+from pipeline import run_pipeline
+from processors.issue_store import IssueStore
+from backend.search_index import SearchIndex
 
 
 # Définition des répertoires pour chaque système
@@ -11,65 +15,52 @@ DIRECTORIES = {
 }
 
 def load_config():
-    """ Charge la configuration YAML si elle existe. """
+    """
+    Charge la configuration YAML si elle existe. Elle n'est jamais réécrite : chaque exécution
+    en fige une copie complétée de ses paramètres dans son dossier de travail (voir `processors.workspace`).
+    """
     config_file = "config.yaml"
     if os.path.exists(config_file):
         with open(config_file, "r") as file:
             return yaml.safe_load(file) or {}
     return {}
 
-def save_config(config):
-    """ Sauvegarde la configuration mise à jour dans config.yaml. """
-    with open("config.yaml", "w") as file:
-        yaml.dump(config, file)
+def print_event(event):
+    """ Écrit un événement d'étape sur une ligne JSON (lue par l'interface graphique). """
+    print(json.dumps(event.to_dict(), ensure_ascii=False), flush=True)
 
-def process_html_file(html_file, system):
-    """ Exécute tout le pipeline avec UTF-8 forcé dans `subprocess.run()`. """
-    if not os.path.exists(html_file):
-        print(f"[ERREUR] Le fichier {html_file} n'existe pas.")
+def process_html_file(html_file, system, events=False, config=None):
+    """
+    Exécute tout le pipeline dans le processus courant via `run_pipeline()`,
+    en reprenant du stockage des issues celles déjà traitées et en indexant la release pour la recherche.
+    Avec `events`, chaque étape écrit aussi ses événements structurés sur la sortie standard (JSON lines).
+    `config` est figée dans le dossier de travail de l'exécution.
+    """
+    try:
+        result = run_pipeline(html_file, system, store=IssueStore(), search_index=SearchIndex(),
+                              on_event=print_event if events else None, config=config)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"[ERREUR] {e}")
         sys.exit(1)
 
-    base_name = os.path.splitext(os.path.basename(html_file))[0]
-    
-    RESULTS_FOLDER = "backend/results"
-    os.makedirs(RESULTS_FOLDER, exist_ok=True)
-
-    correctifs_file = os.path.join(RESULTS_FOLDER, f"{base_name}_correctifs.xlsx")
-    enhancements_file = os.path.join(RESULTS_FOLDER, f"{base_name}_enhancements.xlsx")
-    master_file = os.path.join(RESULTS_FOLDER, f"{base_name}_Master.xlsx")
-
-    commands = [
-        ["python", "extractors/extract_sciforma.py", html_file, "--type", "correctifs", correctifs_file],
-        ["python", "extractors/extract_sciforma.py", html_file, "--type", "améliorations", enhancements_file],
-        ["python", "processors/clean_data.py", correctifs_file, enhancements_file],
-        ["python", "analysis/extract_modules_dynamic.py", correctifs_file, enhancements_file],
-        ["python", "analysis/categorize_impacts.py", correctifs_file, enhancements_file],
-        ["python", "mergers/merge_to_master.py", base_name, correctifs_file, enhancements_file, master_file],
-        ["python", "processors/format_data.py", master_file]
-    ]
-
-    for cmd in commands:
-        print(f"[INFO] Exécution : {' '.join(cmd)}")
-        subprocess.run(cmd, check=True, text=True, encoding="utf-8")
-
-    print(f"\n[SUCCÈS] Processus terminé ! Fichier Master généré : {master_file}")
+    print(f"\n[SUCCÈS] Processus terminé ! Fichier Master généré : {result.master_file}")
+    return result
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("[ERREUR] Arguments manquants. Utilisation : python main.py <chemin_html> <système>")
+    events = "--events" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--events"]
+    if len(args) < 2:
+        print("[ERREUR] Arguments manquants. Utilisation : python main.py <chemin_html> <système> [--events]")
         sys.exit(1)
 
-    html_file = sys.argv[1]
-    system = sys.argv[2]
+    html_file = args[0]
+    system = args[1]
 
     if system not in DIRECTORIES:
         print("[ERREUR] Système invalide. Veuillez choisir 'Sciforma' ou 'BC'.")
         sys.exit(1)
 
     config = load_config()
-    config["html_file"] = html_file
-    config["system"] = system
     config["html_dir"] = DIRECTORIES[system]
 
-    save_config(config)
-    process_html_file(html_file, system)
+    process_html_file(html_file, system, events, config)
@@ -1,13 +1,37 @@
 import sys
 import os
-import pandas as pd
-import subprocess
-from openpyxl import load_workbook
+
+# Permet l'import des autres étapes du pipeline lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.format_data import write_master
+from processors.intermediate import read_table
+
+def merge_dataframes(sheets, master_filename, reset_test_status=True):
+    """
+    Écrit les DataFrames fournis (nom de feuille -> DataFrame) dans un seul fichier Master,
+    déjà mis en forme, avec sa feuille 'Résumé'.
+    - Réinitialise la colonne 'Test Status' de chaque feuille, sauf si `reset_test_status`
+      est faux (statuts repris du stockage des issues).
+    """
+    master_sheets = {}
+    for sheet_name, df in sheets.items():
+        df = df.copy()
+        if reset_test_status or "Test Status" not in df.columns:
+            df["Test Status"] = ""  # Ajout de la colonne Test Status
+        master_sheets[sheet_name] = df
+
+    write_master(master_sheets, master_filename)
+    for sheet_name in master_sheets:
+        print(f"[SUCCÈS] Feuille '{sheet_name}' ajoutée au fichier maître avec colonne 'Test Status'.")
+
+    print("[SUCCÈS] Feuille 'Résumé' ajoutée avec des totaux et un graphique.")
+    print(f"\n[INFO] Fichier Master '{master_filename}' généré avec succès.")
 
 def merge_to_master(base_name, correctifs_file, enhancements_file, master_filename):
     """
     Fusionne les fichiers Correctifs et Enhancements en un seul fichier Master.
-    - Ajoute une colonne 'Test Status' à chaque feuille.
+    - Ajoute une colonne 'Test Status' à chaque feuille et une feuille 'Résumé'.
     - Vérifie que les fichiers existent avant de les inclure.
     """
 
@@ -18,29 +42,18 @@ def merge_to_master(base_name, correctifs_file, enhancements_file, master_filena
         "Enhancements": enhancements_file
     }
 
-    with pd.ExcelWriter(master_filename, engine="openpyxl") as writer:
-        for sheet_name, file in files.items():
-            if os.path.exists(file):
-                df = pd.read_excel(file)
-                df["Test Status"] = ""  # Ajout de la colonne Test Status
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                print(f"[SUCCÈS] Feuille '{sheet_name}' ajoutée au fichier maître avec colonne 'Test Status'.")
-            else:
-                print(f"[AVERTISSEMENT] Fichier '{file}' introuvable. Feuille '{sheet_name}' ignorée.")
-
-    print(f"\n[INFO] Fichier Master '{master_filename}' généré avec succès.")
+    sheets = {}
+    for sheet_name, file in files.items():
+        if os.path.exists(file):
+            sheets[sheet_name] = read_table(file)
+        else:
+            print(f"[AVERTISSEMENT] Fichier '{file}' introuvable. Feuille '{sheet_name}' ignorée.")
 
-    # Ajouter la feuille Résumé via `add_summary.py`
-    print("\n[INFO] Ajout du résumé avec `add_summary.py`...")
-    try:
-        subprocess.run(["python", "summary/add_summary.py", master_filename], check=True)
-        print(f"[SUCCÈS] Résumé ajouté avec succès à '{master_filename}'.")
-    except subprocess.CalledProcessError as e:
-        print(f"[ERREUR] Problème lors de l'ajout du résumé : {e}")
+    merge_dataframes(sheets, master_filename)
 
 if __name__ == "__main__":
     # Vérifie si les arguments nécessaires sont bien passés
-    if len(sys.argv) < 4:
+    if len(sys.argv) < 5:
         print("[ERREUR] Arguments manquants. Utilisation : python merge_to_master.py base_name correctifs_file enhancements_file master_filename")
         sys.exit(1)
 
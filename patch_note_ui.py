@@ -1,5 +1,6 @@
 import sys
 import os
+import json
 import subprocess
 import locale
 
@@ -25,27 +26,38 @@ class WorkerThread(QThread):
     def run(self):
         """Exécute main.py et envoie les logs et la progression."""
         process = subprocess.Popen(
-            ["python", "main.py", self.file_path, self.system],
+            [sys.executable, "-u", "main.py", self.file_path, self.system, "--events"],
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             text=True,
             encoding=locale.getpreferredencoding()  # 🔥 Auto-détection de l'encodage Windows
         )
 
-        total_steps = 6  # Nombre d'étapes du pipeline (estimation)
-        step_count = 0
-
         for line in process.stdout:
-            self.update_log.emit(line.strip())
-            if "Exécution" in line:
-                step_count += 1
-                progress_value = int((step_count / total_steps) * 100)
-                self.progress.emit(progress_value)
+            event = self.parse_event(line)
+            if event is None:
+                self.update_log.emit(line.strip())
+            elif event["event"] == "end":
+                # La progression vient des événements d'étape émis par le pipeline (main.py --events)
+                self.progress.emit(int(event["step"] / event["total"] * 100))
+                rows = f", {event['rows_out']} lignes" if event.get("rows_out") is not None else ""
+                self.update_log.emit(f"[INFO] Étape terminée : {event['label']} ({event['duration']:.2f} s{rows})")
 
         process.stdout.close()
         process.wait()
         self.finished.emit(process.returncode == 0)
 
+    @staticmethod
+    def parse_event(line):
+        """Retourne l'événement d'étape contenu dans une ligne JSON, ou None pour une ligne de log."""
+        if not line.startswith("{"):
+            return None
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return None
+        return event if isinstance(event, dict) and "stage" in event else None
+
 
 class PatchNoteUI(QWidget):
     """Interface graphique améliorée pour l'analyse des patch notes."""
@@ -0,0 +1,276 @@
+import os
+import sys
+import time
+import hashlib
+import importlib.util
+import pandas as pd
+from functools import lru_cache
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+
+try:
+    import resource
+except ImportError:  # Windows : pas de mesure du pic de mémoire
+    resource = None
+
+from extractors.registry import extract_dataframes
+from processors.clean_data import clean_dataframe
+from analysis.categorize_impacts import categorize_dataframe, mapping_version
+from analysis.near_duplicates import DUPLICATES_COLUMN, NearDuplicateIndex
+from analysis.impact_dashboard import ImpactCube
+from mergers.Merge_to_master import merge_dataframes
+from processors.intermediate import INTERMEDIATE_EXTENSION, write_frame
+from processors.workspace import RunWorkspace
+
+RESULTS_FOLDER = "backend/results"
+
+# Modules dont le code détermine le contenu du fichier Master (voir `pipeline_version`)
+PIPELINE_MODULES = [
+    "extractors.registry",
+    "extractors.records",
+    "extractors.extract_sciforma",
+    "extractors.extract_bc",
+    "extractors.html_parsers",
+    "extractors.html_prefilter",
+    "extractors.html_stream",
+    "processors.clean_data",
+    "analysis.categorize_impacts",
+    "analysis.mapping_store",
+    "analysis.module_classifier",
+    "analysis.near_duplicates",
+    "analysis.impact_dashboard",
+    "mergers.Merge_to_master",
+    "summary.add_summary",
+    "processors.format_data",
+    "processors.intermediate",
+    "processors.issue_store",
+]
+
+# Feuilles du fichier Master et type d'extraction correspondant
+SHEETS = {
+    "Correctifs": "correctifs",
+    "Enhancements": "améliorations"
+}
+
+# Nombre d'étapes annoncées par `run_pipeline` (extraction, nettoyage et catégorisation par feuille,
+# détection des doublons, fusion). Sans stockage des issues, il n'y a pas de détection des doublons.
+STAGE_COUNT = 1 + 2 * len(SHEETS) + 1 + 1
+
+
+@dataclass
+class StageEvent:
+    """
+    Événement structuré émis au début ("start"), à la fin ("end") ou en cas d'échec ("error")
+    de chaque étape du pipeline. `stage` est un identifiant stable (extract, clean, categorize, merge),
+    `label` le libellé affiché ; les mesures (durée, lignes, pic de mémoire) accompagnent les événements
+    de fin, aussi renvoyés dans `PipelineResult.stages`.
+    """
+    event: str
+    stage: str
+    label: str
+    step: int
+    total: int
+    sheet: str = None
+    duration: float = None
+    rows_in: int = None
+    rows_out: int = None
+    peak_rss_mb: float = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class PipelineResult:
+    """ Résultat d'une exécution du pipeline. """
+    html_file: str
+    system: str
+    master_file: str
+    run_id: str = None
+    sheets: dict = field(default_factory=dict)
+    intermediate_files: dict = field(default_factory=dict)
+    incremental: dict = field(default_factory=dict)
+    stages: list = field(default_factory=list)
+
+
+def peak_rss_mb():
+    """ Pic de mémoire résidente du processus (Mo), ou None si la plateforme ne le fournit pas. """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sous macOS, kilo-octets sous Linux
+    return round(peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024, 1)
+
+
+@lru_cache(maxsize=None)
+def pipeline_version():
+    """
+    Empreinte du code du pipeline : change dès qu'un des modules participant
+    à la production du Master est modifié. Les modules sont localisés sans être importés
+    (les extracteurs ne sont chargés qu'à leur première utilisation).
+    """
+    digest = hashlib.sha256()
+    for path in [os.path.abspath(__file__)] + [importlib.util.find_spec(name).origin for name in PIPELINE_MODULES]:
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()[:16]
+
+
+def categorize_incremental(df, system, store, version):
+    """
+    Catégorise uniquement les lignes nouvelles ou modifiées : les lignes déjà présentes
+    dans le stockage (même ID, même contenu, même mapping) reprennent leurs résultats,
+    y compris le 'Test Status'. Retourne (DataFrame catégorisé, lignes réutilisées).
+    """
+    known = store.lookup(system, df, version)
+    new_rows = df.loc[~df.index.isin(known.index)]
+    reused_rows = df.loc[known.index].drop(columns=[c for c in known.columns if c in df.columns])
+
+    parts = [reused_rows.join(known)]
+    if len(new_rows):
+        parts.append(categorize_dataframe(new_rows))
+    columns = list(df.columns) + [column for column in known.columns if column not in df.columns]
+    return pd.concat(parts).loc[df.index, columns], len(known)
+
+
+def flag_duplicates(duplicates, system, release, sheets):
+    """
+    Ajoute à chaque feuille la colonne 'Doublons potentiels' : doublons probables des issues
+    dans les releases antérieures déjà indexées par `duplicates` (un `NearDuplicateIndex`).
+    La release n'est pas indexée. Retourne (feuilles complétées, nombre d'issues signalées).
+    """
+    found = duplicates.find_duplicates(system, release, sheets)
+    sheets = {
+        sheet_name: df.assign(**{DUPLICATES_COLUMN: found[sheet_name]}) if sheet_name in found else df
+        for sheet_name, df in sheets.items()
+    }
+    return sheets, sum(int((values != "").sum()) for values in found.values())
+
+
+def run_pipeline(html_file, system, results_folder=RESULTS_FOLDER, progress=None, store=None, search_index=None,
+                 on_event=None, frames=None, workspace=None, config=None, detect_duplicates=True):
+    """
+    Exécute tout le pipeline dans le processus courant, les DataFrames passant directement
+    d'une étape à l'autre, et retourne un `PipelineResult` (Master écrit dans `results_folder`).
+    """
+    if workspace is None:
+        # Sans dossier de travail fourni, l'exécution a le sien (voir `processors.workspace`) : les résultats
+        # y sont écrits puis publiés dans `results_folder`. Sinon, l'appelant publie puis ferme le dossier.
+        os.makedirs(results_folder, exist_ok=True)
+        with RunWorkspace(results_folder, {**(config or {}), "html_file": html_file, "system": system}) as workspace:
+            result = run_pipeline(html_file, system, results_folder, progress, store, search_index, on_event,
+                                  frames, workspace, detect_duplicates=detect_duplicates)
+            # Les fichiers intermédiaires d'abord : le Master publié signale une exécution complète
+            result.intermediate_files = {
+                sheet_name: workspace.publish(path) for sheet_name, path in result.intermediate_files.items()
+            }
+            result.master_file = workspace.publish(result.master_file)
+        return result
+
+    step = 0
+    stages = []
+    # La détection des doublons utilise l'index MinHash/LSH de la base du stockage ; avec
+    # detect_duplicates=False, elle est laissée à l'appelant (voir `batch.flag_batch_duplicates`)
+    detect_duplicates = detect_duplicates and store is not None
+    total_steps = STAGE_COUNT if detect_duplicates else STAGE_COUNT - 1
+
+    @contextmanager
+    def stage(name, label, sheet=None, rows_in=None):
+        """ Étape du pipeline : `progress(libellé, étape, nombre d'étapes)` puis `StageEvent` vers `on_event`. """
+        nonlocal step
+        step += 1
+        print(f"[INFO] Exécution : {label}")
+        if progress:
+            progress(label, step, total_steps)
+
+        def emit(event, **measures):
+            stage_event = StageEvent(event, name, label, step, total_steps, sheet=sheet, rows_in=rows_in, **measures)
+            if on_event:
+                on_event(stage_event)
+            return stage_event
+
+        emit("start")
+        counts = {"rows_out": None}
+        start = time.perf_counter()
+        try:
+            yield counts
+        except Exception:
+            emit("error", duration=time.perf_counter() - start, peak_rss_mb=peak_rss_mb())
+            raise
+        stages.append(emit("end", duration=time.perf_counter() - start, rows_out=counts["rows_out"], peak_rss_mb=peak_rss_mb()))
+
+    # `frames` : release déjà extraite (voir `extractors.registry.parse_chunks`), `html_file` ne sert qu'aux noms
+    if frames is None and not os.path.exists(html_file):
+        raise FileNotFoundError(f"Le fichier {html_file} n'existe pas.")
+
+    base_name = os.path.splitext(os.path.basename(html_file))[0]
+    print(f"[INFO] Dossier de travail de l'exécution {workspace.run_id} : {workspace.folder}")
+    master_file = workspace.path(f"{base_name}_Master.xlsx")
+
+    with stage("extract", "extraction des correctifs et améliorations") as counts:
+        if frames is None:
+            frames = extract_dataframes(html_file, system, SHEETS.values())
+        counts["rows_out"] = sum(len(df) for df in frames.values())
+
+    sheets = {}
+    intermediate_files = {}
+    version = mapping_version()
+    incremental = {"reused": 0, "processed": 0}
+    for sheet_name, extract_type in SHEETS.items():
+        df = frames[extract_type]
+
+        with stage("clean", f"nettoyage des {extract_type}", sheet_name, len(df)) as counts:
+            df, rows_removed = clean_dataframe(df)
+            if rows_removed > 0:
+                print(f"[SUCCÈS] {rows_removed} lignes supprimées.")
+            counts["rows_out"] = len(df)
+
+        with stage("categorize", f"catégorisation des {extract_type}", sheet_name, len(df)) as counts:
+            if store is not None:
+                sheets[sheet_name], reused = categorize_incremental(df, system, store, version)
+            else:
+                sheets[sheet_name], reused = categorize_dataframe(df), 0
+            counts["rows_out"] = len(sheets[sheet_name])
+        incremental["reused"] += reused
+        incremental["processed"] += len(df) - reused
+
+        intermediate_files[sheet_name] = workspace.path(f"{base_name}_{sheet_name.lower()}{INTERMEDIATE_EXTENSION}")
+        write_frame(sheets[sheet_name], intermediate_files[sheet_name])
+
+    total_rows = sum(len(df) for df in sheets.values())
+    duplicates = NearDuplicateIndex(store.path) if detect_duplicates else None
+    if duplicates is not None:
+        with stage("duplicates", "détection des doublons entre releases", rows_in=total_rows) as counts:
+            sheets, flagged = flag_duplicates(duplicates, system, base_name, sheets)
+            print(f"[INFO] {flagged} issue(s) avec des doublons potentiels dans des releases antérieures.")
+            counts["rows_out"] = total_rows
+
+    with stage("merge", "fusion, mise en forme et résumé du fichier Master", rows_in=total_rows) as counts:
+        merge_dataframes(sheets, master_file, reset_test_status=store is None)
+        counts["rows_out"] = total_rows
+
+    if store is not None:
+        for df in sheets.values():
+            store.save(system, df, base_name, version)
+        if duplicates is not None:
+            duplicates.add_release(system, base_name, sheets)
+        ImpactCube(store.path).add_release(system, base_name, sheets)
+        total = incremental["reused"] + incremental["processed"]
+        saved = incremental["reused"] / total * 100 if total else 0
+        print(f"[INFO] Incrémental : {incremental['reused']} ligne(s) reprise(s) du stockage, "
+              f"{incremental['processed']} nouvelle(s) ou modifiée(s) ({saved:.0f}% de catégorisation évitée).")
+
+    if search_index is not None:
+        indexed = search_index.index_release(system, base_name, sheets)
+        print(f"[INFO] {indexed} issue(s) indexée(s) pour la recherche.")
+
+    return PipelineResult(
+        html_file=html_file,
+        system=system,
+        master_file=master_file,
+        run_id=workspace.run_id,
+        sheets=sheets,
+        intermediate_files=intermediate_files,
+        incremental=incremental if store is not None else {},
+        stages=[stage_event.to_dict() for stage_event in stages],
+    )
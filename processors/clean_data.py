@@ -1,38 +1,56 @@
 import sys
-import pandas as pd
+import os
+
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.intermediate import read_table, write_table
+
+REQUIRED_COLUMNS = {"Section", "Sous-section", "ID", "Description"}
+
+def clean_dataframe(df):
+    """
+    Nettoie et valide un DataFrame issu de l'extraction :
+    - Supprime les lignes où l'ID est manquant
+    - Vérifie la présence des colonnes nécessaires
+    Retourne le DataFrame nettoyé et le nombre de lignes supprimées.
+    """
+    # Vérifier si le DataFrame contient les bonnes colonnes
+    if not REQUIRED_COLUMNS.issubset(df.columns):
+        raise ValueError("Les données ne contiennent pas toutes les colonnes requises.")
+
+    # Supprimer les lignes où l'ID est manquant (évite les erreurs en aval)
+    initial_rows = len(df)
+    df = df.dropna(subset=["ID"])
+    return df, initial_rows - len(df)
 
 def clean_excel(file_path):
     """
-    Nettoie et valide le fichier Excel après extraction :
+    Nettoie et valide le fichier (Arrow ou Excel) après extraction :
     - Supprime les lignes où l'ID est manquant
     - Vérifie la présence des colonnes nécessaires
     """
     print(f"[INFO] Vérification et nettoyage des données dans : {file_path}")
 
     # Charger les données
-    df = pd.read_excel(file_path)
+    df = read_table(file_path)
 
-    # Vérifier si le fichier contient les bonnes colonnes
-    required_columns = {"Section", "Sous-section", "ID", "Description"}
-    if not required_columns.issubset(df.columns):
+    try:
+        df, rows_removed = clean_dataframe(df)
+    except ValueError:
         print(f"[ERREUR] Le fichier '{file_path}' ne contient pas toutes les colonnes requises.")
         return
 
-    # Supprimer les lignes où l'ID est manquant (évite les erreurs en aval)
-    initial_rows = len(df)
-    df = df.dropna(subset=["ID"])
-    rows_removed = initial_rows - len(df)
-
     # Sauvegarder le fichier nettoyé uniquement si des modifications ont été faites
     if rows_removed > 0:
-        df.to_excel(file_path, index=False)
+        write_table(df, file_path)
         print(f"[SUCCÈS] {rows_removed} lignes supprimées. Fichier nettoyé : {file_path}")
     else:
         print(f"[INFO] Aucune correction nécessaire dans {file_path}")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("[ERREUR] Aucun fichier spécifié. Utilisation : python clean_data.py fichier.xlsx")
+        print("[ERREUR] Aucun fichier spécifié. Utilisation : python clean_data.py fichier.arrow")
         sys.exit(1)
 
     # Nettoyer chaque fichier passé en argument
@@ -1,10 +1,22 @@
 import sys
 import os
-from openpyxl import load_workbook
-from openpyxl.worksheet.table import Table, TableStyleInfo
+import warnings
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Alignment, Font
 
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from summary.add_summary import write_summary_sheet
+
+TABLE_STYLE = "TableStyleMedium9"
+DESCRIPTION_WIDTH = 50  # Largeur plus grande pour descriptions
+MAX_COLUMN_WIDTH = 30
+
 def format_excel(file_path):
     """
     Applique un formatage automatique au fichier Excel :
@@ -73,6 +85,90 @@ def format_excel(file_path):
     wb.save(file_path)
     print(f"\n[SUCCESS] Mise en forme terminée ! '{file_path}' est prêt à l'emploi.")
 
+def column_widths(df):
+    """
+    Calcule la largeur de chaque colonne directement depuis le DataFrame :
+    longueur maximale (en-tête compris) + 2, plafonnée à 30 ; 50 pour la colonne 'Description'.
+    """
+    widths = []
+    for column in df.columns:
+        if column == "Description":
+            widths.append(DESCRIPTION_WIDTH)
+            continue
+        values = df[column].astype(object)
+        lengths = values.where(values.notna(), "None").astype(str).str.len()
+        max_length = max(len(str(column)), int(lengths.max()) if len(lengths) else 0)
+        widths.append(min(max_length + 2, MAX_COLUMN_WIDTH))
+    return widths
+
+def write_formatted_sheet(wb, sheet_name, df):
+    """
+    Écrit un DataFrame dans une feuille d'un classeur en mode écriture seule (write-only) :
+    largeurs, Word Wrap, en-têtes en gras centrés et tableau structuré sont appliqués
+    pendant l'écriture, ligne par ligne.
+    """
+    ws = wb.create_sheet(sheet_name)
+    num_rows = len(df) + 1
+    num_cols = len(df.columns)
+
+    # Les largeurs doivent être définies avant l'écriture des lignes
+    for col, width in enumerate(column_widths(df), start=1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+    header_font = Font(bold=True)
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    cell_alignment = Alignment(wrap_text=True, vertical="top", horizontal="left")
+
+    header = []
+    for column in df.columns:
+        cell = WriteOnlyCell(ws, value=str(column))
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header.append(cell)
+    ws.append(header)
+
+    for values in df.itertuples(index=False, name=None):
+        row = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=None if pd.isna(value) else value)
+            cell.alignment = cell_alignment
+            row.append(cell)
+        ws.append(row)
+
+    if num_rows < 2 or num_cols < 1:
+        print(f"[AVERTISSEMENT] Feuille '{sheet_name}' écrite sans tableau car elle est vide.")
+        return
+
+    # Convertir en tableau Excel (en mode write-only, les colonnes doivent être déclarées)
+    table = Table(displayName=f"{sheet_name}Table", ref=f"A1:{get_column_letter(num_cols)}{num_rows}")
+    table.tableColumns = [TableColumn(id=i, name=str(column)) for i, column in enumerate(df.columns, start=1)]
+    table.tableStyleInfo = TableStyleInfo(
+        name=TABLE_STYLE,
+        showFirstColumn=False,
+        showLastColumn=False,
+        showRowStripes=True,
+        showColumnStripes=False,
+    )
+    with warnings.catch_warnings():
+        # openpyxl avertit systématiquement en mode write-only, les colonnes sont déclarées ci-dessus
+        warnings.simplefilter("ignore", UserWarning)
+        ws.add_table(table)
+    print(f"[INFO] Formatage appliqué à la feuille '{sheet_name}'.")
+
+def write_master(sheets, file_path, summary=True):
+    """
+    Écrit le fichier Master mis en forme en un seul passage, en mode écriture seule :
+    les lignes sont streamées sur disque et la mémoire reste constante quel que soit leur nombre.
+    La feuille 'Résumé' (statistiques et graphique) est calculée sur les mêmes DataFrames
+    et écrite en première position dans la même passe.
+    """
+    wb = Workbook(write_only=True)
+    if summary:
+        write_summary_sheet(wb, sheets)
+    for sheet_name, df in sheets.items():
+        write_formatted_sheet(wb, sheet_name, df)
+    wb.save(file_path)
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("[ERREUR] Aucun fichier Excel spécifié.")
@@ -0,0 +1,78 @@
+import os
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+# Extension des fichiers intermédiaires (format Arrow IPC / Feather v2)
+INTERMEDIATE_EXTENSION = ".arrow"
+
+
+def is_intermediate(file_path):
+    return os.path.splitext(file_path)[1].lower() in (INTERMEDIATE_EXTENSION, ".feather")
+
+
+def write_frame(df, file_path):
+    """
+    Écrit un DataFrame au format Arrow IPC non compressé :
+    le fichier peut ensuite être relu en mémoire mappée, sans copie ni désérialisation.
+    L'écriture passe par un fichier temporaire remplacé atomiquement, pour ne jamais
+    tronquer un fichier encore mappé par un lecteur.
+    """
+    tmp_path = f"{file_path}.tmp"
+    feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+    os.replace(tmp_path, file_path)
+
+
+class BatchWriter:
+    """
+    Écrit un fichier intermédiaire Arrow lot par lot, pour des données trop volumineuses pour un DataFrame :
+    seul le lot en cours est en mémoire. Les colonnes sont des chaînes. Le fichier n'apparaît,
+    par remplacement atomique, qu'à `close` ; `abort` abandonne l'écriture.
+    """
+
+    def __init__(self, file_path, columns):
+        self.file_path = file_path
+        self.columns = columns
+        self.schema = pa.schema([(column, pa.string()) for column in columns])
+        self.tmp_path = f"{file_path}.tmp"
+        self.rows = 0
+        self._sink = pa.OSFile(self.tmp_path, "wb")
+        self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+    def write(self, rows):
+        """ Ajoute un lot de lignes (listes de valeurs dans l'ordre des colonnes). """
+        if not rows:
+            return
+        arrays = [pa.array(values, type=pa.string()) for values in zip(*rows)]
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self.rows += len(rows)
+
+    def close(self):
+        self._writer.close()
+        self._sink.close()
+        os.replace(self.tmp_path, self.file_path)
+
+    def abort(self):
+        self._writer.close()
+        self._sink.close()
+        os.remove(self.tmp_path)
+
+
+def read_frame(file_path, memory_map=True):
+    """ Relit un fichier intermédiaire Arrow, en mémoire mappée par défaut. """
+    return feather.read_table(file_path, memory_map=memory_map).to_pandas()
+
+
+def read_table(file_path):
+    """ Charge un fichier intermédiaire (Arrow) ou, pour compatibilité, un fichier Excel. """
+    if is_intermediate(file_path):
+        return read_frame(file_path)
+    return pd.read_excel(file_path)
+
+
+def write_table(df, file_path):
+    """ Écrit un fichier intermédiaire (Arrow) ou, pour compatibilité, un fichier Excel. """
+    if is_intermediate(file_path):
+        write_frame(df, file_path)
+    else:
+        df.to_excel(file_path, index=False)
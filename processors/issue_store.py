@@ -0,0 +1,209 @@
+import sys
+import os
+import sqlite3
+import hashlib
+import pandas as pd
+
+DEFAULT_STORE_PATH = "backend/issue_store.sqlite"
+
+# Colonnes calculées par le pipeline et réutilisées pour les issues déjà connues
+STORED_COLUMNS = ["Module impacté", "Confiance", "Modules détectés", "Test Status"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    system TEXT NOT NULL,
+    issue_id TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    section TEXT,
+    sous_section TEXT,
+    description TEXT,
+    module TEXT,
+    modules_detectes TEXT,
+    test_status TEXT DEFAULT '',
+    mapping_version TEXT,
+    first_release TEXT,
+    last_release TEXT,
+    confidence REAL,
+    module_confirmed INTEGER DEFAULT 0,
+    PRIMARY KEY (system, issue_id, content_hash)
+)
+"""
+
+# Génération du stockage par système : incrémentée à chaque changement qui modifie les Master produits
+# ensuite ('Test Status' importés, release ajoutée à l'index des doublons), elle entre dans la clé du cache
+GENERATION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS store_generations (
+    system TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+)
+"""
+
+# Colonnes ajoutées après la création du schéma : (nom, type), ajoutées aux bases existantes à l'ouverture
+ADDED_COLUMNS = [("confidence", "REAL"), ("module_confirmed", "INTEGER DEFAULT 0")]
+
+
+def content_hashes(df):
+    """ Empreinte de chaque ligne (section, sous-section, ID, description). """
+    return [
+        hashlib.sha256("\0".join(str(value) for value in row).encode("utf-8")).hexdigest()
+        for row in df[["Section", "Sous-section", "ID", "Description"]].itertuples(index=False, name=None)
+    ]
+
+
+def bump_generation(connection, system):
+    """ Incrémente la génération du stockage pour un système, dans la transaction de la connexion. """
+    connection.execute(GENERATION_SCHEMA)
+    connection.execute(
+        """
+        INSERT INTO store_generations (system, generation) VALUES (?, 1)
+        ON CONFLICT (system) DO UPDATE SET generation = generation + 1
+        """,
+        (system,),
+    )
+
+
+class IssueStore:
+    """
+    Stockage persistant (SQLite) des issues déjà traitées, indexé par ID et empreinte de contenu.
+    Une connexion est ouverte par opération : l'objet peut être partagé entre threads et processus.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")  # Lectures concurrentes pendant une écriture
+            connection.execute(SCHEMA)
+            connection.execute(GENERATION_SCHEMA)
+            existing = {row[1] for row in connection.execute("PRAGMA table_info(issues)")}
+            for name, column_type in ADDED_COLUMNS:
+                if name not in existing:
+                    connection.execute(f"ALTER TABLE issues ADD COLUMN {name} {column_type}")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def generation(self, system):
+        """ Génération du stockage pour un système (voir `bump_generation`) ; 0 tant que rien n'a changé. """
+        with self._connect() as connection:
+            row = connection.execute("SELECT generation FROM store_generations WHERE system = ?", (system,)).fetchone()
+        return row[0] if row else 0
+
+    def lookup(self, system, df, mapping_version):
+        """
+        Retourne, pour les lignes du DataFrame déjà connues avec le même contenu et la même
+        version du mapping, un DataFrame indexé comme `df` avec les colonnes `STORED_COLUMNS`.
+        """
+        hashes = content_hashes(df)
+        with self._connect() as connection:
+            connection.execute("CREATE TEMP TABLE wanted (position INTEGER, issue_id TEXT, content_hash TEXT)")
+            connection.executemany(
+                "INSERT INTO wanted VALUES (?, ?, ?)",
+                [(position, str(issue_id), content_hash) for position, (issue_id, content_hash) in enumerate(zip(df["ID"], hashes))],
+            )
+            rows = connection.execute(
+                """
+                SELECT wanted.position, issues.module, issues.confidence, issues.modules_detectes, issues.test_status
+                FROM wanted JOIN issues
+                  ON issues.system = ? AND issues.issue_id = wanted.issue_id
+                 AND issues.content_hash = wanted.content_hash AND issues.mapping_version = ?
+                """,
+                (system, mapping_version),
+            ).fetchall()
+
+        known = pd.DataFrame(rows, columns=["position"] + STORED_COLUMNS)
+        known.index = df.index[known.pop("position").to_numpy()]
+        return known
+
+    def save(self, system, df, release, mapping_version):
+        """ Enregistre (ou met à jour) les lignes d'une release traitée. """
+        def column(name, default=None):
+            return df[name].tolist() if name in df.columns else [default] * len(df)
+
+        records = [
+            (system, str(issue_id), content_hash, section, sous_section, description,
+             module, modules, status or "", mapping_version, release, release, confidence)
+            for content_hash, issue_id, section, sous_section, description, module, confidence, modules, status in zip(
+                content_hashes(df), df["ID"], df["Section"], df["Sous-section"], df["Description"],
+                column("Module impacté"), column("Confiance"), column("Modules détectés"), column("Test Status", ""),
+            )
+        ]
+        with self._connect() as connection:
+            connection.executemany(
+                """
+                INSERT INTO issues (
+                    system, issue_id, content_hash, section, sous_section, description, module, modules_detectes,
+                    test_status, mapping_version, first_release, last_release, confidence
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (system, issue_id, content_hash) DO UPDATE SET
+                    module = CASE WHEN issues.module_confirmed THEN issues.module ELSE excluded.module END,
+                    confidence = excluded.confidence,
+                    modules_detectes = excluded.modules_detectes,
+                    mapping_version = excluded.mapping_version,
+                    last_release = excluded.last_release
+                """,
+                records,
+            )
+
+    def import_test_status(self, system, master_file):
+        """
+        Reporte dans le stockage les 'Test Status' saisis par les testeurs dans un fichier Master,
+        pour qu'ils soient repris par les releases suivantes. Retourne le nombre de lignes mises à jour.
+        """
+        updated = 0
+        sheets = pd.read_excel(master_file, sheet_name=None)
+        with self._connect() as connection:
+            for df in sheets.values():
+                if not {"Section", "Sous-section", "ID", "Description", "Test Status"}.issubset(df.columns):
+                    continue
+                df = df.dropna(subset=["ID"])
+                statuses = df["Test Status"].fillna("").astype(str)
+                for content_hash, issue_id, status in zip(content_hashes(df), df["ID"], statuses):
+                    if status:
+                        cursor = connection.execute(
+                            "UPDATE issues SET test_status = ? WHERE system = ? AND issue_id = ? AND content_hash = ?",
+                            (status, system, str(issue_id), content_hash),
+                        )
+                        updated += cursor.rowcount
+            if updated:
+                bump_generation(connection, system)
+        return updated
+
+    def import_module_labels(self, system, master_file):
+        """
+        Reporte dans le stockage les 'Module impacté' corrigés par les testeurs dans un fichier Master :
+        un module différent de celui attribué par le pipeline est marqué comme confirmé (`module_confirmed`),
+        n'est plus remplacé par les traitements suivants et sert d'exemple au classifieur
+        (voir `analysis.module_classifier.training_descriptions`). Retourne le nombre de lignes mises à jour.
+        """
+        updated = 0
+        sheets = pd.read_excel(master_file, sheet_name=None)
+        with self._connect() as connection:
+            for df in sheets.values():
+                if not {"Section", "Sous-section", "ID", "Description", "Module impacté"}.issubset(df.columns):
+                    continue
+                df = df.dropna(subset=["ID", "Module impacté"])
+                for content_hash, issue_id, module in zip(content_hashes(df), df["ID"], df["Module impacté"].astype(str)):
+                    cursor = connection.execute(
+                        """
+                        UPDATE issues SET module = ?, module_confirmed = 1
+                        WHERE system = ? AND issue_id = ? AND content_hash = ? AND module IS NOT ?
+                        """,
+                        (module, system, str(issue_id), content_hash, module),
+                    )
+                    updated += cursor.rowcount
+            if updated:
+                bump_generation(connection, system)
+        return updated
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("[ERREUR] Arguments manquants. Utilisation : python issue_store.py <système> <fichier_Master.xlsx>")
+        sys.exit(1)
+
+    store = IssueStore()
+    count = store.import_test_status(sys.argv[1], sys.argv[2])
+    print(f"[SUCCÈS] {count} 'Test Status' importés depuis '{sys.argv[2]}'.")
+    count = store.import_module_labels(sys.argv[1], sys.argv[2])
+    print(f"[SUCCÈS] {count} 'Module impacté' corrigés importés depuis '{sys.argv[2]}'.")
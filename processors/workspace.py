@@ -0,0 +1,108 @@
+import os
+import time
+import uuid
+import shutil
+import yaml
+from types import MappingProxyType
+
+# Sous-dossier du dossier des résultats contenant les dossiers de travail des exécutions en cours
+RUNS_FOLDER = "runs"
+
+# Nom de l'instantané de configuration d'une exécution
+CONFIG_SNAPSHOT = "config.yaml"
+
+
+def new_run_id():
+    """ Identifiant d'exécution unique, triable par date de création. """
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def runs_folder(results_folder):
+    return os.path.join(results_folder, RUNS_FOLDER)
+
+
+def cleanup_runs(results_folder, max_age, now=None):
+    """
+    Supprime les dossiers de travail abandonnés (exécution interrompue) plus anciens que `max_age` secondes.
+    Retourne le nombre de dossiers supprimés.
+    """
+    folder = runs_folder(results_folder)
+    if not os.path.isdir(folder):
+        return 0
+    now = now or time.time()
+    removed = 0
+    for entry in os.scandir(folder):
+        if entry.is_dir() and now - entry.stat().st_mtime >= max_age:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+class RunWorkspace:
+    """
+    Dossier de travail d'une exécution du pipeline (`<résultats>/runs/<identifiant>/`) : les fichiers
+    intermédiaires et le Master y sont écrits sans risque de collision avec une exécution concurrente,
+    même pour une release de même nom, puis le Master est publié par remplacement atomique dans
+    le dossier des résultats (`publish`). La configuration de l'exécution est figée à la création :
+    `config` est en lecture seule et son instantané `config.yaml` est écrit une fois, en lecture seule.
+    L'objet peut être transmis à un autre processus (pool de workers) ; `close` supprime le dossier.
+    """
+
+    def __init__(self, results_folder, config=None, run_id=None):
+        self.run_id = run_id or new_run_id()
+        self.results_folder = results_folder
+        self.folder = os.path.join(runs_folder(results_folder), self.run_id)
+        self._config = {
+            **(config or {}),
+            "run_id": self.run_id,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        os.makedirs(self.folder)
+
+        snapshot = self.path(CONFIG_SNAPSHOT)
+        with open(snapshot, "w") as file:
+            yaml.safe_dump(self._config, file, allow_unicode=True)
+        os.chmod(snapshot, 0o444)
+
+    @property
+    def config(self):
+        """ Configuration de l'exécution (lecture seule). """
+        return MappingProxyType(self._config)
+
+    def path(self, filename):
+        """ Chemin d'un fichier dans le dossier de travail. """
+        return os.path.join(self.folder, os.path.basename(filename))
+
+    def unique_name(self, filename):
+        """ Nom propre à l'exécution : `<release>_Master.xlsx` devient `<release>_<identifiant>_Master.xlsx`. """
+        stem, extension = os.path.splitext(os.path.basename(filename))
+        base, separator, suffix = stem.rpartition("_")
+        if not separator:
+            return f"{stem}_{self.run_id}{extension}"
+        return f"{base}_{self.run_id}_{suffix}{extension}"
+
+    def publish(self, path, name=None):
+        """
+        Déplace un fichier du dossier de travail vers le dossier des résultats, par remplacement atomique :
+        un lecteur voit l'ancienne version complète ou la nouvelle, jamais un fichier en cours d'écriture.
+        `name` (par défaut : le nom du fichier) permet de publier sous un nom propre à l'exécution
+        (voir `unique_name`). Retourne le chemin publié.
+        """
+        published = os.path.join(self.results_folder, os.path.basename(name or path))
+        os.replace(path, published)
+        return published
+
+    def close(self):
+        """ Supprime le dossier de travail et les fichiers non publiés. """
+        try:
+            # Sous Windows, un fichier en lecture seule ne peut pas être supprimé
+            os.chmod(self.path(CONFIG_SNAPSHOT), 0o644)
+        except OSError:
+            pass
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,74 +1,144 @@
 import sys
 import os
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
+import pandas as pd
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
 from openpyxl.chart import BarChart, Reference
 
-def add_summary(master_filename):
+# Permet l'import des modules du projet lorsque ce fichier est lancé en script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SUMMARY_SHEET = "Résumé"
+
+# Colonnes agrégées dans le résumé (celles absentes des feuilles sont ignorées)
+SUMMARY_DIMENSIONS = ["Release", "Section", "Sous-section", "Module impacté", "Test Status"]
+TOP_MODULES = 10
+EMPTY_LABEL = "Non renseigné"
+
+def summary_tables(sheets):
     """
-    Ajoute une feuille 'Résumé' avec des totaux et un graphique.
-    - Deux colonnes : 'Catégorie' et 'Nombre'
-    - Évite les erreurs de tableaux Excel corrompus
+    Calcule les tableaux du résumé à partir des DataFrames du fichier Master
+    (nom de feuille -> DataFrame), par agrégations groupby :
+    - le nombre de lignes par feuille
+    - pour chaque dimension, le nombre de lignes par valeur et par feuille
+    - les modules les plus impactés
+    Retourne une liste de (titre, DataFrame) ; la première colonne de chaque DataFrame
+    porte les catégories, les suivantes les nombres par feuille puis le total.
     """
+    sheets = {name: df for name, df in sheets.items() if name != SUMMARY_SHEET}
+    types = list(sheets)
+    row_counts = [len(df) for df in sheets.values()]
+    tables = [("Nombre de lignes par feuille", pd.DataFrame({"Type": types + ["Total"], "Nombre": row_counts + [sum(row_counts)]}))]
+    if not types:
+        return tables
 
-    if not os.path.exists(master_filename):
-        print(f"[ERREUR] Le fichier '{master_filename}' n'existe pas.")
-        return
+    combined = pd.concat(
+        [df.assign(_type=name) for name, df in sheets.items()], ignore_index=True, sort=False
+    )
 
-    print("\n[INFO] Création d'une feuille 'Résumé' avec des totaux et un graphique dans le fichier Master...")
+    for dimension in SUMMARY_DIMENSIONS:
+        if dimension not in combined.columns:
+            continue
+        values = combined[dimension].astype(object).where(combined[dimension].notna(), "")
+        values = values.astype(str).str.strip().replace("", EMPTY_LABEL)
+        counts = (
+            pd.DataFrame({dimension: values, "_type": combined["_type"]})
+            .groupby([dimension, "_type"], sort=False).size()
+            .unstack("_type", fill_value=0)
+            .reindex(columns=types, fill_value=0)
+        )
+        counts["Total"] = counts.sum(axis=1)
+        counts = counts.sort_values("Total", ascending=False, kind="stable").reset_index()
+        counts.columns.name = None
+        tables.append((f"Par {dimension}", counts))
 
-    # Charger le fichier Excel
-    wb = load_workbook(master_filename)
+        if dimension == "Module impacté":
+            tables.append((f"Top {TOP_MODULES} des modules", counts.head(TOP_MODULES)))
 
-    # Suppression propre de la feuille "Résumé" si elle existe déjà
-    if "Résumé" in wb.sheetnames:
-        del wb["Résumé"]
-    ws_summary = wb.create_sheet("Résumé", 0)
+    return tables
 
-    # Définition des en-têtes
-    headers = ["Catégorie", "Nombre"]
-    ws_summary.append(headers)
+def write_summary_sheet(wb, sheets, index=0):
+    """
+    Écrit la feuille 'Résumé' (tableaux de summary_tables + graphique à barres des modules
+    les plus impactés) dans un classeur en mode écriture seule, dans la même passe
+    que les feuilles de données.
+    """
+    ws = wb.create_sheet(SUMMARY_SHEET, index)
+    ws.column_dimensions["A"].width = 40
+    for column in "BCDE":
+        ws.column_dimensions[column].width = 15
 
-    # Appliquer un style aux en-têtes
+    title_font = Font(bold=True, size=12)
     header_font = Font(bold=True, color="FFFFFF")
     header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-    for col_num, header in enumerate(headers, start=1):
-        col_letter = get_column_letter(col_num)
-        cell = ws_summary[f"{col_letter}1"]
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center")
-        cell.fill = header_fill
-
-    # Exemple de données (à remplacer par les données réelles)
-    data = [
-        ["Bug Fixes", 10],
-        ["Enhancements", 5],
-        ["Documentation", 3]
-    ]
-
-    for row in data:
-        ws_summary.append(row)
-
-    # Ajustement des colonnes
-    ws_summary.column_dimensions["A"].width = 25
-    ws_summary.column_dimensions["B"].width = 15
-
-    # Ajout d'un graphique à barres
-    chart = BarChart()
-    chart.title = "Résumé des Catégories"
-    chart.x_axis.title = "Catégorie"
-    chart.y_axis.title = "Nombre"
-
-    data_ref = Reference(ws_summary, min_col=2, min_row=1, max_row=len(data) + 1)
-    categories_ref = Reference(ws_summary, min_col=1, min_row=2, max_row=len(data) + 1)
-    chart.add_data(data_ref, titles_from_data=True)
-    chart.set_categories(categories_ref)
-    chart.shape = 4
-    ws_summary.add_chart(chart, "D4")
-
-    # Sauvegarde propre sans tableau
-    wb.save(master_filename)
+    header_alignment = Alignment(horizontal="center")
+
+    def styled(value, font=None, fill=None, alignment=None):
+        cell = WriteOnlyCell(ws, value=value)
+        if font:
+            cell.font = font
+        if fill:
+            cell.fill = fill
+        if alignment:
+            cell.alignment = alignment
+        return cell
+
+    row_number = 0
+    chart_block = None
+    for title, table in summary_tables(sheets):
+        ws.append([styled(title, title_font)])
+        ws.append([styled(str(column), header_font, header_fill, header_alignment) for column in table.columns])
+        header_row = row_number + 2
+        for values in table.itertuples(index=False, name=None):
+            ws.append([value.item() if hasattr(value, "item") else value for value in values])
+        row_number = header_row + len(table)
+        ws.append([])
+        row_number += 1
+
+        if title.startswith("Top") and len(table):
+            chart_block = (header_row, len(table), len(table.columns))
+
+    if chart_block is None:
+        # Sans colonne 'Module impacté', le graphique porte sur le nombre de lignes par feuille
+        chart_block = (2, len(sheets), 2)
+
+    # Graphique à barres : une série par feuille (ou le nombre de lignes par feuille)
+    header_row, length, num_cols = chart_block
+    if length:
+        chart = BarChart()
+        chart.title = "Modules les plus impactés" if num_cols > 2 else "Résumé des Catégories"
+        chart.x_axis.title = "Catégorie"
+        chart.y_axis.title = "Nombre"
+
+        last_data_col = num_cols - 1 if num_cols > 2 else num_cols  # Sans la colonne 'Total'
+        data_ref = Reference(ws, min_col=2, max_col=last_data_col, min_row=header_row, max_row=header_row + length)
+        categories_ref = Reference(ws, min_col=1, min_row=header_row + 1, max_row=header_row + length)
+        chart.add_data(data_ref, titles_from_data=True)
+        chart.set_categories(categories_ref)
+        chart.shape = 4
+        chart.width = 20
+        chart.height = 10
+        ws.add_chart(chart, "G2")
+
+    return ws
+
+def add_summary(master_filename):
+    """
+    Ajoute (ou recalcule) la feuille 'Résumé' d'un fichier Master existant.
+    Le pipeline n'en a pas besoin : il écrit le résumé en même temps que les feuilles de données.
+    """
+
+    if not os.path.exists(master_filename):
+        print(f"[ERREUR] Le fichier '{master_filename}' n'existe pas.")
+        return
+
+    from processors.format_data import write_master
+
+    print("\n[INFO] Création d'une feuille 'Résumé' avec des totaux et un graphique dans le fichier Master...")
+
+    sheets = pd.read_excel(master_filename, sheet_name=None)
+    sheets.pop(SUMMARY_SHEET, None)
+    write_master(sheets, master_filename)
     print(f"[SUCCÈS] Feuille 'Résumé' ajoutée à '{master_filename}' avec succès, avec des totaux et un graphique.")
 
 if __name__ == "__main__":
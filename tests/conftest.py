@@ -0,0 +1,8 @@
+import sys
+import os
+
+# Permet l'import des modules du projet lorsque les tests sont lancés depuis n'importe quel dossier
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RELEASE = os.path.join(PROJECT_ROOT, "sciforma_patches", "2024-09.html")
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from analysis.categorize_impacts import KeywordMatcher
+
+MAPPING = {
+    "Gestion de projets": ["gestion de projets"],
+    "Centre des projets": ["projets"],
+    "Planning": ["plan", "planning"],
+}
+
+
+def match(descriptions, mapping=MAPPING):
+    return KeywordMatcher(mapping).match(pd.Series(descriptions))
+
+
+def test_overlapping_keywords_are_all_counted():
+    """ Un mot-clé contenu dans celui d'un autre module est compté pour chacun d'eux. """
+    counts = match(["gestion de projets lente"])
+    assert counts.loc[0, "Gestion de projets"] == 1
+    assert counts.loc[0, "Centre des projets"] == 1
+
+
+def test_keywords_sharing_a_prefix_are_all_counted():
+    counts = match(["Planning du plan de charge", "rien"])
+    assert counts.loc[0, "Planning"] == 3
+    assert counts.loc[1].sum() == 0
+
+
+def test_compiled_matcher_matches_like_the_mapping():
+    descriptions = ["gestion de projets lente", "planning"]
+    compiled = KeywordMatcher(compiled=KeywordMatcher(MAPPING).to_compiled())
+    pd.testing.assert_frame_equal(compiled.match(pd.Series(descriptions)), match(descriptions))
@@ -0,0 +1,44 @@
+import os
+import importlib
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory):
+    """ Application chargée depuis un dossier temporaire (envois, résultats et bases séparés), sans workers. """
+    previous = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("server"))
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("PATCHNOTES_WORKER_PROCESSES", "0")
+        try:
+            module = importlib.import_module("backend.app")
+        finally:
+            os.chdir(previous)
+    # Les dossiers sont absolus : l'application sert ses fichiers quel que soit le dossier courant
+    yield module
+
+
+def check_download(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == b"master"
+    etag = response.headers["ETag"]
+
+    revalidated = client.get(url, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+
+
+def test_download_then_revalidate(app_module):
+    with open(os.path.join(app_module.RESULTS_FOLDER, "2024-09_Master.xlsx"), "wb") as file:
+        file.write(b"master")
+    check_download(app_module.app.test_client(), "/download/2024-09_Master.xlsx")
+
+
+def test_cached_download_then_revalidate(app_module):
+    folder = os.path.join(app_module.CACHE_FOLDER, "cle")
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "2024-09_Master.xlsx"), "wb") as file:
+        file.write(b"master")
+    check_download(app_module.app.test_client(), "/download/cache/cle/2024-09_Master.xlsx")
@@ -0,0 +1,21 @@
+import pytest
+
+from conftest import SAMPLE_RELEASE
+from extractors.html_parsers import available_backends
+from extractors.extract_sciforma import iter_records
+
+
+@pytest.fixture(scope="module")
+def reference_records():
+    return list(iter_records(SAMPLE_RELEASE, "html.parser"))
+
+
+def test_reference_backend_extracts_records(reference_records):
+    extract_types = {extract_type for extract_type, _ in reference_records}
+    assert extract_types == {"correctifs", "améliorations"}
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_produce_identical_records(backend, reference_records):
+    """ Parité des backends HTML (lxml, html.parser, stream) sur une release réelle. """
+    assert list(iter_records(SAMPLE_RELEASE, backend)) == reference_records
@@ -0,0 +1,29 @@
+from extractors.html_prefilter import prefilter_html
+from extractors.html_stream import iter_chunk_nodes
+from extractors.extract_sciforma import NODE_TAGS, SECTIONS_MAPPING, records_from_nodes
+
+PAGE = (
+    "<html><body><header><h1>Portail</h1><nav>Menu</nav></header><main><article>"
+    "<header><h1>" + SECTIONS_MAPPING["améliorations"][0] + "</h1></header>"
+    "<h2>Planning</h2><h3>#SCI-1</h3><p>Export du planning en PDF.</p>"
+    "<script>var x = 1;</script>"
+    "</article></main><footer>Mentions légales</footer></body></html>"
+)
+
+
+def extract(prefilter):
+    return list(records_from_nodes(iter_chunk_nodes([PAGE], NODE_TAGS, prefilter)))
+
+
+def test_heading_wrapped_in_header_is_kept():
+    """ Le <header> d'un article porte le titre de la section : il n'est pas supprimé comme l'habillage du site. """
+    records = extract(prefilter=True)
+    assert records == extract(prefilter=False)
+    assert records == [("améliorations", [SECTIONS_MAPPING["améliorations"][0], "Planning", "#SCI-1", "Export du planning en PDF."])]
+
+
+def test_site_chrome_is_dropped_outside_the_content_region():
+    html = prefilter_html(PAGE)
+    assert "Portail" not in html and "Menu" not in html and "Mentions légales" not in html
+    assert "var x" not in html
+    assert SECTIONS_MAPPING["améliorations"][0] in html
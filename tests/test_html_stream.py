@@ -0,0 +1,36 @@
+import tracemalloc
+
+from extractors.html_stream import iter_chunk_nodes
+from extractors.extract_sciforma import NODE_TAGS, SECTIONS_MAPPING, records_from_nodes
+
+ISSUES_PER_CHUNK = 200
+ISSUE = "<h3>#SCI-{number}</h3><p>Correction de l'affichage du planning numéro {number}.</p><script>var x = {number};</script>\n"
+
+
+def regionless_page(chunk_count):
+    """ Page sans <main> ni <article> (export consolidé), produite par blocs sans être chargée en mémoire. """
+    yield "<html><body><h1>" + SECTIONS_MAPPING["correctifs"][0] + "</h1><h2>Planning</h2>"
+    for chunk in range(chunk_count):
+        yield "".join(ISSUE.format(number=chunk * ISSUES_PER_CHUNK + index) for index in range(ISSUES_PER_CHUNK))
+    yield "</body></html>"
+
+
+def count_records(chunk_count, prefilter):
+    return sum(1 for _ in records_from_nodes(iter_chunk_nodes(regionless_page(chunk_count), NODE_TAGS, prefilter)))
+
+
+def test_prefilter_keeps_regionless_page():
+    assert count_records(100, prefilter=True) == count_records(100, prefilter=False) == 100 * ISSUES_PER_CHUNK
+
+
+def test_regionless_page_memory_is_bounded():
+    """ Une page de ~12 Mo sans zone de contenu est analysée en mémoire bornée, pré-filtre actif. """
+    chunk_count = 600
+    tracemalloc.start()
+    try:
+        records = count_records(chunk_count, prefilter=True)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert records == chunk_count * ISSUES_PER_CHUNK
+    assert peak < 16 * 1024 * 1024
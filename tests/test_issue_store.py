@@ -0,0 +1,49 @@
+import pandas as pd
+
+from processors.issue_store import IssueStore
+from analysis.near_duplicates import NearDuplicateIndex
+
+RELEASE = pd.DataFrame({
+    "Section": ["Anomalies corrigées du produit"],
+    "Sous-section": ["Planning"],
+    "ID": ["#SCI-1"],
+    "Description": ["Correction de l'export du planning en PDF."],
+})
+
+
+def test_generation_changes_with_the_store_state(tmp_path):
+    """ La génération, qui entre dans la clé du cache des résultats, suit les changements visibles dans les Master. """
+    store = IssueStore(str(tmp_path / "issues.sqlite"))
+    assert store.generation("Sciforma") == 0
+
+    NearDuplicateIndex(store.path).add_release("Sciforma", "2024-09", {"Correctifs": RELEASE})
+    assert store.generation("Sciforma") == 1
+
+    store.save("Sciforma", RELEASE, "2024-09", "v1")
+    master_file = tmp_path / "2024-09_Master.xlsx"
+    RELEASE.assign(**{"Test Status": ["OK"]}).to_excel(master_file, sheet_name="Correctifs", index=False)
+    assert store.import_test_status("Sciforma", master_file) == 1
+    assert store.generation("Sciforma") == 2
+    assert store.generation("BC") == 0
+
+
+def test_classifier_learns_only_confirmed_modules(tmp_path):
+    """ Les modules attribués par le pipeline ne sont pas réappris ; ceux corrigés par un testeur le sont. """
+    from analysis.module_classifier import training_descriptions
+
+    store = IssueStore(str(tmp_path / "issues.sqlite"))
+    release = pd.concat([RELEASE, RELEASE.assign(ID=["#SCI-2"], Description=["Lenteur de la feuille de temps."])],
+                        ignore_index=True)
+    store.save("Sciforma", release.assign(**{"Module impacté": ["Planning", "Planning"]}), "2024-09", "v1")
+    assert training_descriptions(store.path) == ([], sorted(release["Description"]))
+
+    master_file = tmp_path / "2024-09_Master.xlsx"
+    release.assign(**{"Module impacté": ["Planning", "Feuilles de temps"]}).to_excel(master_file, index=False)
+    assert store.import_module_labels("Sciforma", master_file) == 1
+    assert training_descriptions(store.path) == (
+        [("Lenteur de la feuille de temps.", "Feuilles de temps")], [RELEASE["Description"][0]]
+    )
+
+    # Un nouveau traitement ne remplace pas le module confirmé
+    store.save("Sciforma", release.assign(**{"Module impacté": ["Planning", "Planning"]}), "2024-10", "v2")
+    assert training_descriptions(store.path)[0] == [("Lenteur de la feuille de temps.", "Feuilles de temps")]